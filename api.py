@@ -1,13 +1,37 @@
 import inspect
-import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from functools import partial
 from library.webservice import WebService
+from settings import ENV_CONFIG
+
+
+# sections of get_sdm_profiles, section name: spec path with {id_sdm} or ?id_sdm=
+SDM_PROFILE_SECTIONS = {
+    'profil'             : '/data_pribadi/profil/{id_sdm}',
+    'kependudukan'       : '/data_pribadi/kependudukan/{id_sdm}',
+    'keluarga'           : '/data_pribadi/keluarga/{id_sdm}',
+    'alamat'             : '/data_pribadi/alamat/{id_sdm}',
+    'kepegawaian'        : '/data_pribadi/kepegawaian/{id_sdm}',
+    'lain'               : '/data_pribadi/lain/{id_sdm}',
+    'bidang_ilmu'        : '/data_pribadi/bidang_ilmu/{id_sdm}',
+    'penelitian'         : '/penelitian',
+    'publikasi'          : '/publikasi',
+    'pengabdian'         : '/pengabdian',
+    'pengajaran'         : '/pengajaran',
+    'bahan_ajar'         : '/bahan_ajar',
+    'pendidikan_formal'  : '/pendidikan_formal',
+    'jabatan_fungsional' : '/jabatan_fungsional',
+    'kepangkatan'        : '/kepangkatan',
+    'penghargaan'        : '/penghargaan',
+}
+
 
 
 class WsSisterAPI(WebService):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, lazy=True, tags=None):
+        super().__init__(tags)
         self.reply_as_json = False
         # create automatic function from sister api spec
         # for example, get /referensi/sdm
@@ -15,21 +39,30 @@ class WsSisterAPI(WebService):
         # api = SisterApi()
         # res = api.get_referensi_sdm()
         # note that / in path become _ in function
-        self.create_func_from_spec()
+        # in lazy mode, function is created on first access (see __getattr__)
+        self.lazy = lazy
+        if not lazy:
+            self.create_func_from_spec()
+
+
+    def __getattr__(self, name):
+        # only called when normal attribute lookup fails
+        if name.startswith('get_') and 'spec' in self.__dict__:
+            path = self.spec.get_path_by_function(name)
+            if path:
+                self.add_get_function(name, path)
+                return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self.spec.functions))
 
 
     def create_func_from_spec(self):
         self.paths = self.spec.get_paths()
-        for path in self.paths:
-            isb_format  = r"[/]{([^{}]+)}" # inside curly bracket
-            func_name   = re.sub(r"\/", '_', path)
-            url_paths   = re.findall(isb_format, path)
-            for url_path in url_paths:
-                func_name = func_name.replace(f'{{{url_path}}}', 'bypath')
-            # remove _ in first func_name
-            if func_name.startswith('_'):
-                func_name = func_name[1:]
-            self.add_get_function(f'get_{func_name}', path)
+        for func_name, path in self.spec.functions.items():
+            self.add_get_function(func_name, path)
 
 
     def add_to_class(self, name, content):
@@ -47,13 +80,9 @@ class WsSisterAPI(WebService):
 
 
     def master_get_function(self, path, **kwargs):
-        required_params, params = self.check_required_param(path)
-        for param_name in required_params:
-            if not param_name in kwargs:
-                raise NameError(f'Require argument {list(required_params)}\n\nARGUMENTS HINT:\n{params}')
-        # put more accessible info about params
-        kwargs['__params__'] = params
-        res = self.get_data(path, **kwargs)
+        plan = self.get_plan(path)
+        plan.check_required(kwargs)
+        res = self.execute_plan(plan, **kwargs)
         return self.parse_response(res, as_json=self.reply_as_json)
 
 
@@ -61,4 +90,177 @@ class WsSisterAPI(WebService):
         self.add_to_class(name, partial(self.master_get_function, path, **kwargs))
 
 
-SisterAPI = WsSisterAPI()
\ No newline at end of file
+    def batch(self, calls, max_workers=None):
+        """
+        Run several get_* calls at once, results in the order of calls
+
+            res = api.batch([
+                ('get_referensi_agama', {}),
+                ('get_data_pribadi_profil_bypath', {'id_sdm': id_sdm}),
+            ])
+
+        A call is a function name or spec path with its kwargs, or just the
+        name. Fresh cache hits are answered in the calling thread, the rest
+        runs on max_workers threads (BATCH_MAX_WORKERS). A failing call gives
+        an error response in its place instead of raising.
+        """
+        results = [None] * len(calls)
+        pending = []
+        for index, call in enumerate(calls):
+            name, kwargs = (call, {}) if isinstance(call, str) else call
+            plan, results[index] = self.prepare_call(name, kwargs)
+            if plan:
+                pending.append((index, plan, kwargs))
+        if not pending:
+            return results
+
+        # the token is requested here once, not by every worker
+        api_key = self.check_api_key()
+        if api_key:
+            for index, _, _ in pending:
+                results[index] = api_key
+            return results
+
+        max_workers = min(max_workers or ENV_CONFIG['batch_max_workers'], len(pending))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sister-batch') as executor:
+            futures = [(index, executor.submit(self.run_call, plan, kwargs)) for index, plan, kwargs in pending]
+            for index, future in futures:
+                results[index] = future.result()
+        return results
+
+
+    def get_sdm_profiles(self, id_sdm_list, sections=None, max_workers=None):
+        """
+        Profiles of several SDM, yielded as each one is complete
+
+            for id_sdm, profile in api.get_sdm_profiles(id_sdm_list):
+                profile['profil'], profile['publikasi'], ...
+
+        sections are names of SDM_PROFILE_SECTIONS or spec paths, all of them
+        by default. Every section of every SDM is a call like in batch: fresh
+        cache hits are answered here, the rest shares one pool of max_workers
+        threads (BATCH_MAX_WORKERS). At most max_workers SDM are fetched at a
+        time, so the first profiles arrive right away and a long id_sdm_list
+        is never queued at once. Profiles come in the order they complete.
+        """
+        sections = {x: SDM_PROFILE_SECTIONS.get(x, x) for x in sections or SDM_PROFILE_SECTIONS}
+        api_key = self.check_api_key()
+        max_workers = max_workers or ENV_CONFIG['batch_max_workers']
+
+        id_sdm_list = iter(id_sdm_list)
+        futures = {} # future: (profile state, section)
+        in_flight = 0 # SDM waiting for some of their sections
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sister-profile')
+        try:
+            while True:
+                # the next SDM only when one of the running ones is complete
+                while in_flight < max_workers:
+                    id_sdm = next(id_sdm_list, None)
+                    if id_sdm is None:
+                        break
+                    state = {'id_sdm': id_sdm, 'profile': {}, 'pending': 0}
+                    for section, path in sections.items():
+                        plan, result = self.prepare_call(path, {'id_sdm': id_sdm})
+                        if plan and not api_key:
+                            futures[executor.submit(self.run_call, plan, {'id_sdm': id_sdm})] = (state, section)
+                            state['pending'] += 1
+                        else:
+                            state['profile'][section] = result or api_key
+                    if not state['pending']:
+                        # every section from cache
+                        yield id_sdm, state['profile']
+                        continue
+                    in_flight += 1
+                if not futures:
+                    return
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    state, section = futures.pop(future)
+                    state['profile'][section] = future.result()
+                    state['pending'] -= 1
+                    if not state['pending']:
+                        in_flight -= 1
+                        yield state['id_sdm'], {x: state['profile'][x] for x in sections}
+        finally:
+            # a consumer that stops early does not wait for the remaining SDM
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def prepare_call(self, name, kwargs):
+        # (plan, None) when the server has to be asked, (None, response) for
+        # a cache hit or an error
+        try:
+            plan = self.get_plan(self.get_batch_path(name))
+            plan.check_required(kwargs)
+            cached = self.get_fresh_cache_response(plan.build(kwargs).name())
+        except Exception as e:
+            return None, self.get_batch_error(e)
+        if cached:
+            return None, self.parse_response(cached, as_json=self.reply_as_json)
+        return plan, None
+
+
+    def run_call(self, plan, kwargs):
+        try:
+            return self.parse_response(self.execute_plan(plan, **kwargs), as_json=self.reply_as_json)
+        except Exception as e:
+            return self.get_batch_error(e)
+
+
+    def get_batch_path(self, name):
+        # get_referensi_agama or /referensi/agama
+        path = name if name.startswith('/') else self.spec.get_path_by_function(name)
+        if not path:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return path
+
+
+    def get_batch_error(self, error):
+        response = self.response_template()
+        response['message'] = str(error)
+        response['detail'] = type(error).__name__
+        return self.parse_response(response, as_json=self.reply_as_json)
+
+
+
+class LazySisterAPI:
+    """Module level client, WsSisterAPI is constructed on first use"""
+
+    def __init__(self, api_class=WsSisterAPI, **kwargs):
+        self.__dict__['_api_class'] = api_class
+        self.__dict__['_api_kwargs'] = kwargs
+        self.__dict__['_api'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+
+    def get_api(self):
+        if self._api is None:
+            with self._lock:
+                if self._api is None:
+                    self.__dict__['_api'] = self._api_class(**self._api_kwargs)
+        return self._api
+
+
+    def __getattr__(self, name):
+        return getattr(self.get_api(), name)
+
+
+    def __setattr__(self, name, value):
+        setattr(self.get_api(), name, value)
+
+
+    def __dir__(self):
+        return dir(self.get_api())
+
+
+
+SisterAPI = LazySisterAPI()
+
+
+
+def __getattr__(name):
+    # the asyncio client lives in async_api.py, importing api does not load asyncio
+    if name == 'AsyncSisterAPI':
+        from async_api import AsyncSisterAPI
+        return AsyncSisterAPI
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
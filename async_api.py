@@ -0,0 +1,187 @@
+import asyncio
+from functools import partial
+from api import WsSisterAPI
+from library.aio import AsyncSingleFlight, acquire_limiter, get_async_client
+from settings import ENV_CONFIG, STATUS_SUCCESS, STATUS_SUCCESS_NO_REPLY, STATUS_TOKEN_INVALID
+
+
+class AsyncSisterAPI(WsSisterAPI):
+    """
+    asyncio client, the get_* functions of WsSisterAPI as coroutines
+
+        async with AsyncSisterAPI() as api:
+            res = await api.get_referensi_sdm()
+
+    Requests share one pooled httpx.AsyncClient (pip install httpx), at most
+    max_concurrency at a time. The token is requested once for all waiting
+    tasks, identical uncached calls share one request. Memory tier hits are
+    served inline, cache reads and writes that touch the disk run in a thread.
+    """
+
+    def __init__(self, lazy=True, tags=None, max_concurrency=None, client=None):
+        super().__init__(lazy, tags)
+        self.max_concurrency = max_concurrency or ENV_CONFIG['async_max_concurrency']
+        self.client = client
+        self.own_client = client is None
+        self.loop = None
+
+
+    def bind_loop(self):
+        # locks, semaphore and the client belong to the loop they are used on
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.token_lock = asyncio.Lock()
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.async_flights = AsyncSingleFlight()
+            if self.own_client:
+                self.client = get_async_client()
+
+
+    async def aclose(self):
+        if self.own_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self.loop = None
+
+
+    async def __aenter__(self):
+        self.bind_loop()
+        return self
+
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+    async def master_get_function(self, path, **kwargs):
+        plan = self.get_plan(path)
+        plan.check_required(kwargs)
+        res = await self.execute_plan_async(plan, **kwargs)
+        return self.parse_response(res, as_json=self.reply_as_json)
+
+
+    async def ensure_api_key(self, invalid_token=None):
+        """Error response when no token can be requested, None otherwise
+
+        invalid_token is a token the server rejected, it is replaced unless
+        another task already did.
+        """
+        if invalid_token is None and self.is_api_key_valid():
+            return None
+        async with self.token_lock:
+            if invalid_token is None and self.is_api_key_valid():
+                return None
+            if invalid_token is not None and self.api_key.get('token') not in (None, '', invalid_token):
+                return None
+            return await self.request_api_key_async()
+
+
+    async def request_api_key_async(self):
+        response = self.response_template()
+        get_api_key = await self.send_limited_async(self.client.post, f"{self.get_ws_url()}/authorize", json=self.get_auth_data())
+        json_api_key = self.is_json(get_api_key.text)
+        if not json_api_key:
+            response['message'] = "Response is not in JSON format, check your URL"
+            return self.parse_response(response)
+        if get_api_key.status_code != STATUS_SUCCESS:
+            response['message'] = json_api_key['message']
+            response['detail'] = json_api_key['detail']
+            return self.parse_response(response)
+        await asyncio.to_thread(
+            self.update_api_key,
+            token = json_api_key['token'],
+            role  = json_api_key['role'],
+            accessed_at = self.get_now_datetime(isoformat=True),
+            expired_at  = self.get_expired_datetime(isoformat=True, **self.token_expired_datetime),
+        )
+        return None
+
+
+    async def get_cache_meta_async(self, path):
+        if not self.caching_system:
+            return {}
+        cache_object = self.memory_cache.get(self.path_as_io(path), self.get_now_datetime().timestamp())
+        if not cache_object:
+            cache_object = await asyncio.to_thread(self.cache_db_class.get, self.path_as_io(path))
+        return cache_object
+
+
+    async def load_cache_data_async(self, cache_object):
+        if 'payload' in cache_object:
+            return self.load_cache_data(cache_object)
+        return await asyncio.to_thread(self.load_cache_data, cache_object)
+
+
+    async def execute_plan_async(self, plan, **kwargs):
+        """execute_plan on the event loop"""
+        self.bind_loop()
+        response = self.response_template()
+        path_url = plan.build(kwargs)
+
+        api_key = await self.ensure_api_key()
+        if api_key:
+            return api_key
+
+        if getattr(self, 'auto_cleanup_cache', False) and not self.is_janitor_running():
+            await asyncio.to_thread(self.evict_expired_cache, self.cache_cleanup_batch)
+
+        now_ts = self.get_now_datetime().timestamp()
+        cache_available = await self.get_cache_meta_async(path_url.name())
+        if cache_available and self.is_cache_fresh(cache_available, now_ts):
+            cache_data = await self.load_cache_data_async(cache_available)
+            if cache_data:
+                return self.get_cache_response(response, cache_available, cache_data)
+        elif cache_available and self.stale_while_revalidate and self.is_cache_fresh(
+                cache_available, now_ts - self.get_max_stale_seconds(plan)):
+            cache_data = await self.load_cache_data_async(cache_available)
+            if cache_data:
+                # refreshed by the background queue of WebService
+                refresh = partial(self.fetch_plan, plan, False, **kwargs)
+                self.refresh_queue.submit(path_url.name(), refresh)
+                response = self.get_cache_response(response, cache_available, cache_data)
+                response['stale'] = True
+                return response
+
+        if not self.single_flight:
+            return await self.fetch_plan_async(plan, **kwargs)
+        return await self.async_flights.do(
+            path_url.name(),
+            partial(self.fetch_plan_async, plan, **kwargs),
+            recheck = partial(asyncio.to_thread, self.get_fresh_cache_response, path_url.name()),
+        )
+
+
+    async def send_limited_async(self, send, *args, **kwargs):
+        """send_limited for the coroutines of the async client"""
+        started = await acquire_limiter(self.limiter)
+        try:
+            response = await send(*args, **kwargs)
+        except Exception:
+            self.limiter.release(started)
+            raise
+        self.limiter.release(started, response.status_code, response.headers.get('Retry-After'))
+        return response
+
+
+    async def fetch_plan_async(self, plan, fresh_api_key=False, **kwargs):
+        """fetch_plan over the async client"""
+        path_url = plan.build(kwargs)
+        response, cache_ttl = self.get_fetch_response(plan)
+
+        token = self.api_key.get('token')
+        async with self.semaphore:
+            connector = await self.send_limited_async(
+                self.client.request, plan.method.upper(), str(path_url), headers={"Authorization": f"Bearer {token}"}
+            )
+        if connector.status_code == STATUS_TOKEN_INVALID and not fresh_api_key:
+            api_key = await self.ensure_api_key(invalid_token=token)
+            if api_key:
+                return api_key
+            return await self.fetch_plan_async(plan, True, **kwargs)
+        # a 401 here already had a fresh token, get_response reports it
+        response = self.get_response(connector, plan, response, True, **kwargs)
+
+        if connector.status_code in [STATUS_SUCCESS, STATUS_SUCCESS_NO_REPLY]:
+            await asyncio.to_thread(self.save_cache, path_url.name(), response, self.get_keep_stale_seconds(plan), **cache_ttl)
+        return response
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cache file writes and reads in a large cache directory
+
+Fills a temporary directory with N cache files and measures new writes and
+reads of existing files for:
+- the flat layout (`.cache/<UUID>.json`, `os.listdir` on every write to
+  avoid name collisions)
+- the sharded, content-addressed blob store (`.cache/blobs/ab/cd/<sha256>.json`)
+
+Nothing is written to the real `.cache/` directory.
+
+Usage:
+    python benchmarks/bench_blob_store.py [--entries 10000,100000] [--ops N]
+"""
+
+import sys
+import os
+import json
+import time
+import uuid
+import random
+import tempfile
+import argparse
+
+# Add parent directory to path to import sister module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library.cache import SisterCache, CacheAsJson
+
+
+def get_payload(index):
+    return json.dumps([{'id': index, 'nama': f'benchmark {index}'}]).encode()
+
+
+def flat_write(cache_dir, content):
+    # how cache files were named before the blob store
+    unique_id = uuid.uuid4().hex[:15].upper()
+    while f'{unique_id}.json' in os.listdir(cache_dir):
+        unique_id = uuid.uuid4().hex[:15].upper()
+    filepath = os.path.join(cache_dir, f'{unique_id}.json')
+    with open(filepath, 'wb') as writer:
+        writer.write(content)
+    return filepath
+
+
+def read_file(filepath):
+    with open(filepath, 'r') as reader:
+        return json.load(reader)
+
+
+def per_op(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) * 1e6 / len(items)
+
+
+def run(entries, ops):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        flat_dir = os.path.join(tmp_dir, 'flat')
+        os.makedirs(flat_dir)
+        cache = SisterCache(cache_db_class=CacheAsJson)
+        cache.blob_dir = os.path.join(tmp_dir, 'blobs')
+
+        start = time.perf_counter()
+        flat_files, blob_files = [], []
+        for index in range(entries):
+            content = get_payload(index)
+            filepath = os.path.join(flat_dir, f'{uuid.uuid4().hex[:15].upper()}.json')
+            with open(filepath, 'wb') as writer:
+                writer.write(content)
+            flat_files.append(filepath)
+            blob_files.append(cache.write_blob(content))
+        print(f"  (filled in {time.perf_counter() - start:.1f}s)")
+
+        new_payloads = [get_payload(entries + index) for index in range(ops)]
+        flat_write_us = per_op(lambda content: flat_write(flat_dir, content), new_payloads)
+        blob_write_us = per_op(cache.write_blob, new_payloads)
+        dedup_write_us = per_op(cache.write_blob, new_payloads)
+
+        sample = random.sample(range(entries), min(ops, entries))
+        flat_read_us = per_op(read_file, [flat_files[x] for x in sample])
+        blob_read_us = per_op(read_file, [blob_files[x] for x in sample])
+
+    print(f"  write, flat (listdir)      : {flat_write_us:10.2f} µs/op")
+    print(f"  write, blob store          : {blob_write_us:10.2f} µs/op ({flat_write_us / blob_write_us:.0f}x)")
+    print(f"  write, blob store (dedup)  : {dedup_write_us:10.2f} µs/op")
+    print(f"  read, flat                 : {flat_read_us:10.2f} µs/op")
+    print(f"  read, blob store           : {blob_read_us:10.2f} µs/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark flat cache files vs sharded blob store')
+    parser.add_argument('--entries', type=str, default='10000,100000', help='Comma separated cache sizes')
+    parser.add_argument('--ops', type=int, default=200, help='Writes and reads measured per size')
+    args = parser.parse_args()
+
+    print("📊 Blob Store Benchmark")
+    print("=" * 60)
+    for entries in [int(x) for x in args.entries.split(',') if x.strip()]:
+        print(f"\n{entries} entries")
+        run(entries, args.ops)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cache file size vs read latency per codec
+
+Builds payloads shaped like SISTER responses (a small reference list, the
+SDM list and a per-SDM activity list), writes each one with every available
+codec and measures:
+- file size on disk and ratio to plain JSON
+- write time (encode + write)
+- read time (read + decode + json parse), what a cache hit from disk costs
+
+Nothing is written to the real `.cache/` directory.
+
+Usage:
+    python benchmarks/bench_cache_codec.py [--repeat N]
+"""
+
+import sys
+import os
+import json
+import time
+import uuid
+import hashlib
+import random
+import tempfile
+import argparse
+
+# Add parent directory to path to import sister module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library.cache import SisterCache, CacheAsJson
+from library.codec import CODECS
+
+
+def get_sdm(index):
+    return {
+        'id_sdm': str(uuid.uuid4()),
+        'nama_sdm': f'NAMA DOSEN {index}',
+        'nidn': f'{random.randint(0, 9999999999):010d}',
+        'nip': None if index % 3 else f'{random.randint(0, 10**17):018d}',
+        'nama_status_aktif': random.choice(['Aktif', 'Tugas Belajar', 'Cuti']),
+        'nama_status_pegawai': random.choice(['PNS', 'NON PNS']),
+        'jenis_sdm': 'Dosen',
+    }
+
+
+def get_activity(index):
+    return {
+        'id': str(uuid.uuid4()),
+        'judul': f'Penelitian tentang topik nomor {index} pada perguruan tinggi',
+        'tahun_pelaksanaan': random.randint(2010, 2024),
+        'lama_kegiatan': random.randint(1, 3),
+        'nama_skim': random.choice(['Penelitian Dasar', 'Penelitian Terapan', 'Hibah Internal']),
+        'tanggal_mulai': f'20{random.randint(10, 24)}-0{random.randint(1, 9)}-1{random.randint(0, 9)}',
+    }
+
+
+PAYLOADS = [
+    ('/referensi/agama', lambda: [{'id': i, 'nama': f'Agama {i}'} for i in range(7)]),
+    ('/referensi/sdm', lambda: [get_sdm(i) for i in range(2000)]),
+    ('/penelitian (per SDM)', lambda: [get_activity(i) for i in range(300)]),
+]
+
+
+def per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1e3 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cache codecs on realistic payloads')
+    parser.add_argument('--repeat', type=int, default=20, help='Reads/writes per payload and codec')
+    args = parser.parse_args()
+    random.seed(0)
+
+    print("📊 Cache Codec Benchmark")
+    print("=" * 72)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SisterCache(cache_db_class=CacheAsJson)
+        cache.blob_dir = tmp_dir
+        for name, get_payload in PAYLOADS:
+            content = json.dumps(get_payload()).encode()
+            print(f"\n{name} ({len(content) / 1024:.1f} KB JSON)")
+            print(f"  {'codec':6} {'size KB':>9} {'ratio':>7} {'write ms':>10} {'read ms':>9}")
+            for codec in CODECS:
+                blob_fpath = cache.get_blob_fpath(hashlib.sha256(content).hexdigest(), codec)
+                def write():
+                    # remove first, identical content would be skipped otherwise
+                    cache.remove_cache_file(blob_fpath)
+                    cache.write_blob(content, codec)
+                write_ms = per_call(write, args.repeat)
+                cache_object = {'id': name, 'filepath': blob_fpath, 'codec': codec}
+                read_ms = per_call(lambda: cache.read_cache_file(cache_object), args.repeat)
+                size = os.path.getsize(cache_object['filepath'])
+                print(f"  {codec:6} {size / 1024:9.1f} {len(content) / size:6.1f}x {write_ms:10.3f} {read_ms:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end cache-hit call, baseline versus this tree
+
+Seeds a cache entry for a few endpoints and times a full `SisterAPI.get_*`
+call answered from cache:
+- baseline: the tree before request plans (a git ref, by default the first
+  commit of the repository) exported with `git archive` and run in a
+  subprocess, i.e. `master_get_function` + `get_data` with the spec lookups,
+  `parse_path_url` and the JSON index read on every call
+- this tree: the same call through the compiled `RequestPlan`, answered by
+  the in-memory LRU tier and, with the tier turned off, from the cache files
+- request preparation alone (required-param check, URL and cache key)
+
+No request is sent to the SISTER server and the real cache is not touched,
+the entries are written to temporary directories.
+
+Usage:
+    python benchmarks/bench_request_plan.py [--calls N] [--baseline REF|none]
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import shutil
+import tarfile
+import argparse
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path to import sister module
+sys.path.append(ROOT_DIR)
+
+from api import WsSisterAPI
+from library.cache import CacheAsJson
+from settings import ENV_CONFIG
+
+
+ENDPOINTS = [
+    ('/referensi/agama', 'get_referensi_agama', {}),
+    ('/data_pribadi/profil/{id_sdm}', 'get_data_pribadi_profil_bypath', {'id_sdm': '8fe6735c-6e28-43e7-9eb3-3ae092bbcd62'}),
+    ('/referensi/unit_kerja', 'get_referensi_unit_kerja', {'id_perguruan_tinggi': '828fb966-3733-430e-86ff-909b764e2523'}),
+]
+PAYLOAD = [{'id': 1, 'nama': 'benchmark'}] * 20
+
+
+# runs inside the exported baseline tree, seeds its own .cache there and
+# prints the µs per cache-hit call of every endpoint
+BASELINE_DRIVER = '''
+import json, sys, time
+from api import WsSisterAPI
+
+endpoints, calls, payload = json.loads(sys.argv[1]), int(sys.argv[2]), json.loads(sys.argv[3])
+api = WsSisterAPI()
+api.enable_auto_cleanup(False)
+api.api_key = {'token': 'benchmark', 'expired_at': api.get_expired_datetime(isoformat=True, days=1)}
+results = {}
+for path, func_name, kwargs in endpoints:
+    params = api.check_required_param(path)[1]
+    cache_key = api.parse_path_url(path, __params__=params, **kwargs).name()
+    response = api.parse_response({**api.response_template(), 'data': payload})
+    api.save_cache(cache_key, response, **api.cache_expired_datetime)
+    func = getattr(api, func_name)
+    assert func(**kwargs)['cache'] == True
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(**kwargs)
+    results[path] = (time.perf_counter() - start) * 1e6 / calls
+print(json.dumps(results))
+'''
+
+
+def get_first_commit():
+    output = subprocess.run(['git', '-C', ROOT_DIR, 'rev-list', '--max-parents=0', 'HEAD'],
+                            check=True, capture_output=True, text=True).stdout
+    return output.split()[0]
+
+
+def export_tree(ref, tmp_dir):
+    archive = subprocess.run(['git', '-C', ROOT_DIR, 'archive', '--format=tar', ref],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        extract = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+        tar.extractall(tmp_dir, **extract)
+    # same credentials, settings.py aborts without them
+    env_file = os.path.join(ROOT_DIR, '.env')
+    if os.path.isfile(env_file):
+        shutil.copy(env_file, tmp_dir)
+
+
+def run_baseline(ref, calls):
+    """µs per cache-hit call of the tree at ref, None when it can not run"""
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_tree(ref, tmp_dir)
+            output = subprocess.run(
+                [sys.executable, '-c', BASELINE_DRIVER, json.dumps(ENDPOINTS), str(calls), json.dumps(PAYLOAD)],
+                cwd=tmp_dir, check=True, capture_output=True, text=True,
+            ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Baseline {ref} could not run: {getattr(e, 'stderr', None) or e}")
+        return None
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def plan_prepare(api, path, kwargs):
+    plan = api.get_plan(path)
+    plan.check_required(kwargs)
+    return plan.build(kwargs)
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def seed_cache(api, tmp_dir):
+    # benchmark payloads under real cache keys must never reach CACHE_DIR
+    api.cache_db_class = CacheAsJson()
+    api.cache_db_class.cache_db_filename = os.path.join(tmp_dir, 'cache_db.json')
+    api.blob_dir = os.path.join(tmp_dir, 'blobs')
+    api.api_key = {'token': 'benchmark', 'expired_at': api.get_expired_datetime(isoformat=True, days=1)}
+    for path, func_name, kwargs in ENDPOINTS:
+        plan = api.get_plan(path)
+        response = api.parse_response({**api.response_template(), 'data': PAYLOAD})
+        api.save_cache(plan.cache_key(kwargs), response, **api.cache_expired_datetime)
+
+
+def run(api, calls, baseline=None):
+    print("📊 Request Plan Benchmark")
+    print("=" * 60)
+    for path, func_name, kwargs in ENDPOINTS:
+        func = getattr(api, func_name)
+        assert func(**kwargs)['cache'] == True
+        memory = per_call(lambda: func(**kwargs), calls)
+        api.memory_cache.clear()
+        api.memory_cache.max_entries = 0
+        files = per_call(lambda: func(**kwargs), calls)
+        api.memory_cache.max_entries = ENV_CONFIG['cache_memory_entries']
+        planned = per_call(lambda: plan_prepare(api, path, kwargs), calls)
+        print(f"\n{path}")
+        before = baseline.get(path) if baseline else None
+        if before:
+            print(f"  cache-hit call, baseline   : {before:9.2f} µs/call")
+        for label, after in [('memory tier', memory), ('cache files', files)]:
+            speedup = f" ({before / after:.1f}x)" if before else ''
+            print(f"  cache-hit call, {label:<11}: {after:9.2f} µs/call{speedup}")
+        print(f"  prepare (request plan)     : {planned:9.2f} µs/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the end-to-end cache-hit call against a baseline')
+    parser.add_argument('--calls', type=int, default=5000, help='Calls per endpoint')
+    parser.add_argument('--baseline', default=None, help='Git ref of the baseline tree, default the first commit, none to skip')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline != 'none':
+        ref = args.baseline or get_first_commit()
+        print(f"Running baseline {ref}...")
+        baseline = run_baseline(ref, args.calls)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        api = WsSisterAPI()
+        api.enable_auto_cleanup(False)
+        seed_cache(api, tmp_dir)
+        run(api, args.calls, baseline)
+
+
+if __name__ == "__main__":
+    main()
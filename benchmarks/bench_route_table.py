@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SisterSpec route lookups
+
+Calls `get_path_params` for every path in the spec in a loop, using the
+route table and the previous linear filter over `paths.items()`.
+
+Usage:
+    python benchmarks/bench_route_table.py [--loops N]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Add parent directory to path to import sister module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from library.api_spec import SisterSpec
+
+
+def legacy_get_path_params(spec, path_name):
+    # lookup as it was done before the route table
+    paths = spec.get_paths()
+    path = list(filter(lambda x: x[0] == path_name, paths.items()))[0]
+    path_method, path_attr = [[method, attr] for method, attr in path[1].items()][0]
+    return spec.resolve_path_params(path_attr)
+
+
+def run(func, path_names, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        for path_name in path_names:
+            func(path_name)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SisterSpec route lookups')
+    parser.add_argument('--loops', type=int, default=100, help='Loops over all paths')
+    args = parser.parse_args()
+
+    spec = SisterSpec()
+    spec.routes  # route table is built once, at first use
+    path_names = list(spec.get_paths())
+    calls = len(path_names) * args.loops
+
+    print("📊 Route Table Benchmark")
+    print("=" * 50)
+    print(f"Paths: {len(path_names)}, calls: {calls}")
+
+    legacy = run(lambda x: legacy_get_path_params(spec, x), path_names, args.loops)
+    indexed = run(spec.get_path_params, path_names, args.loops)
+    print(f"Linear filter : {legacy * 1e6 / calls:9.2f} µs/call")
+    print(f"Route table   : {indexed * 1e6 / calls:9.2f} µs/call")
+    print(f"Speedup       : {legacy / indexed:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-process memory of the API spec
+
+Loads the full spec and a tag subset in fresh processes and reports RSS
+after building the route table, together with the compiled artifact
+size. Linux only (reads /proc/self/statm).
+
+Usage:
+    python benchmarks/bench_spec_memory.py [--tags referensi,data_pribadi]
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+
+# Add parent directory to path to import sister module
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from library import api_spec
+
+
+MEASURE = '''
+import os, sys, resource
+def rss_kb():
+    with open('/proc/self/statm') as reader:
+        return int(reader.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+from library.api_spec import SisterSpec
+before = rss_kb()
+spec = SisterSpec(tags=sys.argv[1])
+routes = spec.routes
+print(before, rss_kb(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, len(routes))
+'''
+
+
+def measure(tags):
+    # run twice, so the compiled artifact exists and the second run is a warm start
+    for _ in range(2):
+        output = subprocess.run(
+            [sys.executable, '-c', MEASURE, tags], cwd=ROOT_DIR,
+            check=True, capture_output=True, text=True,
+        ).stdout
+    before, after, peak, routes = [int(x) for x in output.split()[-4:]]
+    compiled_file = api_spec.get_compiled_file(api_spec.normalize_tags(tags))
+    return {
+        'rss_kb': after,
+        'spec_kb': after - before,
+        'peak_kb': peak,
+        'routes': routes,
+        'artifact_kb': os.path.getsize(compiled_file) // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-process API spec memory')
+    parser.add_argument('--tags', type=str, default='referensi,data_pribadi',
+                       help='Comma separated tags / first path segments')
+    args = parser.parse_args()
+
+    print("📊 API Spec Memory Benchmark")
+    print("=" * 60)
+    for label, tags in [('Full spec', ''), (f'Subset [{args.tags}]', args.tags)]:
+        result = measure(tags)
+        print(f"\n{label}")
+        print(f"  Routes           : {result['routes']}")
+        print(f"  Process RSS      : {result['rss_kb'] / 1024:8.1f} MB (peak {result['peak_kb'] / 1024:.1f} MB)")
+        print(f"  Spec + routes    : {result['spec_kb'] / 1024:8.1f} MB")
+        print(f"  Compiled artifact: {result['artifact_kb']:8d} KB")
+
+
+if __name__ == "__main__":
+    main()
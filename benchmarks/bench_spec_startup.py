@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API spec startup cost
+
+Compares parsing config/api_spec.yaml directly (the old behaviour) with
+loading the compiled spec artifact from CACHE_DIR, both in-process and as
+the wall time of a fresh `import api` in a subprocess.
+
+Usage:
+    python benchmarks/bench_spec_startup.py [--repeat N]
+"""
+
+import sys
+import os
+import time
+import argparse
+import subprocess
+import statistics
+import yaml
+
+# Add parent directory to path to import sister module
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from library import api_spec
+
+
+def timeit(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def load_yaml_pure_python():
+    # what every import used to pay before the compiled artifact
+    with open(api_spec.API_SPEC_FILE, 'r') as reader:
+        return yaml.safe_load(reader)
+
+
+def remove_compiled_spec():
+    if os.path.isfile(api_spec.API_SPEC_COMPILED_FILE):
+        os.remove(api_spec.API_SPEC_COMPILED_FILE)
+
+
+def import_time(repeat, cold):
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            remove_compiled_spec()
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import api'], cwd=ROOT_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API spec startup cost')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs per measurement')
+    args = parser.parse_args()
+
+    print("📊 API Spec Startup Benchmark")
+    print("=" * 50)
+
+    safe_load_time = timeit(load_yaml_pure_python, args.repeat)
+    yaml_time = timeit(api_spec.load_yaml_specs, args.repeat)
+    api_spec.get_specs()  # make sure the artifact exists
+    compiled_time = timeit(api_spec.get_specs, args.repeat)
+    print(f"yaml.safe_load (before)  : {safe_load_time * 1000:9.2f} ms")
+    print(f"Parse YAML (libyaml)     : {yaml_time * 1000:9.2f} ms")
+    print(f"Load compiled spec       : {compiled_time * 1000:9.2f} ms")
+    print(f"Speedup vs before        : {safe_load_time / compiled_time:9.1f}x")
+
+    cold_import = import_time(args.repeat, cold=True)
+    warm_import = import_time(args.repeat, cold=False)
+    print(f"\n`import api` (rebuild artifact) : {cold_import * 1000:9.2f} ms")
+    print(f"`import api` (compiled artifact): {warm_import * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ This script provides utilities to manage the cache system:
 - Clean up expired cache
 - Clear all cache
 - Delete specific cache entries
+- Run cache maintenance (janitor) in the foreground
 """
 
 import sys
@@ -28,6 +29,10 @@ Examples:
   python cache_manager.py --clear                   # Clear all cache
   python cache_manager.py --delete "/referensi/sdm" # Delete specific cache
   python cache_manager.py --auto-cleanup            # Enable auto cleanup
+  python cache_manager.py --migrate-sqlite          # Copy JSON index to SQLite
+  python cache_manager.py --migrate-blobs           # Move flat cache files to blob store
+  python cache_manager.py --janitor                 # Run cache maintenance until Ctrl+C
+  python cache_manager.py --janitor --once          # Run one maintenance pass
         """
     )
     
@@ -43,19 +48,35 @@ Examples:
                        help='Enable automatic cache cleanup')
     parser.add_argument('--disable-auto-cleanup', action='store_true',
                        help='Disable automatic cache cleanup')
+    parser.add_argument('--migrate-sqlite', action='store_true',
+                       help='Copy cache_db.json entries into cache_db.sqlite3')
+    parser.add_argument('--migrate-blobs', action='store_true',
+                       help='Move old flat cache files into the sharded blob store')
+    parser.add_argument('--janitor', action='store_true',
+                       help='Evict expired entries, enforce quota, remove orphan files and compact the index periodically')
+    parser.add_argument('--interval', type=int, metavar='SECONDS',
+                       help='Seconds between janitor passes (default: CACHE_JANITOR_INTERVAL_SECONDS)')
+    parser.add_argument('--once', action='store_true',
+                       help='Run a single janitor pass and exit')
     
     args = parser.parse_args()
     
     if not any([args.stats, args.cleanup, args.clear, args.delete, 
-                args.auto_cleanup, args.disable_auto_cleanup]):
+                args.auto_cleanup, args.disable_auto_cleanup, args.migrate_sqlite,
+                args.migrate_blobs, args.janitor]):
         parser.print_help()
         return
     
     try:
+        if args.migrate_sqlite:
+            migrate_sqlite()
+            return
+
         from library.webservice import WebService
         
-        # Initialize webservice
-        ws = WebService()
+        # Initialize webservice, without the background janitor of CACHE_JANITOR,
+        # --janitor runs its own in the foreground
+        ws = WebService(janitor=False)
         
         if args.stats:
             show_cache_stats(ws)
@@ -74,6 +95,12 @@ Examples:
         
         elif args.disable_auto_cleanup:
             enable_auto_cleanup(ws, False)
+        
+        elif args.migrate_blobs:
+            migrate_blobs(ws)
+        
+        elif args.janitor:
+            run_janitor(ws, args.interval, args.once)
             
     except ImportError as e:
         print(f"❌ Error importing modules: {e}")
@@ -149,6 +176,62 @@ def delete_specific_cache(ws, path):
         print(f"❌ No cache found for: {path}")
 
 
+def migrate_sqlite():
+    """Copy JSON cache index into SQLite cache index"""
+    from library.cache import CacheAsSQLite
+    print("🔄 Migrating cache_db.json to cache_db.sqlite3...")
+    
+    cache_db = CacheAsSQLite()
+    migrated = cache_db.migrate_from_json()
+    
+    print(f"✅ Migration completed!")
+    print(f"   Entries migrated: {migrated}")
+    print("   Set CACHE_BACKEND=sqlite in .env to use it")
+
+
+def migrate_blobs(ws):
+    """Move flat cache files into the sharded blob store"""
+    print("🔄 Moving cache files into .cache/blobs/...")
+    
+    migrated = ws.migrate_blobs()
+    
+    print(f"✅ Migration completed!")
+    print(f"   Cache files moved: {migrated}")
+
+
+def print_janitor_result(result):
+    print(f"🧹 [{result['started_at']}] janitor pass in {result['duration_seconds']}s")
+    print(f"   Expired entries removed: {result['expired_count']}")
+    print(f"   Evicted over quota: {result['quota_evicted']}")
+    print(f"   Orphan files removed: {result['orphan_files']} ({result['orphan_bytes']} bytes)")
+    print(f"   Dangling entries removed: {result['dangling_entries']}")
+    print(f"   Index compacted: {result['compacted']}")
+    if result['errors']:
+        print(f"   ⚠️  Errors: {result['errors']}")
+
+
+def run_janitor(ws, interval=None, once=False):
+    """Run cache maintenance in the foreground"""
+    from library.janitor import CacheJanitor
+    from settings import ENV_CONFIG
+    
+    janitor = CacheJanitor(
+        ws,
+        interval = interval or ENV_CONFIG['cache_janitor_interval_seconds'],
+        io_per_second = ENV_CONFIG['cache_janitor_io_per_second'],
+        metrics = print_janitor_result,
+    )
+    if once:
+        janitor.run_once()
+        return
+    
+    print(f"🔄 Cache janitor running every {janitor.interval}s, press Ctrl+C to stop")
+    try:
+        janitor.run()
+    except KeyboardInterrupt:
+        print("\n✅ Cache janitor stopped")
+
+
 def enable_auto_cleanup(ws, status):
     """Enable or disable automatic cache cleanup"""
     ws.enable_auto_cleanup(status)
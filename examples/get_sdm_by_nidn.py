@@ -172,221 +172,60 @@ def main():
             sdm_name = sdm_data['nama_sdm']
             
             # ========================================
-            # 2. DATA PRIBADI SDM
+            # 2. PROFIL LENGKAP SDM
             # ========================================
-            print_section("DATA PRIBADI SDM")
-            
-            print(f"\n👤 Mengambil data pribadi untuk: {sdm_name}")
-            
-            # Get profil SDM
-            try:
-                profil_sdm = api.get_data_pribadi_profil(id_sdm=sdm_id)
-                print_data(profil_sdm, "Profil SDM")
-            except Exception as e:
-                print(f"❌ Error mengambil profil SDM: {e}")
-            
-            # Get kependudukan data
-            try:
-                kependudukan = api.get_data_pribadi_kependudukan(id_sdm=sdm_id)
-                print_data(kependudukan, "Data Kependudukan")
-            except Exception as e:
-                print(f"❌ Error mengambil data kependudukan: {e}")
-            
-            # Get keluarga data
-            try:
-                keluarga = api.get_data_pribadi_keluarga(id_sdm=sdm_id)
-                print_data(keluarga, "Data Keluarga")
-            except Exception as e:
-                print(f"❌ Error mengambil data keluarga: {e}")
-            
-            # Get alamat data
-            try:
-                alamat = api.get_data_pribadi_alamat(id_sdm=sdm_id)
-                print_data(alamat, "Data Alamat")
-            except Exception as e:
-                print(f"❌ Error mengambil data alamat: {e}")
-            
-            # Get kepegawaian data
-            try:
-                kepegawaian = api.get_data_pribadi_kepegawaian(id_sdm=sdm_id)
-                print_data(kepegawaian, "Data Kepegawaian")
-            except Exception as e:
-                print(f"❌ Error mengambil data kepegawaian: {e}")
-            
-            # Get bidang ilmu
-            try:
-                bidang_ilmu = api.get_data_pribadi_bidang_ilmu(id_sdm=sdm_id)
-                print_data(bidang_ilmu, "Bidang Ilmu")
-            except Exception as e:
-                print(f"❌ Error mengambil bidang ilmu: {e}")
-            
-            # ========================================
-            # 3. TRIDHARMA (Penelitian, Pengabdian, Pengajaran)
-            # ========================================
-            print_section("TRIDHARMA")
-            
-            print(f"\n🔬 Mengambil data tridharma untuk: {sdm_name}")
-            
-            # Get penelitian data
-            try:
-                penelitian = api.get_penelitian(id_sdm=sdm_id)
-                print_data(penelitian, "Data Penelitian")
-            except Exception as e:
-                print(f"❌ Error mengambil data penelitian: {e}")
-            
-            # Get publikasi data
-            try:
-                publikasi = api.get_publikasi(id_sdm=sdm_id)
-                print_data(publikasi, "Data Publikasi")
-            except Exception as e:
-                print(f"❌ Error mengambil data publikasi: {e}")
-            
-            # Get pengabdian data
-            try:
-                pengabdian = api.get_pengabdian(id_sdm=sdm_id)
-                print_data(pengabdian, "Data Pengabdian")
-            except Exception as e:
-                print(f"❌ Error mengambil data pengabdian: {e}")
-            
-            # Get bahan ajar
-            try:
-                bahan_ajar = api.get_bahan_ajar(id_sdm=sdm_id)
-                print_data(bahan_ajar, "Data Bahan Ajar")
-            except Exception as e:
-                print(f"❌ Error mengambil data bahan ajar: {e}")
-            
-            # Get tugas tambahan
-            try:
-                tugas_tambahan = api.get_tugas_tambahan(id_sdm=sdm_id)
-                print_data(tugas_tambahan, "Data Tugas Tambahan")
-            except Exception as e:
-                print(f"❌ Error mengambil data tugas tambahan: {e}")
-            
-            # ========================================
-            # 4. PENDIDIKAN & RIWAYAT
-            # ========================================
-            print_section("PENDIDIKAN & RIWAYAT")
-            
-            print(f"\n🎓 Mengambil data pendidikan untuk: {sdm_name}")
-            
-            # Get pendidikan formal
-            try:
-                pendidikan_formal = api.get_pendidikan_formal(id_sdm=sdm_id)
-                print_data(pendidikan_formal, "Data Pendidikan Formal")
-            except Exception as e:
-                print(f"❌ Error mengambil data pendidikan formal: {e}")
-            
-            # Get diklat
-            try:
-                diklat = api.get_diklat(id_sdm=sdm_id)
-                print_data(diklat, "Data Diklat")
-            except Exception as e:
-                print(f"❌ Error mengambil data diklat: {e}")
-            
-            # Get riwayat pekerjaan
-            try:
-                riwayat_pekerjaan = api.get_riwayat_pekerjaan(id_sdm=sdm_id)
-                print_data(riwayat_pekerjaan, "Data Riwayat Pekerjaan")
-            except Exception as e:
-                print(f"❌ Error mengambil data riwayat pekerjaan: {e}")
-            
-            # Get sertifikasi profesi
-            try:
-                sertifikasi_profesi = api.get_sertifikasi_profesi(id_sdm=sdm_id)
-                print_data(sertifikasi_profesi, "Data Sertifikasi Profesi")
-            except Exception as e:
-                print(f"❌ Error mengambil data sertifikasi profesi: {e}")
-            
-            # ========================================
-            # 5. PENUNJANG
-            # ========================================
-            print_section("PENUNJANG")
-            
-            print(f"\n🏆 Mengambil data penunjang untuk: {sdm_name}")
-            
-            # Get anggota profesi
-            try:
-                anggota_profesi = api.get_anggota_profesi(id_sdm=sdm_id)
-                print_data(anggota_profesi, "Data Anggota Profesi")
-            except Exception as e:
-                print(f"❌ Error mengambil data anggota profesi: {e}")
-            
-            # Get penghargaan
-            try:
-                penghargaan = api.get_penghargaan(id_sdm=sdm_id)
-                print_data(penghargaan, "Data Penghargaan")
-            except Exception as e:
-                print(f"❌ Error mengambil data penghargaan: {e}")
-            
-            # Get pengelola jurnal
-            try:
-                pengelola_jurnal = api.get_pengelola_jurnal(id_sdm=sdm_id)
-                print_data(pengelola_jurnal, "Data Pengelola Jurnal")
-            except Exception as e:
-                print(f"❌ Error mengambil data pengelola jurnal: {e}")
-            
-            # Get visiting scientist
-            try:
-                visiting_scientist = api.get_visiting_scientist(id_sdm=sdm_id)
-                print_data(visiting_scientist, "Data Visiting Scientist")
-            except Exception as e:
-                print(f"❌ Error mengambil data visiting scientist: {e}")
-            
-            # ========================================
-            # 6. REWARD & KESEJAHTERAAN
-            # ========================================
-            print_section("REWARD & KESEJAHTERAAN")
-            
-            print(f"\n💰 Mengambil data reward untuk: {sdm_name}")
-            
-            # Get beasiswa
-            try:
-                beasiswa = api.get_beasiswa(id_sdm=sdm_id)
-                print_data(beasiswa, "Data Beasiswa")
-            except Exception as e:
-                print(f"❌ Error mengambil data beasiswa: {e}")
-            
-            # Get kesejahteraan
-            try:
-                kesejahteraan = api.get_kesejahteraan(id_sdm=sdm_id)
-                print_data(kesejahteraan, "Data Kesejahteraan")
-            except Exception as e:
-                print(f"❌ Error mengambil data kesejahteraan: {e}")
-            
-            # Get tunjangan
-            try:
-                tunjangan = api.get_tunjangan(id_sdm=sdm_id)
-                print_data(tunjangan, "Data Tunjangan")
-            except Exception as e:
-                print(f"❌ Error mengambil data tunjangan: {e}")
-            
-            # ========================================
-            # 7. DOKUMEN
-            # ========================================
-            print_section("DOKUMEN")
-            
-            print(f"\n📄 Mengambil data dokumen untuk: {sdm_name}")
-            
-            # Get dokumen list
-            try:
-                dokumen_list = api.get_dokumen(id_sdm=sdm_id)
-                print_data(dokumen_list, "Daftar Dokumen")
-            except Exception as e:
-                print(f"❌ Error mengambil data dokumen: {e}")
-            
-            # ========================================
-            # 8. BKD (BEBAN KERJA DOSEN)
-            # ========================================
-            print_section("BKD (BEBAN KERJA DOSEN)")
-            
-            print(f"\n📊 Mengambil data BKD untuk: {sdm_name}")
-            
-            # Get laporan akhir BKD
-            try:
-                laporan_bkd = api.get_bkd_laporan_akhir_bkd(id_sdm=sdm_id)
-                print_data(laporan_bkd, "Laporan Akhir BKD")
-            except Exception as e:
-                print(f"❌ Error mengambil laporan BKD: {e}")
+            # (judul section, [(judul data, section atau path)]), semua section
+            # diambil sekaligus dengan api.get_sdm_profiles
+            profile_sections = [
+                ("DATA PRIBADI SDM", [
+                    ("Profil SDM", 'profil'),
+                    ("Data Kependudukan", 'kependudukan'),
+                    ("Data Keluarga", 'keluarga'),
+                    ("Data Alamat", 'alamat'),
+                    ("Data Kepegawaian", 'kepegawaian'),
+                    ("Bidang Ilmu", 'bidang_ilmu'),
+                ]),
+                ("TRIDHARMA", [
+                    ("Data Penelitian", 'penelitian'),
+                    ("Data Publikasi", 'publikasi'),
+                    ("Data Pengabdian", 'pengabdian'),
+                    ("Data Bahan Ajar", 'bahan_ajar'),
+                    ("Data Tugas Tambahan", '/tugas_tambahan'),
+                ]),
+                ("PENDIDIKAN & RIWAYAT", [
+                    ("Data Pendidikan Formal", 'pendidikan_formal'),
+                    ("Data Diklat", '/diklat'),
+                    ("Data Riwayat Pekerjaan", '/riwayat_pekerjaan'),
+                    ("Data Sertifikasi Profesi", '/sertifikasi_profesi'),
+                ]),
+                ("PENUNJANG", [
+                    ("Data Anggota Profesi", '/anggota_profesi'),
+                    ("Data Penghargaan", 'penghargaan'),
+                    ("Data Pengelola Jurnal", '/pengelola_jurnal'),
+                    ("Data Visiting Scientist", '/visiting_scientist'),
+                ]),
+                ("REWARD & KESEJAHTERAAN", [
+                    ("Data Beasiswa", '/beasiswa'),
+                    ("Data Kesejahteraan", '/kesejahteraan'),
+                    ("Data Tunjangan", '/tunjangan'),
+                ]),
+                ("DOKUMEN", [
+                    ("Daftar Dokumen", '/dokumen'),
+                ]),
+                ("BKD (BEBAN KERJA DOSEN)", [
+                    ("Laporan Akhir BKD", '/bkd/laporan_akhir_bkd'),
+                ]),
+            ]
+            
+            print(f"\n👤 Mengambil profil lengkap untuk: {sdm_name}")
+            sections = [section for _, items in profile_sections for _, section in items]
+            # untuk banyak SDM sekaligus: for id_sdm, profile in api.get_sdm_profiles(id_sdm_list)
+            _, profile = next(api.get_sdm_profiles([sdm_id], sections=sections))
+            
+            for section_title, items in profile_sections:
+                print_section(section_title)
+                for title, section in items:
+                    print_data(profile[section], title)
             
             print_section("SELESAI")
             print("✅ Contoh pengambilan data SDM berdasarkan NIDN selesai!")
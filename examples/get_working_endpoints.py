@@ -46,6 +46,12 @@ def print_data(data, title="Data"):
     else:
         print(f"  {data}")
 
+def print_batch(api, calls):
+    """Run (title, function name, kwargs) calls with api.batch and print each result"""
+    results = api.batch([(name, kwargs) for _, name, kwargs in calls])
+    for (title, _, _), data in zip(calls, results):
+        print_data(data, title)
+
 def main():
     """Main function to demonstrate working endpoints"""
     print("🚀 Memulai Contoh Endpoint yang Berfungsi")
@@ -65,80 +71,29 @@ def main():
         sdm_list = api.get_referensi_sdm()
         print_data(sdm_list, "Daftar SDM")
         
-        # Get agama list (sudah terbukti berfungsi)
-        print("\n🙏 Mengambil data agama...")
-        agama_list = api.get_referensi_agama()
-        print_data(agama_list, "Daftar Agama")
-        
-        # Get gelar akademik
-        print("\n🎓 Mengambil data gelar akademik...")
-        gelar_akademik = api.get_referensi_gelar_akademik()
-        print_data(gelar_akademik, "Daftar Gelar Akademik")
-        
-        # Get jabatan fungsional
-        print("\n👨‍🏫 Mengambil data jabatan fungsional...")
-        jabatan_fungsional = api.get_referensi_jabatan_fungsional()
-        print_data(jabatan_fungsional, "Daftar Jabatan Fungsional")
-        
-        # Get jenis publikasi
-        print("\n📝 Mengambil data jenis publikasi...")
-        jenis_publikasi = api.get_referensi_jenis_publikasi()
-        print_data(jenis_publikasi, "Daftar Jenis Publikasi")
-        
-        # Get jenis dokumen
-        print("\n📄 Mengambil data jenis dokumen...")
-        jenis_dokumen = api.get_referensi_jenis_dokumen()
-        print_data(jenis_dokumen, "Daftar Jenis Dokumen")
-        
-        # Get jenis tunjangan
-        print("\n💵 Mengambil data jenis tunjangan...")
-        jenis_tunjangan = api.get_referensi_jenis_tunjangan()
-        print_data(jenis_tunjangan, "Daftar Jenis Tunjangan")
-        
-        # Get jenis penghargaan
-        print("\n🏆 Mengambil data jenis penghargaan...")
-        jenis_penghargaan = api.get_referensi_jenis_penghargaan()
-        print_data(jenis_penghargaan, "Daftar Jenis Penghargaan")
-        
-        # Get jenis kepanitiaan
-        print("\n👥 Mengambil data jenis kepanitiaan...")
-        jenis_kepanitiaan = api.get_referensi_jenis_kepanitiaan()
-        print_data(jenis_kepanitiaan, "Daftar Jenis Kepanitiaan")
-        
-        # Get jenis jabatan negara
-        print("\n🏛️ Mengambil data jenis jabatan negara...")
-        jenis_jabatan_negara = api.get_referensi_jabatan_negara()
-        print_data(jenis_jabatan_negara, "Daftar Jenis Jabatan Negara")
-        
-        # Get ikatan kerja
-        print("\n💼 Mengambil data ikatan kerja...")
-        ikatan_kerja = api.get_referensi_ikatan_kerja()
-        print_data(ikatan_kerja, "Daftar Ikatan Kerja")
-        
-        # Get status kepegawaian
-        print("\n👨‍💼 Mengambil data status kepegawaian...")
-        status_kepegawaian = api.get_referensi_status_kepegawaian()
-        print_data(status_kepegawaian, "Daftar Status Kepegawaian")
-        
-        # Get sumber gaji
-        print("\n💳 Mengambil data sumber gaji...")
-        sumber_gaji = api.get_referensi_sumber_gaji()
-        print_data(sumber_gaji, "Daftar Sumber Gaji")
-        
-        # Get jenjang pendidikan
-        print("\n🎓 Mengambil data jenjang pendidikan...")
-        jenjang_pendidikan = api.get_referensi_jenjang_pendidikan()
-        print_data(jenjang_pendidikan, "Daftar Jenjang Pendidikan")
-        
-        # Get tingkat penghargaan
-        print("\n🏅 Mengambil data tingkat penghargaan...")
-        tingkat_penghargaan = api.get_referensi_tingkat_penghargaan()
-        print_data(tingkat_penghargaan, "Daftar Tingkat Penghargaan")
+        # Referensi lain diambil sekaligus, total waktu kira-kira satu request terlama
+        print("\n📚 Mengambil data referensi lain sekaligus...")
+        print_batch(api, [
+            ("Daftar Agama", 'get_referensi_agama', {}),
+            ("Daftar Gelar Akademik", 'get_referensi_gelar_akademik', {}),
+            ("Daftar Jabatan Fungsional", 'get_referensi_jabatan_fungsional', {}),
+            ("Daftar Jenis Publikasi", 'get_referensi_jenis_publikasi', {}),
+            ("Daftar Jenis Dokumen", 'get_referensi_jenis_dokumen', {}),
+            ("Daftar Jenis Tunjangan", 'get_referensi_jenis_tunjangan', {}),
+            ("Daftar Jenis Penghargaan", 'get_referensi_jenis_penghargaan', {}),
+            ("Daftar Jenis Kepanitiaan", 'get_referensi_jenis_kepanitiaan', {}),
+            ("Daftar Jenis Jabatan Negara", 'get_referensi_jabatan_negara', {}),
+            ("Daftar Ikatan Kerja", 'get_referensi_ikatan_kerja', {}),
+            ("Daftar Status Kepegawaian", 'get_referensi_status_kepegawaian', {}),
+            ("Daftar Sumber Gaji", 'get_referensi_sumber_gaji', {}),
+            ("Daftar Jenjang Pendidikan", 'get_referensi_jenjang_pendidikan', {}),
+            ("Daftar Tingkat Penghargaan", 'get_referensi_tingkat_penghargaan', {}),
+        ])
         
         # ========================================
-        # 2. DATA SDM DETAIL (jika ada SDM)
+        # 2. DATA SDM DETAIL, TRIDHARMA, PENDIDIKAN & RIWAYAT (jika ada SDM)
         # ========================================
-        print_section("DATA SDM DETAIL")
+        print_section("DATA SDM DETAIL, TRIDHARMA, PENDIDIKAN & RIWAYAT")
         
         if sdm_list and len(sdm_list) > 0:
             first_sdm = sdm_list[0]
@@ -146,81 +101,20 @@ def main():
             sdm_name = first_sdm['nama_sdm']  # Perbaiki field name
             
             print(f"\n👤 Mengambil detail data untuk SDM: {sdm_name}")
-            
-            # Get profil SDM
-            try:
-                profil_sdm = api.get_data_pribadi_profil(id_sdm=sdm_id)
-                print_data(profil_sdm, "Profil SDM")
-            except Exception as e:
-                print(f"❌ Error mengambil profil SDM: {e}")
-            
-            # Get kependudukan data
-            try:
-                kependudukan = api.get_data_pribadi_kependudukan(id_sdm=sdm_id)
-                print_data(kependudukan, "Data Kependudukan")
-            except Exception as e:
-                print(f"❌ Error mengambil data kependudukan: {e}")
-            
-            # Get bidang ilmu
-            try:
-                bidang_ilmu = api.get_data_pribadi_bidang_ilmu(id_sdm=sdm_id)
-                print_data(bidang_ilmu, "Bidang Ilmu")
-            except Exception as e:
-                print(f"❌ Error mengambil bidang ilmu: {e}")
-        
-        # ========================================
-        # 3. TRIDHARMA (jika ada SDM)
-        # ========================================
-        print_section("TRIDHARMA")
-        
-        if sdm_list:
-            sdm_id = sdm_list[0]['id_sdm']
-            
-            # Get penelitian data
-            try:
-                penelitian = api.get_penelitian(id_sdm=sdm_id)
-                print_data(penelitian, "Data Penelitian")
-            except Exception as e:
-                print(f"❌ Error mengambil data penelitian: {e}")
-            
-            # Get publikasi data
-            try:
-                publikasi = api.get_publikasi(id_sdm=sdm_id)
-                print_data(publikasi, "Data Publikasi")
-            except Exception as e:
-                print(f"❌ Error mengambil data publikasi: {e}")
-            
-            # Get bahan ajar
-            try:
-                bahan_ajar = api.get_bahan_ajar(id_sdm=sdm_id)
-                print_data(bahan_ajar, "Data Bahan Ajar")
-            except Exception as e:
-                print(f"❌ Error mengambil data bahan ajar: {e}")
-        
-        # ========================================
-        # 4. PENDIDIKAN & RIWAYAT (jika ada SDM)
-        # ========================================
-        print_section("PENDIDIKAN & RIWAYAT")
-        
-        if sdm_list:
-            sdm_id = sdm_list[0]['id_sdm']
-            
-            # Get pendidikan formal
-            try:
-                pendidikan_formal = api.get_pendidikan_formal(id_sdm=sdm_id)
-                print_data(pendidikan_formal, "Data Pendidikan Formal")
-            except Exception as e:
-                print(f"❌ Error mengambil data pendidikan formal: {e}")
-            
-            # Get diklat
-            try:
-                diklat = api.get_diklat(id_sdm=sdm_id)
-                print_data(diklat, "Data Diklat")
-            except Exception as e:
-                print(f"❌ Error mengambil data diklat: {e}")
+            # error per endpoint dikembalikan sebagai response, tidak menghentikan yang lain
+            print_batch(api, [
+                ("Profil SDM", 'get_data_pribadi_profil', {'id_sdm': sdm_id}),
+                ("Data Kependudukan", 'get_data_pribadi_kependudukan', {'id_sdm': sdm_id}),
+                ("Bidang Ilmu", 'get_data_pribadi_bidang_ilmu', {'id_sdm': sdm_id}),
+                ("Data Penelitian", 'get_penelitian', {'id_sdm': sdm_id}),
+                ("Data Publikasi", 'get_publikasi', {'id_sdm': sdm_id}),
+                ("Data Bahan Ajar", 'get_bahan_ajar', {'id_sdm': sdm_id}),
+                ("Data Pendidikan Formal", 'get_pendidikan_formal', {'id_sdm': sdm_id}),
+                ("Data Diklat", 'get_diklat', {'id_sdm': sdm_id}),
+            ])
         
         # ========================================
-        # 5. CACHE STATISTICS
+        # 3. CACHE STATISTICS
         # ========================================
         print_section("CACHE STATISTICS")
         
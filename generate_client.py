@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Sister API Client - Static Client Generator
+
+Reads config/api_spec.yaml and writes a plain Python module with one typed
+function per path. The generated module imports without loading the YAML
+spec, and IDEs / type checkers can see the whole API surface.
+"""
+
+import sys
+import os
+import argparse
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(__file__))
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sister_client.py')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a static Sister API client module from the API spec',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python generate_client.py                          # Write sister_client.py
+  python generate_client.py --output my_client.py   # Write to another file
+        """
+    )
+    parser.add_argument('--output', type=str, metavar='FILE', default=DEFAULT_OUTPUT,
+                       help='Output module path (default: sister_client.py)')
+
+    args = parser.parse_args()
+
+    try:
+        from library.codegen import ClientGenerator
+
+        generator = ClientGenerator()
+        filename = generator.write(args.output)
+        print(f"✅ Generated {len(generator.spec.functions)} functions")
+        print(f"   {filename}")
+
+    except ImportError as e:
+        print(f"❌ Error importing modules: {e}")
+        print("Make sure you're in the correct directory and virtual environment is activated")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import asyncio
+from library.flight import SingleFlight
+from settings import ENV_CONFIG
+
+try:
+    import httpx
+except ImportError: # optional, pip install httpx, only needed by AsyncSisterAPI
+    httpx = None
+
+
+async def acquire_limiter(limiter, poll_interval=0.05):
+    """RateLimiter.acquire without blocking the event loop or a thread"""
+    started, wait = limiter.try_acquire()
+    while started is None:
+        # a full in-flight limit has no known end, look again after poll_interval
+        await asyncio.sleep(poll_interval if wait is None else wait)
+        started, wait = limiter.try_acquire()
+    return started
+
+
+def get_async_client(timeout=None, connect_timeout=None, max_retries=None, pool_size=None):
+    """httpx.AsyncClient with the same timeouts and pool size as SisterSession"""
+    if httpx is None:
+        raise ImportError("AsyncSisterAPI needs httpx, install it with: pip install httpx")
+    pool_size = pool_size or ENV_CONFIG['http_pool_size']
+    return httpx.AsyncClient(
+        headers = {"Accept": "application/json", "Content-Type": "application/json"},
+        timeout = httpx.Timeout(
+            ENV_CONFIG['api_timeout_seconds'] if timeout is None else timeout,
+            connect = ENV_CONFIG['api_connect_timeout_seconds'] if connect_timeout is None else connect_timeout,
+        ),
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        # httpx retries failed connects only, 5xx are returned as they are
+        transport = httpx.AsyncHTTPTransport(retries=ENV_CONFIG['max_retries'] if max_retries is None else max_retries),
+    )
+
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop, followers await the leader's task"""
+
+    def __init__(self):
+        self.flights = {}
+
+
+    async def do(self, key, func, recheck=None):
+        task = self.flights.get(key)
+        if task is not None:
+            # shield, a cancelled follower must not cancel the leader's request
+            return SingleFlight.share(await asyncio.shield(task))
+        task = self.flights[key] = asyncio.ensure_future(self.lead(func, recheck))
+        task.add_done_callback(lambda _: self.flights.get(key) is task and self.flights.pop(key))
+        return await asyncio.shield(task)
+
+
+    async def lead(self, func, recheck=None):
+        result = await recheck() if recheck else None
+        if not result:
+            result = await func()
+        return result
@@ -1,16 +1,27 @@
-import yaml
 import os
+import re
+import pickle
+import hashlib
+import tempfile
+import threading
 from settings import *
 
 
 API_SPEC_FILE = os.path.join(CONFIG_DIR, 'api_spec.yaml')
+API_SPEC_COMPILED_FILE = os.path.join(CACHE_DIR, 'api_spec.pickle')
+# bump when the layout of the compiled artifact changes
+API_SPEC_COMPILED_VERSION = 1
 
 
-def get_specs():
+def load_yaml_specs():
+    # yaml is only needed when the compiled artifact has to be rebuilt
+    import yaml
+    # libyaml loader is several times faster, fallback to pure python
+    yaml_loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
     spec = None
     try:
         with open(API_SPEC_FILE, 'r') as reader:
-            spec = yaml.safe_load(reader)
+            spec = yaml.load(reader, Loader=yaml_loader)
     except FileNotFoundError:
         raise FileNotFoundError(f"API spec file not found: {API_SPEC_FILE}")
     except yaml.YAMLError as e:
@@ -20,13 +31,285 @@ def get_specs():
     return spec
 
 
+def get_spec_fingerprint():
+    """Cheap identity of the YAML file, used before hashing its content"""
+    try:
+        stat = os.stat(API_SPEC_FILE)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"API spec file not found: {API_SPEC_FILE}")
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def get_spec_checksum():
+    with open(API_SPEC_FILE, 'rb') as reader:
+        return hashlib.sha256(reader.read()).hexdigest()
+
+
+def normalize_tag(tag):
+    # "Data Pokok" -> data_pokok
+    return re.sub(r'[\s\-]+', '_', str(tag).strip().lower())
+
+
+def normalize_tags(tags=None):
+    tags = tags or ()
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return tuple(sorted(set(normalize_tag(x) for x in tags if str(x).strip())))
+
+
+def get_compiled_file(tags=None):
+    if not tags:
+        return API_SPEC_COMPILED_FILE
+    return os.path.join(CACHE_DIR, f"api_spec.{'+'.join(tags)}.pickle")
+
+
+def read_compiled_specs(tags=None):
+    compiled = {}
+    compiled_file = get_compiled_file(tags)
+    if os.path.isfile(compiled_file):
+        try:
+            with open(compiled_file, 'rb') as reader:
+                compiled = pickle.load(reader)
+        except Exception as e:
+            print(f"Error reading compiled API spec, rebuilding: {e}")
+            compiled = {}
+    if not isinstance(compiled, dict) or compiled.get('version') != API_SPEC_COMPILED_VERSION:
+        compiled = {}
+    return compiled
+
+
+def write_compiled_specs(compiled, tags=None):
+    # write to temporary file first, so concurrent readers never see half a file
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix='.api_spec.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as writer:
+            pickle.dump(compiled, writer, protocol=pickle.HIGHEST_PROTOCOL)
+        # mkstemp creates 0600, readable by other users like the cache index
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, get_compiled_file(tags))
+    except Exception as e:
+        print(f"Error writing compiled API spec: {e}")
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def path_matches_tags(path_name, path_attr, tags):
+    # a selector is either a spec tag (data_pokok) or the first path segment (data_pribadi)
+    if normalize_tag(path_name.strip('/').split('/')[0]) in tags:
+        return True
+    for method_attr in path_attr.values():
+        if isinstance(method_attr, dict):
+            for tag in method_attr.get('tags', []):
+                if normalize_tag(tag) in tags:
+                    return True
+    return False
+
+
+def collect_refs(node, refs):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('$ref'), str):
+                refs.add(node['$ref'])
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return refs
+
+
+def strip_descriptions(node, is_properties=False):
+    # keep "description" when it is a schema property name, not documentation
+    if isinstance(node, dict):
+        return {
+            key: strip_descriptions(value, key == 'properties' and not is_properties)
+            for key, value in node.items()
+            if is_properties or not (key == 'description' and isinstance(value, str))
+        }
+    if isinstance(node, list):
+        return [strip_descriptions(value) for value in node]
+    return node
+
+
+def subset_specs(spec, tags):
+    """Only the paths of the selected tags, the components they reference and no descriptions"""
+    paths = {
+        path_name: path_attr for path_name, path_attr in spec.get('paths', {}).items()
+        if path_matches_tags(path_name, path_attr, tags)
+    }
+    # follow references transitively, components can reference other components
+    resolver = SpecResolver(spec)
+    refs, pending = set(), collect_refs(paths, set())
+    while pending:
+        ref = pending.pop()
+        refs.add(ref)
+        pending |= collect_refs(resolver.get_reference(ref), set()) - refs
+
+    components = {'securitySchemes': spec.get('components', {}).get('securitySchemes', {})}
+    for ref in refs:
+        section, name = ref[len('#/components/'):].split('/', 1)
+        components.setdefault(section, {})[name] = resolver.get_reference(ref)
+
+    used_tags = set()
+    for path_attr in paths.values():
+        for method_attr in path_attr.values():
+            if isinstance(method_attr, dict):
+                used_tags.update(method_attr.get('tags', []))
+
+    subset = {
+        'openapi': spec.get('openapi'),
+        'info': {key: value for key, value in spec.get('info', {}).items() if key != 'description'},
+        'servers': spec.get('servers'),
+        'tags': [x for x in spec.get('tags', []) if x['name'] in used_tags],
+        'paths': paths,
+        'components': components,
+    }
+    return strip_descriptions(subset)
+
+
+def compile_specs(fingerprint=None, checksum=None, tags=None):
+    """Parse the YAML spec and store it as a pickled artifact in CACHE_DIR"""
+    if tags:
+        spec = subset_specs(get_specs(), tags)
+    else:
+        spec = load_yaml_specs()
+    compiled = {
+        'version': API_SPEC_COMPILED_VERSION,
+        'fingerprint': fingerprint or get_spec_fingerprint(),
+        'checksum': checksum or get_spec_checksum(),
+        'tags': tags,
+        'spec': spec,
+    }
+    write_compiled_specs(compiled, tags)
+    return compiled
+
+
+def get_specs(tags=None):
+    tags = normalize_tags(tags)
+    fingerprint = get_spec_fingerprint()
+    compiled = read_compiled_specs(tags)
+    if compiled and compiled.get('fingerprint') == fingerprint:
+        return compiled['spec']
+    # mtime or size changed, the content might still be the same (e.g. touch, checkout)
+    checksum = get_spec_checksum()
+    if compiled and compiled.get('checksum') == checksum:
+        compiled['fingerprint'] = fingerprint
+        write_compiled_specs(compiled, tags)
+        return compiled['spec']
+    return compile_specs(fingerprint, checksum, tags)['spec']
+
+
+
+def path_to_function_name(path):
+    # /data_pribadi/profil/{id_sdm} -> get_data_pribadi_profil_bypath
+    isb_format  = r"[/]{([^{}]+)}" # inside curly bracket
+    func_name   = re.sub(r"\/", '_', path)
+    url_paths   = re.findall(isb_format, path)
+    for url_path in url_paths:
+        func_name = func_name.replace(f'{{{url_path}}}', 'bypath')
+    # remove _ in first func_name
+    if func_name.startswith('_'):
+        func_name = func_name[1:]
+    return f'get_{func_name}'
+
+
+
+class SpecResolver:
+    """Dereference local `#/components/...` references, memoized per spec"""
+
+    def __init__(self, api_spec):
+        self.api_spec = api_spec
+        self.resolved = {}
+
+
+    def get_reference(self, ref):
+        if not ref.startswith('#/'):
+            raise ValueError(f"Only local references are supported: {ref}")
+        node = self.api_spec
+        for reference in ref[2:].split('/'):
+            # JSON pointer escaping
+            reference = reference.replace('~1', '/').replace('~0', '~')
+            try:
+                node = node[reference]
+            except (KeyError, IndexError, TypeError):
+                raise ValueError(f"Reference not found in API specification: {ref}")
+        return node
+
+
+    def resolve_ref(self, ref):
+        resolved = self.resolved.get(ref)
+        if resolved is None:
+            target = self.get_reference(ref)
+            if isinstance(target, dict) and '$ref' not in target:
+                # register before walking, so recursive schemas point to the same object
+                resolved = self.resolved[ref] = {}
+                resolved.update(self.resolve(target))
+            else:
+                resolved = self.resolved[ref] = self.resolve(target)
+        return resolved
+
+
+    def resolve(self, node):
+        if isinstance(node, dict):
+            if '$ref' in node:
+                return self.resolve_ref(node['$ref'])
+            return {key: self.resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [self.resolve(value) for value in node]
+        return node
+
+
 
 class BaseSpec:
-    # remember about memory use
-    get_specs = get_specs()
+    # remember about memory use, spec is loaded once and shared by all instances
+    # keyed by tag selection, () is the full spec
+    specs = {}
+    specs_lock = threading.Lock()
+    resolvers = {}
+
+    def __init__(self, tags=None):
+        # narrow workers can load only some tags, see SISTER_SPEC_TAGS
+        if tags is None:
+            tags = ENV_CONFIG['spec_tags']
+        self.tags = normalize_tags(tags)
+        self._api_spec = None
+
+
+    @classmethod
+    def get_specs(cls, tags=()):
+        spec = cls.specs.get(tags)
+        if spec is None:
+            with cls.specs_lock:
+                spec = cls.specs.get(tags)
+                if spec is None:
+                    spec = cls.specs[tags] = get_specs(tags)
+        return spec
+
 
-    def __init__(self):
-        self.api_spec = self.get_specs
+    @property
+    def api_spec(self):
+        # loaded on first use, so constructing a spec object costs nothing
+        if self._api_spec is None:
+            self._api_spec = self.get_specs(self.tags)
+        return self._api_spec
+
+
+    @property
+    def resolver(self):
+        # one resolver per loaded spec, shared by every instance using it
+        resolver = self.resolvers.get(id(self.api_spec))
+        if resolver is None:
+            with self.specs_lock:
+                resolver = self.resolvers.setdefault(id(self.api_spec), SpecResolver(self.api_spec))
+        return resolver
+
+
+    def resolve(self, node):
+        return self.resolver.resolve(node)
 
 
     def get_spec(self, name):
@@ -41,6 +324,44 @@ class BaseSpec:
 
 class SisterSpec(BaseSpec):
 
+    def __init__(self, tags=None):
+        super().__init__(tags)
+        self._routes = None
+        self._functions = None
+
+
+    @property
+    def routes(self) -> dict:
+        if self._routes is None:
+            self.build_route_table()
+        return self._routes
+
+
+    @property
+    def functions(self) -> dict:
+        if self._functions is None:
+            self.build_route_table()
+        return self._functions
+
+
+    def build_route_table(self):
+        # index every path once, so lookups on the request path are dict hits
+        routes, functions = {}, {}
+        for path_name, path_attr in (self.get_paths() or {}).items():
+            path_method, method_attr = list(path_attr.items())[0]
+            function_name = path_to_function_name(path_name)
+            routes[path_name] = {
+                'path': path_name,
+                'method': path_method,
+                'attr': method_attr,
+                'params': self.resolve_path_params(method_attr),
+                'function': function_name,
+            }
+            functions[function_name] = path_name
+        self._routes, self._functions = routes, functions
+        return routes
+
+
     def get_openapi(self) -> str:
         return self.get_spec('openapi')
 
@@ -76,39 +397,35 @@ class SisterSpec(BaseSpec):
 
 
     def get_path(self, path_name) -> tuple:
-        paths = self.get_paths()
-        paths = list(filter(lambda x: x[0] == path_name, paths.items()))
-        path  = None
-        if len(paths) > 0:
-            path = paths[0]
+        path_attr = self.get_paths().get(path_name)
+        path = None
+        if path_attr is not None:
+            path = (path_name, path_attr)
         return path
 
 
-    def get_path_method_and_attr(self, path_name):
-        path_result = self.get_path(path_name)
-        if not path_result:
+    def get_route(self, path_name) -> dict:
+        route = self.routes.get(path_name)
+        if not route:
             raise ValueError(f"Path '{path_name}' not found in API specification")
-        path_name, path_attr = path_result
-        path_method, path_attr = [[method, attr] for method, attr in path_attr.items()][0]
-        return (path_method, path_attr)
+        return route
+
+
+    def get_path_by_function(self, function_name):
+        return self.functions.get(function_name)
+
+
+    def get_path_method_and_attr(self, path_name):
+        route = self.get_route(path_name)
+        return (route['method'], route['attr'])
+
+
+    def resolve_path_params(self, path_attr):
+        return self.resolve(path_attr.get('parameters') or [])
 
 
     def get_path_params(self, path_name):
-        params = []
-        (path_method, path_attr) = self.get_path_method_and_attr(path_name)
-        if 'parameters' in path_attr:
-            refered_params = None
-            params = path_attr['parameters']
-            for param in params:
-                if '$ref' in param:
-                    references = param['$ref'].replace('#', '').split('/')
-                    references = list(filter(lambda x: len(x) > 0, references))
-                    refered_params = self.get_spec(references[0])
-                    for reference in references[1:]:
-                        refered_params = refered_params[reference]
-            if refered_params:
-                params = [refered_params]
-        return params
+        return self.get_route(path_name)['params']
 
 
     def get_components(self) -> list:
@@ -119,4 +436,8 @@ class SisterSpec(BaseSpec):
         components = self.get_spec('components')
         components = filter(lambda x: x[0] == component_name, components.items())
         component  = list(components)[0]
-        return component
\ No newline at end of file
+        return component
+
+
+    def get_schema(self, schema_name) -> dict:
+        return self.resolver.resolve_ref(f'#/components/schemas/{schema_name}')
\ No newline at end of file
@@ -1,9 +1,37 @@
 from library.template import SisterTemplate
+from library.codec import CODECS, CODEC_ERRORS, get_codec
 from settings import *
-import json, os, re
+import json, os, re, time
 import uuid 
 import threading
 import fcntl
+import sqlite3
+import hashlib
+import heapq
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from datetime import datetime
+
+
+CACHE_BLOB_DIR = os.path.join(CACHE_DIR, 'blobs')
+
+
+def write_locked(method):
+    # read, modify and rewrite of the index by one thread at a time, and by
+    # one process at a time through the flock of index_locked
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock, self.index_locked():
+            self.sync_expiry_heap()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                # our own writes are in the heap already
+                self.index_stat = self.get_index_stat()
+    return wrapper
+
 
 
 class AttrDict(dict):
@@ -18,6 +46,22 @@ class CacheAsJson:
     def __init__(self):
         self.cache_db_filename = os.path.join(CACHE_DIR,  'cache_db.json')
         self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self.index_lock_file = None
+        self.expiry_heap = None # (evict_ts, cache_id), built on first eviction
+        self.expiry_heap_ts = 0
+        self.index_stat = None # (mtime, size) of the index after our last write
+        self.touches = {} # cache_id: (hits, accessed_ts) not flushed yet
+        self.flushed_ts = time.time()
+
+
+    # the heap only knows entries written by this instance, it is rebuilt when
+    # another process changed the index and at least every expiry_heap_max_age
+    expiry_heap_max_age = 300
+
+    # cache hits are recorded in memory and written in one go, a hit never rewrites the index
+    touch_batch = 100
+    touch_interval = 60
 
 
     def get_unique_id(self, length=15):
@@ -29,17 +73,15 @@ class CacheAsJson:
     def read_db(self, cache_id: str = ''):
         db_object = {}
         # check saved db object
+        # writers replace the whole file, a reader sees the old or the new index
         if os.path.isfile(self.cache_db_filename):
             try:
                 with open(self.cache_db_filename, 'r') as reader:
-                    fcntl.flock(reader.fileno(), fcntl.LOCK_SH)  # Shared lock for reading
-                    try:
-                        db_object = json.load(reader)
-                    finally:
-                        fcntl.flock(reader.fileno(), fcntl.LOCK_UN)  # Release lock
-            except json.decoder.JSONDecodeError:
-                os.remove(self.cache_db_filename)
+                    db_object = json.load(reader)
+            except FileNotFoundError:
+                pass
             except Exception as e:
+                # a broken index is a miss and never removed, the next write replaces it
                 print(f"Error reading cache file: {e}")
         if cache_id and db_object:
             cache_object = db_object.get(cache_id)
@@ -49,6 +91,60 @@ class CacheAsJson:
             return db_object
 
 
+    def get_index_stat(self):
+        try:
+            stat = os.stat(self.cache_db_filename)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+    @contextmanager
+    def index_locked(self):
+        # the index itself is replaced on every write, so processes lock a
+        # file next to it, nested write_locked calls reuse the held lock
+        if self.index_lock_file is not None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.cache_db_filename), exist_ok=True)
+        with open(f'{self.cache_db_filename}.lock', 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            self.index_lock_file = lock_file
+            try:
+                yield
+            finally:
+                self.index_lock_file = None
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+    def dump_db(self, db_object):
+        """Replace the index with db_object, the caller holds index_locked"""
+        fd, tmp_fpath = tempfile.mkstemp(dir=os.path.dirname(self.cache_db_filename), prefix='.cache_db.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as writer:
+                json.dump(db_object, writer)
+                writer.flush()
+                os.fsync(writer.fileno())
+            os.chmod(tmp_fpath, 0o644)
+            os.replace(tmp_fpath, self.cache_db_filename)
+        except BaseException:
+            if os.path.exists(tmp_fpath):
+                os.remove(tmp_fpath)
+            raise
+
+
+    def reload_expiry(self):
+        """Build the expiry heap from the index again on the next eviction"""
+        with self._lock:
+            self.expiry_heap = None
+
+
+    def sync_expiry_heap(self):
+        # written by another process (worker, cron, cache_manager.py) since our last write
+        if self.get_index_stat() != self.index_stat:
+            self.reload_expiry()
+
+
     def get_item(self, id):
         # alias for read_db with cache_id
         return self.read_db(id)
@@ -58,19 +154,25 @@ class CacheAsJson:
         return len(self.read_db(id)) > 0
 
 
+    @write_locked
     def write_db(self, cache_object):
         cache_id = cache_object['id']
         saved_db_object = self.read_db()
         saved_db_object[cache_id] = cache_object
         try:
-            with open(self.cache_db_filename, 'w') as writer:
-                fcntl.flock(writer.fileno(), fcntl.LOCK_EX)  # Exclusive lock for writing
-                try:
-                    json.dump(saved_db_object, writer)
-                finally:
-                    fcntl.flock(writer.fileno(), fcntl.LOCK_UN)  # Release lock
+            self.dump_db(saved_db_object)
         except Exception as e:
             print(f"Error writing cache file: {e}")
+        self.push_expiry(cache_object)
+
+
+    def push_expiry(self, cache_object):
+        # the old position of a rewritten entry stays in the heap, it is
+        # skipped on eviction because the saved evict_ts is later
+        evict_ts = cache_object.get('evict_ts') or cache_object.get('expired_ts')
+        with self._lock:
+            if self.expiry_heap is not None and evict_ts:
+                heapq.heappush(self.expiry_heap, (evict_ts, cache_object['id']))
 
 
     def save(self, cache_object: dict):
@@ -84,6 +186,7 @@ class CacheAsJson:
         return cache_object
 
 
+    @write_locked
     def delete(self, cache_id):
         db_object = self.read_db()
         deleted_object = {}
@@ -91,12 +194,7 @@ class CacheAsJson:
             deleted_object = db_object[cache_id]
             db_object.pop(cache_id, None)
             try:
-                with open(self.cache_db_filename, 'w') as writer:
-                    fcntl.flock(writer.fileno(), fcntl.LOCK_EX)  # Exclusive lock for writing
-                    try:
-                        json.dump(db_object, writer)
-                    finally:
-                        fcntl.flock(writer.fileno(), fcntl.LOCK_UN)  # Release lock
+                self.dump_db(db_object)
             except Exception as e:
                 print(f"Error deleting cache item: {e}")
         return deleted_object
@@ -108,49 +206,45 @@ class CacheAsJson:
         return list(db_object.keys())
 
 
+    @write_locked
     def cleanup_expired_cache(self, cache_manager):
         """Remove all expired cache entries"""
         db_object = self.read_db()
         expired_count = 0
         removed_files = []
         
+        expired_files = []
+        
         for cache_id, cache_object in list(db_object.items()):
             try:
-                # Check if cache is expired
-                expired_at = cache_object.get('expired_at')
-                if expired_at:
-                    expired_datetime = cache_manager.iso_to_datetime(expired_at)
-                    current_datetime = cache_manager.get_now_datetime()
+                # Check if cache is expired, and past its max stale
+                evict_ts = cache_manager.get_evict_ts(cache_object)
+                if evict_ts and time.time() > evict_ts:
+                    # Cache is expired, remove it from database
+                    expired_files.append(cache_object.get('filepath'))
+                    db_object.pop(cache_id, None)
+                    expired_count += 1
                     
-                    if current_datetime > expired_datetime:
-                        # Cache is expired, remove it
-                        filepath = cache_object.get('filepath')
-                        if filepath and os.path.isfile(filepath):
-                            try:
-                                os.remove(filepath)
-                                removed_files.append(filepath)
-                            except OSError as e:
-                                print(f"Error removing cache file {filepath}: {e}")
-                        
-                        # Remove from database
-                        db_object.pop(cache_id, None)
-                        expired_count += 1
-                        
             except Exception as e:
                 print(f"Error checking cache expiration for {cache_id}: {e}")
                 # Remove corrupted cache entry
                 db_object.pop(cache_id, None)
                 expired_count += 1
         
+        # blobs are shared by identical payloads, keep the ones still referenced
+        referenced_files = {x.get('filepath') for x in db_object.values()}
+        for filepath in set(expired_files) - referenced_files:
+            if filepath and os.path.isfile(filepath):
+                try:
+                    os.remove(filepath)
+                    removed_files.append(filepath)
+                except OSError as e:
+                    print(f"Error removing cache file {filepath}: {e}")
+        
         # Save updated database
         if expired_count > 0:
             try:
-                with open(self.cache_db_filename, 'w') as writer:
-                    fcntl.flock(writer.fileno(), fcntl.LOCK_EX)
-                    try:
-                        json.dump(db_object, writer)
-                    finally:
-                        fcntl.flock(writer.fileno(), fcntl.LOCK_UN)
+                self.dump_db(db_object)
             except Exception as e:
                 print(f"Error saving cache database after cleanup: {e}")
         
@@ -161,21 +255,438 @@ class CacheAsJson:
         }
 
 
+    @write_locked
+    def evict_expired(self, cache_manager, limit=10):
+        """Remove at most limit expired entries, the earliest expiry first"""
+        now_ts = time.time()
+        with self._lock:
+            if self.expiry_heap is None or self.expiry_heap_ts < now_ts - self.expiry_heap_max_age:
+                self.expiry_heap = []
+                self.expiry_heap_ts = now_ts
+                for cache_id, cache_object in self.read_db().items():
+                    evict_ts = cache_manager.get_evict_ts(cache_object)
+                    if evict_ts:
+                        self.expiry_heap.append((evict_ts, cache_id))
+                heapq.heapify(self.expiry_heap)
+            candidates = []
+            while self.expiry_heap and self.expiry_heap[0][0] < now_ts and len(candidates) < limit:
+                candidates.append(heapq.heappop(self.expiry_heap))
+        if not candidates:
+            # nothing due, the index file is not even read
+            return {'expired_count': 0, 'removed_files': []}
+
+        db_object = self.read_db()
+        expired_files = []
+        for _, cache_id in candidates:
+            cache_object = db_object.get(cache_id)
+            if not cache_object:
+                continue
+            evict_ts = cache_manager.get_evict_ts(cache_object)
+            if evict_ts and evict_ts >= now_ts:
+                # refreshed meanwhile, by this or another process
+                self.push_expiry(dict(cache_object, evict_ts=evict_ts))
+                continue
+            expired_files.append(cache_object.get('filepath'))
+            db_object.pop(cache_id)
+
+        removed_files = []
+        if expired_files:
+            try:
+                self.dump_db(db_object)
+            except Exception as e:
+                print(f"Error saving cache database after eviction: {e}")
+            referenced_files = {x.get('filepath') for x in db_object.values()}
+            for filepath in set(expired_files) - referenced_files:
+                if filepath and os.path.isfile(filepath):
+                    try:
+                        os.remove(filepath)
+                        removed_files.append(filepath)
+                    except OSError as e:
+                        print(f"Error removing cache file {filepath}: {e}")
+        return {'expired_count': len(expired_files), 'removed_files': removed_files}
+
+
+    def is_referenced(self, filepath):
+        """Whether any entry still points to filepath"""
+        return any(x.get('filepath') == filepath for x in self.read_db().values())
+
+
+    def get_referenced_files(self):
+        """Every filepath an entry points to"""
+        return {x.get('filepath') for x in self.read_db().values() if x.get('filepath')}
+
+
+    def touch(self, cache_id, accessed_ts):
+        """Record a cache hit, flushed every touch_batch hits or touch_interval seconds"""
+        with self._lock:
+            hits, _ = self.touches.get(cache_id, (0, 0))
+            self.touches[cache_id] = (hits + 1, accessed_ts)
+            is_due = len(self.touches) >= self.touch_batch or accessed_ts - self.flushed_ts >= self.touch_interval
+        if is_due:
+            self.flush_touches()
+
+
+    def pop_touches(self):
+        with self._lock:
+            touches, self.touches = self.touches, {}
+            self.flushed_ts = time.time()
+        return touches
+
+
+    @write_locked
+    def flush_touches(self):
+        """Write recorded hits and access times into the index"""
+        touches = self.pop_touches()
+        if not touches:
+            return 0
+        db_object = self.read_db()
+        for cache_id, (hits, accessed_ts) in touches.items():
+            cache_object = db_object.get(cache_id)
+            if cache_object:
+                cache_object['hits'] = cache_object.get('hits', 0) + hits
+                cache_object['accessed_ts'] = accessed_ts
+                cache_object['accessed_at'] = datetime.fromtimestamp(accessed_ts).isoformat()
+        try:
+            self.dump_db(db_object)
+        except Exception as e:
+            print(f"Error saving cache hits: {e}")
+        return len(touches)
+
+
+    def get_disk_size(self, cache_object):
+        disk_size = cache_object.get('disk_size')
+        if disk_size is None:
+            # entries saved before disk_size existed
+            filepath = cache_object.get('filepath')
+            disk_size = os.path.getsize(filepath) if filepath and os.path.isfile(filepath) else 0
+        return disk_size
+
+
+    def get_total_bytes(self, db_object=None):
+        """Size of the cache files from the index, shared blobs counted once"""
+        if db_object is None:
+            db_object = self.read_db()
+        sizes = {x.get('filepath'): self.get_disk_size(x) for x in db_object.values()}
+        return sum(sizes.values())
+
+
+    def get_eviction_candidates(self, policy='lru', limit=100, exclude=None):
+        """Entries in eviction order, least recently (lru) or least frequently (lfu) used first"""
+        if policy == 'lfu':
+            key = lambda x: (x.get('hits', 0), x.get('accessed_ts') or 0)
+        else:
+            key = lambda x: x.get('accessed_ts') or 0
+        cache_objects = [x for x in self.read_db().values() if x.get('id') != exclude]
+        return heapq.nsmallest(limit, cache_objects, key=key)
+
+
+    @write_locked
+    def delete_many(self, cache_ids):
+        """Delete several entries with a single rewrite of the index"""
+        db_object = self.read_db()
+        deleted = [db_object.pop(cache_id) for cache_id in cache_ids if cache_id in db_object]
+        if deleted:
+            try:
+                self.dump_db(db_object)
+            except Exception as e:
+                print(f"Error deleting cache items: {e}")
+        return deleted
+
+
+    @write_locked
+    def compact(self):
+        """Rewrite the index without malformed entries"""
+        db_object = self.read_db()
+        compacted = {k: v for k, v in db_object.items() if isinstance(v, dict) and v.get('id') == k}
+        if len(compacted) == len(db_object):
+            return False
+        try:
+            self.dump_db(compacted)
+        except Exception as e:
+            print(f"Error compacting cache database: {e}")
+            return False
+        return True
+
+
+    @write_locked
+    def clear(self):
+        """Remove every entry from database"""
+        try:
+            self.dump_db({})
+        except Exception as e:
+            print(f"Error clearing cache database: {e}")
+            return False
+        with self._lock:
+            self.expiry_heap = None
+        return True
+
+
     def get_cache_stats(self):
         """Get cache statistics"""
         db_object = self.read_db()
         total_cache = len(db_object)
-        total_size = 0
-        expired_count = 0
+        # identical payloads share one blob, count it once
+        total_size = self.get_total_bytes(db_object)
         
-        for cache_id, cache_object in db_object.items():
-            filepath = cache_object.get('filepath')
-            if filepath and os.path.isfile(filepath):
+        return {
+            'total_cache_entries': total_cache,
+            'total_size_bytes': total_size,
+            'total_size_mb': round(total_size / (1024 * 1024), 2)
+        }
+
+
+
+class CacheAsSQLite(CacheAsJson):
+    """Cache index in SQLite (WAL), put/get/delete without rewriting the whole index"""
+
+    def __init__(self, cache_db_filename=None):
+        self.cache_db_filename = cache_db_filename or os.path.join(CACHE_DIR, 'cache_db.sqlite3')
+        self.json_db_filename = os.path.join(os.path.dirname(self.cache_db_filename), 'cache_db.json')
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.touches = {}
+        self.flushed_ts = time.time()
+        is_new = not os.path.isfile(self.cache_db_filename)
+        self.create_schema()
+        if is_new and os.path.isfile(self.json_db_filename):
+            self.migrate_from_json()
+
+
+    def get_connection(self):
+        # one connection per thread, and never reuse a connection across fork
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.cache_db_filename, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            # INSERT OR REPLACE fires the delete trigger of the replaced row
+            connection.execute('PRAGMA recursive_triggers=ON')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+
+    def create_schema(self):
+        connection = self.get_connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'id TEXT PRIMARY KEY, '
+            'path TEXT, '
+            'filepath TEXT, '
+            'expired_at TEXT, '
+            'expired_ts REAL, '
+            'evict_ts REAL, '
+            'accessed_ts REAL, '
+            'hits INTEGER NOT NULL DEFAULT 0, '
+            'disk_size INTEGER NOT NULL DEFAULT 0, '
+            'object TEXT NOT NULL)'
+        )
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(cache)')]
+        # database created before these columns existed, old rows keep the default
+        for column, definition in [
+                ('expired_ts', 'REAL'),
+                ('accessed_ts', 'REAL'),
+                ('hits', 'INTEGER NOT NULL DEFAULT 0'),
+                ('disk_size', 'INTEGER NOT NULL DEFAULT 0'),
+                ('evict_ts', 'REAL')]:
+            if column not in columns:
+                connection.execute(f'ALTER TABLE cache ADD COLUMN {column} {definition}')
+        if 'evict_ts' not in columns:
+            # saved without max stale, evicted once expired
+            connection.execute('UPDATE cache SET evict_ts = expired_ts')
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_expired_at ON cache (expired_at)')
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_expired_ts ON cache (expired_ts)')
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_evict_ts ON cache (evict_ts)')
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_filepath ON cache (filepath)')
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_accessed_ts ON cache (accessed_ts)')
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_hits ON cache (hits, accessed_ts)')
+
+        # running size of the cache files, a blob shared by several rows counts once
+        connection.execute('CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache '
+            'WHEN NOT EXISTS (SELECT 1 FROM cache WHERE filepath = NEW.filepath AND id != NEW.id) '
+            "BEGIN UPDATE cache_meta SET value = value + NEW.disk_size WHERE key = 'total_bytes'; END"
+        )
+        connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache '
+            'WHEN NOT EXISTS (SELECT 1 FROM cache WHERE filepath = OLD.filepath) '
+            "BEGIN UPDATE cache_meta SET value = value - OLD.disk_size WHERE key = 'total_bytes'; END"
+        )
+        if 'disk_size' not in columns:
+            rows = connection.execute('SELECT id, filepath FROM cache').fetchall()
+            connection.executemany('UPDATE cache SET disk_size = ? WHERE id = ?', [
+                (os.path.getsize(filepath) if filepath and os.path.isfile(filepath) else 0, cache_id)
+                for cache_id, filepath in rows
+            ])
+            self.recount()
+        elif connection.execute("SELECT 1 FROM cache_meta WHERE key = 'total_bytes'").fetchone() is None:
+            self.recount()
+
+
+    def read_db(self, cache_id: str = ''):
+        connection = self.get_connection()
+        try:
+            if cache_id:
+                row = connection.execute('SELECT object FROM cache WHERE id = ?', (cache_id,)).fetchone()
+                return json.loads(row[0]) if row else {}
+            rows = connection.execute('SELECT id, object FROM cache').fetchall()
+        except sqlite3.Error as e:
+            print(f"Error reading cache database: {e}")
+            return {}
+        return {cache_id: json.loads(cache_object) for cache_id, cache_object in rows}
+
+
+    insert_sql = (
+        'INSERT OR REPLACE INTO cache (id, path, filepath, expired_at, expired_ts, evict_ts, accessed_ts, hits, disk_size, object) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    )
+
+
+    def write_db(self, cache_object):
+        try:
+            self.get_connection().execute(self.insert_sql, self.get_row(cache_object))
+        except sqlite3.Error as e:
+            print(f"Error writing cache database: {e}")
+
+
+    def get_row(self, cache_object):
+        return (
+            cache_object['id'],
+            cache_object.get('path'),
+            cache_object.get('filepath'),
+            cache_object.get('expired_at'),
+            cache_object.get('expired_ts'),
+            cache_object.get('evict_ts') or cache_object.get('expired_ts'),
+            cache_object.get('accessed_ts'),
+            cache_object.get('hits', 0),
+            self.get_disk_size(cache_object),
+            json.dumps(cache_object),
+        )
+
+
+    def delete(self, cache_id):
+        deleted_object = self.read_db(cache_id)
+        if deleted_object:
+            try:
+                self.get_connection().execute('DELETE FROM cache WHERE id = ?', (cache_id,))
+            except sqlite3.Error as e:
+                print(f"Error deleting cache item: {e}")
+        return deleted_object
+
+
+    def get_all_cache_ids(self):
+        """Get all cache IDs from database"""
+        rows = self.get_connection().execute('SELECT id FROM cache').fetchall()
+        return [row[0] for row in rows]
+
+
+    def cleanup_expired_cache(self, cache_manager):
+        """Remove all expired cache entries"""
+        connection = self.get_connection()
+        now_iso = cache_manager.get_now_datetime(isoformat=True)
+        # rows written before expired_ts existed fall back to the isoformat text,
+        # which sorts chronologically as well
+        rows = connection.execute(
+            'SELECT id, filepath FROM cache WHERE evict_ts < ? '
+            'UNION SELECT id, filepath FROM cache WHERE expired_ts IS NULL AND expired_at < ?',
+            (time.time(), now_iso)
+        ).fetchall()
+        removed_files = []
+        if rows:
+            connection.executemany('DELETE FROM cache WHERE id = ?', [(row[0],) for row in rows])
+        for filepath in {row[1] for row in rows}:
+            if filepath and os.path.isfile(filepath) and not self.is_referenced(filepath):
                 try:
-                    total_size += os.path.getsize(filepath)
-                except OSError:
-                    pass
-        
+                    os.remove(filepath)
+                    removed_files.append(filepath)
+                except OSError as e:
+                    print(f"Error removing cache file {filepath}: {e}")
+        remaining = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        return {
+            'expired_count': len(rows),
+            'removed_files': removed_files,
+            'remaining_cache': remaining
+        }
+
+
+    def evict_expired(self, cache_manager, limit=10):
+        """Remove at most limit expired entries, walking the evict_ts index"""
+        # rows without expired_ts are left to the full cleanup_expired_cache
+        connection = self.get_connection()
+        rows = connection.execute(
+            'SELECT id, filepath FROM cache WHERE evict_ts < ? ORDER BY evict_ts LIMIT ?',
+            (time.time(), limit)
+        ).fetchall()
+        removed_files = []
+        if rows:
+            connection.executemany('DELETE FROM cache WHERE id = ?', [(row[0],) for row in rows])
+        for filepath in {row[1] for row in rows}:
+            if filepath and os.path.isfile(filepath) and not self.is_referenced(filepath):
+                try:
+                    os.remove(filepath)
+                    removed_files.append(filepath)
+                except OSError as e:
+                    print(f"Error removing cache file {filepath}: {e}")
+        return {'expired_count': len(rows), 'removed_files': removed_files}
+
+
+    def is_referenced(self, filepath):
+        """Whether any entry still points to filepath"""
+        row = self.get_connection().execute('SELECT 1 FROM cache WHERE filepath = ? LIMIT 1', (filepath,)).fetchone()
+        return row is not None
+
+
+    def get_referenced_files(self):
+        """Every filepath an entry points to"""
+        rows = self.get_connection().execute('SELECT DISTINCT filepath FROM cache WHERE filepath IS NOT NULL').fetchall()
+        return {row[0] for row in rows}
+
+
+    def flush_touches(self):
+        """Write recorded hits and access times into the index"""
+        touches = self.pop_touches()
+        if not touches:
+            return 0
+        try:
+            self.get_connection().executemany(
+                'UPDATE cache SET hits = hits + ?, accessed_ts = ?, '
+                "object = json_set(object, '$.hits', hits + ?, '$.accessed_ts', ?, '$.accessed_at', ?) WHERE id = ?",
+                [(hits, accessed_ts, hits, accessed_ts, datetime.fromtimestamp(accessed_ts).isoformat(), cache_id)
+                 for cache_id, (hits, accessed_ts) in touches.items()]
+            )
+        except sqlite3.Error as e:
+            print(f"Error saving cache hits: {e}")
+        return len(touches)
+
+
+    def get_total_bytes(self, db_object=None):
+        """Size of the cache files, kept up to date by triggers"""
+        row = self.get_connection().execute("SELECT value FROM cache_meta WHERE key = 'total_bytes'").fetchone()
+        return row[0] if row else 0
+
+
+    def recount(self):
+        """Recompute the running size from the rows"""
+        self.get_connection().execute(
+            "INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('total_bytes', "
+            '(SELECT COALESCE(SUM(disk_size), 0) FROM (SELECT MAX(disk_size) AS disk_size FROM cache GROUP BY filepath)))'
+        )
+
+
+    def get_eviction_candidates(self, policy='lru', limit=100, exclude=None):
+        """Entries in eviction order, least recently (lru) or least frequently (lfu) used first"""
+        order_by = 'hits, accessed_ts' if policy == 'lfu' else 'accessed_ts'
+        rows = self.get_connection().execute(
+            f'SELECT object FROM cache WHERE id != ? ORDER BY {order_by} LIMIT ?', (exclude or '', limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+    def get_cache_stats(self):
+        """Get cache statistics"""
+        total_cache = self.get_connection().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        total_size = self.get_total_bytes()
         return {
             'total_cache_entries': total_cache,
             'total_size_bytes': total_size,
@@ -183,12 +694,163 @@ class CacheAsJson:
         }
 
 
+    def delete_many(self, cache_ids):
+        """Delete several entries in one transaction"""
+        deleted = [x for x in (self.read_db(cache_id) for cache_id in cache_ids) if x]
+        connection = self.get_connection()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany('DELETE FROM cache WHERE id = ?', [(x['id'],) for x in deleted])
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            connection.execute('ROLLBACK')
+            print(f"Error deleting cache items: {e}")
+            return []
+        return deleted
+
+
+    def compact(self):
+        """Checkpoint the WAL and VACUUM once a quarter of the pages is free"""
+        connection = self.get_connection()
+        try:
+            self.recount() # in case the running size drifted
+            connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            page_count = connection.execute('PRAGMA page_count').fetchone()[0]
+            freelist_count = connection.execute('PRAGMA freelist_count').fetchone()[0]
+            if not page_count or freelist_count * 4 < page_count:
+                return False
+            connection.execute('VACUUM')
+        except sqlite3.Error as e:
+            print(f"Error compacting cache database: {e}")
+            return False
+        return True
+
+
+    def clear(self):
+        """Remove every entry from database"""
+        try:
+            self.get_connection().execute('DELETE FROM cache')
+        except sqlite3.Error as e:
+            print(f"Error clearing cache database: {e}")
+            return False
+        return True
+
+
+    def migrate_from_json(self, json_db_filename=None):
+        """Copy entries of the JSON index (cache_db.json) into SQLite"""
+        json_db = CacheAsJson()
+        json_db.cache_db_filename = json_db_filename or self.json_db_filename
+        db_object = json_db.read_db() or {}
+        rows = [self.get_row(cache_object) for cache_object in db_object.values() if cache_object.get('id')]
+        connection = self.get_connection()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany(self.insert_sql, rows)
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            connection.execute('ROLLBACK')
+            print(f"Error migrating JSON cache database: {e}")
+            return 0
+        return len(rows)
+
+
+
+class MemoryCache:
+    """Bounded LRU of cache objects (metadata + JSON encoded data) kept in process"""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.items = OrderedDict() # cache_id: (cache_object, expired_ts, size)
+        self._lock = threading.Lock()
+
+
+    def is_enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+
+    def get(self, cache_id, now_ts):
+        with self._lock:
+            item = self.items.get(cache_id)
+            if item is None:
+                return {}
+            cache_object, expired_ts, size = item
+            if now_ts >= expired_ts:
+                self.pop(cache_id)
+                return {}
+            self.items.move_to_end(cache_id)
+        # copy the metadata only, the payload is bytes and decoded on every hit
+        return dict(cache_object)
+
+
+    def put(self, cache_id, cache_object, expired_ts, size):
+        if not self.is_enabled() or size > self.max_bytes:
+            self.delete(cache_id)
+            return
+        with self._lock:
+            self.pop(cache_id)
+            self.items[cache_id] = (cache_object, expired_ts, size)
+            self.total_bytes += size
+            while len(self.items) > self.max_entries or self.total_bytes > self.max_bytes:
+                self.pop(next(iter(self.items)))
+
+
+    def pop(self, cache_id):
+        # caller holds the lock
+        item = self.items.pop(cache_id, None)
+        if item is not None:
+            self.total_bytes -= item[2]
+
+
+    def delete(self, cache_id):
+        with self._lock:
+            self.pop(cache_id)
+
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
+            self.total_bytes = 0
+
+
+
+CACHE_BACKENDS = {
+    'json'   : CacheAsJson,
+    'sqlite' : CacheAsSQLite,
+}
+
+
+def get_cache_backend(name=None):
+    name = (name or ENV_CONFIG['cache_backend']).lower()
+    if name not in CACHE_BACKENDS:
+        raise ValueError(f"Unknown cache backend '{name}', choose one of {list(CACHE_BACKENDS)}")
+    return CACHE_BACKENDS[name]
+
+
 
 class SisterCache(SisterTemplate):
 
-    def __init__(self, cache_db_class=CacheAsJson):
+    def __init__(self, cache_db_class=None):
+        if cache_db_class is None:
+            cache_db_class = get_cache_backend()
         self.cache_db_class = cache_db_class()
         self.cache_ext = 'json'
+        self.blob_dir = CACHE_BLOB_DIR
+        # payloads from this size on are compressed with cache_codec
+        self.cache_codec = get_codec(ENV_CONFIG['cache_codec']).name
+        self.cache_compress_min_bytes = ENV_CONFIG['cache_compress_min_kb'] * 1024
+        # photos and documents change rarely, they get their own TTL
+        self.cache_binary_ext = 'bin'
+        self.cache_expired_datetime = {"days": ENV_CONFIG['cache_expiration_days']}
+        self.cache_binary_expired_datetime = {"days": ENV_CONFIG['cache_binary_expiration_days']}
+        self.memory_cache = MemoryCache(
+            max_entries = ENV_CONFIG['cache_memory_entries'],
+            max_bytes = ENV_CONFIG['cache_memory_mb'] * 1024 * 1024,
+        )
+        # size limit of the cache files, 0 is unlimited, evicted lru or lfu first
+        self.cache_max_bytes = ENV_CONFIG['cache_max_size_mb'] * 1024 * 1024
+        self.cache_eviction_policy = ENV_CONFIG['cache_eviction_policy']
 
 
     def path_as_io(self, path):
@@ -199,27 +861,63 @@ class SisterCache(SisterTemplate):
         return path_name
 
 
-    def get_cache_fname(self):
-        unique_id = self.cache_db_class.get_unique_id()
-        if unique_id in os.listdir(CACHE_DIR):
-            return self.get_cache_fname() 
-        cache_fname = f'{unique_id}.{self.cache_ext}'
-        return cache_fname
+    def get_blob_fpath(self, digest, codec='none', extension=None):
+        # blobs/ab/cd/abcd....json, two levels keep every directory small
+        extension = (extension or self.cache_ext) + get_codec(codec).extension
+        return os.path.join(self.blob_dir, digest[:2], digest[2:4], f'{digest}.{extension}')
 
 
-    def get_cache_fpath(self):
-        cache_fpath = os.path.join(CACHE_DIR, self.get_cache_fname())
-        return cache_fpath
+    def select_codec(self, size):
+        if size >= self.cache_compress_min_bytes:
+            return self.cache_codec
+        return 'none'
+
+
+    def write_blob(self, content, codec='none', extension=None):
+        """Store content under its sha256, identical content is written once"""
+        digest = hashlib.sha256(content).hexdigest()
+        blob_fpath = self.get_blob_fpath(digest, codec, extension)
+        if not os.path.isfile(blob_fpath):
+            content = get_codec(codec).encode(content)
+            blob_dir = os.path.dirname(blob_fpath)
+            os.makedirs(blob_dir, exist_ok=True)
+            # write aside and rename, readers never see a partial blob
+            fd, tmp_fpath = tempfile.mkstemp(dir=blob_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as writer:
+                    writer.write(content)
+                os.replace(tmp_fpath, blob_fpath)
+            except BaseException:
+                if os.path.exists(tmp_fpath):
+                    os.remove(tmp_fpath)
+                raise
+        return blob_fpath
+
+
+    def release_blob(self, filepath):
+        """Remove a cache file once no entry points to it"""
+        if filepath and not self.cache_db_class.is_referenced(filepath):
+            try:
+                self.remove_cache_file(filepath)
+            except OSError as e:
+                print(f"Error removing cache file {filepath}: {e}")
 
 
     def read_cache_file(self, cache_object):
         json_object = {}
         filepath = cache_object['filepath']
+        codec = CODECS.get(cache_object.get('codec', 'none'))
+        if codec is None:
+            # written with a codec not installed here, refetch and rewrite
+            return json_object
         if os.path.isfile(filepath):
             try:
-                with open(filepath, 'r') as reader:
-                    json_object = json.load(reader)
-            except json.decoder.JSONDecodeError:
+                with open(filepath, 'rb') as reader:
+                    if cache_object.get('binary'):
+                        # raw bytes straight from the blob, no decoding
+                        return reader.read()
+                    json_object = json.loads(codec.decode(reader.read()))
+            except (json.decoder.JSONDecodeError, UnicodeDecodeError) + CODEC_ERRORS:
                 os.remove(filepath)
                 self.cache_db_class.delete(cache_object['id'])
         else:
@@ -227,15 +925,64 @@ class SisterCache(SisterTemplate):
         return json_object
 
 
-    def write_cache_file(self, path, response, cache_fpath=None):
-        if not cache_fpath:
-            cache_fpath = self.get_cache_fpath()
+    def is_binary(self, data):
+        return isinstance(data, (bytes, bytearray))
+
+
+    def write_cache_file(self, path, response):
+        if self.is_binary(response['data']):
+            content = bytes(response['data'])
+            cache_fpath = self.write_blob(content, extension=self.cache_binary_ext)
+            return [path, cache_fpath, response, 'none', len(content)]
         try:
-            with open(cache_fpath, 'w') as writer:
-                json.dump(response['data'], writer)
-            return [path, cache_fpath, response]
+            content = json.dumps(response['data']).encode()
         except TypeError: # because it might be byte or binnary
             return False
+        codec = self.select_codec(len(content))
+        cache_fpath = self.write_blob(content, codec)
+        return [path, cache_fpath, response, codec, len(content)]
+
+
+    def remember_cache(self, cache_object):
+        # keep the data JSON encoded in memory, every hit decodes its own copy
+        # so callers changing a response never change the cache
+        # binary payloads stay on disk, they would crowd out the reference data
+        if not self.memory_cache.is_enabled() or cache_object.get('binary'):
+            return
+        memory_object = {key: value for key, value in cache_object.items() if key != 'data'}
+        try:
+            memory_object['payload'] = json.dumps(cache_object['data']).encode()
+        except (TypeError, ValueError):
+            return
+        self.memory_cache.put(cache_object['id'], memory_object, self.get_expired_ts(cache_object), len(memory_object['payload']))
+
+
+    def get_expired_ts(self, cache_object):
+        expired_ts = cache_object.get('expired_ts')
+        if expired_ts is None and cache_object.get('expired_at'):
+            # entries saved before expired_ts existed
+            expired_ts = self.iso_to_datetime(cache_object['expired_at']).timestamp()
+        return expired_ts
+
+
+    def get_evict_ts(self, cache_object):
+        # expired_ts plus the max stale of the entry, saved before evict_ts existed is expired_ts
+        evict_ts = cache_object.get('evict_ts')
+        if evict_ts is None:
+            evict_ts = self.get_expired_ts(cache_object)
+        return evict_ts
+
+
+    def get_keep_stale_seconds(self, plan=None):
+        """Seconds an expired entry is kept to be served stale, see WebService"""
+        return 0
+
+
+    def is_cache_fresh(self, cache_object, now_ts=None):
+        expired_ts = self.get_expired_ts(cache_object)
+        if not expired_ts:
+            return False
+        return (now_ts or time.time()) < expired_ts
 
 
     def remove_cache_file(self, filepath):
@@ -243,45 +990,94 @@ class SisterCache(SisterTemplate):
             os.remove(filepath)
 
 
-    def get_object(self, path, filepath, response):
+    def get_object(self, path, filepath, response, codec='none', size=None, cache_expired_datetime=None, max_stale=0):
+        binary = self.is_binary(response['data'])
+        if binary:
+            cache_expired_datetime = self.cache_binary_expired_datetime
+        cache_expired_datetime = cache_expired_datetime or self.cache_expired_datetime
+        now_datetime = self.get_now_datetime()
+        expired_datetime = self.get_expired_datetime(now_datetime, **cache_expired_datetime)
         cache_object = {
             'id': self.path_as_io(path),
             'path': path, # ws path, not directory
             'filename': os.path.basename(filepath),
             'filepath': filepath,
-            'accessed_at': str(self.get_now_datetime(isoformat=True)),
-            'expired_at': str(self.get_expired_datetime(isoformat=True, **self.cache_expired_datetime)),
+            'accessed_at': now_datetime.isoformat(),
+            'accessed_ts': now_datetime.timestamp(),
+            'hits': 0,
+            'expired_at': expired_datetime.isoformat(),
+            'expired_ts': expired_datetime.timestamp(), # epoch, compared without parsing
+            'evict_ts': expired_datetime.timestamp() + max_stale, # removed by cleanup after this
             'length': len(response['data']),
+            'codec': codec,
+            'size': size, # payload bytes before compression
+            'disk_size': os.path.getsize(filepath), # bytes on disk, counted in the cache quota
         }
+        if binary:
+            cache_object['binary'] = True
+            cache_object['content_type'] = response.get('content-type')
         return cache_object
 
 
-    def save_cache(self, path, response, **cache_expired_datetime):
-        self.cache_expired_datetime = cache_expired_datetime
+    def save_cache(self, path, response, max_stale=None, **cache_expired_datetime):
+        # cache_expired_datetime is the TTL of this entry, default is self.cache_expired_datetime,
+        # max_stale the seconds it is kept after that, default is get_keep_stale_seconds()
         if not response['status'] == True:
             return None
+        if max_stale is None:
+            max_stale = self.get_keep_stale_seconds()
         
         # check whether cache is exists or not
-        cache_fpath = None
         cache_id    = self.path_as_io(path)
         saved_cache = self.cache_db_class.get_item(cache_id)
-        if saved_cache:
-            cache_fpath = saved_cache.get('filepath')
 
         # write cache object to file
-        cache_object = self.write_cache_file(path, response, cache_fpath)
+        cache_object = self.write_cache_file(path, response)
         if cache_object:
-            cache_object = self.get_object(*cache_object)
+            cache_object = self.get_object(*cache_object, cache_expired_datetime=cache_expired_datetime, max_stale=max_stale)
+            if saved_cache:
+                # a refreshed entry keeps its popularity
+                cache_object['hits'] = saved_cache.get('hits', 0)
             self.cache_db_class.save(cache_object)
+            self.remember_cache(dict(cache_object, data=response['data']))
+            # payload changed, the previous blob may not be used anymore
+            if saved_cache and saved_cache.get('filepath') != cache_object['filepath']:
+                self.release_blob(saved_cache.get('filepath'))
+            if self.cache_max_bytes:
+                self.enforce_cache_quota(keep=cache_id)
+        else:
+            self.memory_cache.delete(cache_id)
 
 
-    def get_cache(self, path):
+    def get_cache_meta(self, path):
+        """Cache object without its payload, cheap enough for expiry checks"""
         cache_object = {}
         if self.caching_system:
             cache_id = self.path_as_io(path)
-            cache_object = self.cache_db_class.get(cache_id)
-            if cache_object:
-                cache_object['data'] = self.read_cache_file(cache_object)
+            cache_object = self.memory_cache.get(cache_id, time.time())
+            if not cache_object:
+                cache_object = self.cache_db_class.get(cache_id)
+        return cache_object
+
+
+    def load_cache_data(self, cache_object):
+        """Payload of a cache object from get_cache_meta"""
+        if 'payload' in cache_object:
+            # served by memory tier
+            self.cache_db_class.touch(cache_object['id'], time.time())
+            return json.loads(cache_object['payload'])
+        data = self.read_cache_file(cache_object)
+        if data:
+            self.cache_db_class.touch(cache_object['id'], time.time())
+            if self.is_cache_fresh(cache_object):
+                self.remember_cache(dict(cache_object, data=data))
+        return data
+
+
+    def get_cache(self, path):
+        cache_object = self.get_cache_meta(path)
+        if cache_object:
+            cache_object['data'] = self.load_cache_data(cache_object)
         return cache_object
 
 
@@ -290,6 +1086,65 @@ class SisterCache(SisterTemplate):
         return self.cache_db_class.cleanup_expired_cache(self)
 
 
+    def evict_expired_cache(self, limit=10):
+        """Remove up to limit expired entries, cheap enough to run on every request"""
+        return self.cache_db_class.evict_expired(self, limit)
+
+
+    def enforce_cache_quota(self, max_bytes=None, keep=None, batch_size=100):
+        """Evict entries by cache_eviction_policy until the cache files fit max_bytes, keep is never evicted"""
+        max_bytes = self.cache_max_bytes if max_bytes is None else max_bytes
+        cache_db = self.cache_db_class
+        total_bytes = cache_db.get_total_bytes()
+        evicted_count = 0
+        if max_bytes and total_bytes > max_bytes:
+            # eviction order needs the latest hits
+            cache_db.flush_touches()
+        while max_bytes and total_bytes > max_bytes:
+            victims = []
+            over_bytes = total_bytes - max_bytes
+            for cache_object in cache_db.get_eviction_candidates(self.cache_eviction_policy, batch_size, keep):
+                if over_bytes <= 0:
+                    break
+                victims.append(cache_object)
+                over_bytes -= cache_db.get_disk_size(cache_object)
+            if not victims:
+                break
+            cache_db.delete_many([x['id'] for x in victims])
+            for cache_object in victims:
+                self.memory_cache.delete(cache_object['id'])
+            for filepath in {x.get('filepath') for x in victims}:
+                self.release_blob(filepath)
+            evicted_count += len(victims)
+            total_bytes = cache_db.get_total_bytes()
+        return {'evicted_count': evicted_count, 'total_size_bytes': total_bytes}
+
+
+    def migrate_blobs(self):
+        """Move flat cache files (.cache/<ID>.json) into the sharded blob store"""
+        migrated = 0
+        blob_dir = os.path.join(self.blob_dir, '')
+        for cache_id, cache_object in self.cache_db_class.read_db().items():
+            filepath = cache_object.get('filepath')
+            if not filepath or filepath.startswith(blob_dir):
+                continue
+            data = self.read_cache_file(cache_object)
+            if not data:
+                continue
+            content = json.dumps(data).encode()
+            codec = self.select_codec(len(content))
+            blob_fpath = self.write_blob(content, codec)
+            cache_object['filepath'] = blob_fpath
+            cache_object['filename'] = os.path.basename(blob_fpath)
+            cache_object['codec'] = codec
+            cache_object['size'] = len(content)
+            cache_object['disk_size'] = os.path.getsize(blob_fpath)
+            self.cache_db_class.save(cache_object)
+            self.remove_cache_file(filepath)
+            migrated += 1
+        return migrated
+
+
     def get_cache_stats(self):
         """Get cache statistics"""
         return self.cache_db_class.get_cache_stats()
@@ -310,37 +1165,25 @@ class SisterCache(SisterTemplate):
                     print(f"Error removing cache file {filepath}: {e}")
         
         # Clear database
-        try:
-            with open(self.cache_db_class.cache_db_filename, 'w') as writer:
-                fcntl.flock(writer.fileno(), fcntl.LOCK_EX)
-                try:
-                    json.dump({}, writer)
-                finally:
-                    fcntl.flock(writer.fileno(), fcntl.LOCK_UN)
-        except Exception as e:
-            print(f"Error clearing cache database: {e}")
+        self.memory_cache.clear()
+        cleared_database = self.cache_db_class.clear()
         
         return {
             'removed_files': removed_count,
-            'cleared_database': True
+            'cleared_database': cleared_database
         }
 
 
     def delete_cache_by_path(self, path):
         """Delete specific cache by path"""
         cache_id = self.path_as_io(path)
+        self.memory_cache.delete(cache_id)
         cache_object = self.cache_db_class.get(cache_id)
         
         if cache_object:
-            filepath = cache_object.get('filepath')
-            if filepath and os.path.isfile(filepath):
-                try:
-                    os.remove(filepath)
-                except OSError as e:
-                    print(f"Error removing cache file {filepath}: {e}")
-            
-            # Remove from database
+            # Remove from database, then the file unless another entry shares it
             self.cache_db_class.delete(cache_id)
+            self.release_blob(cache_object.get('filepath'))
             return True
         
         return False
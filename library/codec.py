@@ -0,0 +1,78 @@
+import lzma
+import zlib
+
+try:
+    import zstandard
+except ImportError: # optional, pip install zstandard
+    zstandard = None
+
+
+class NoneCodec:
+    """Store content as it is"""
+    name = 'none'
+    extension = ''
+    errors = ()
+
+    def encode(self, content):
+        return content
+
+
+    def decode(self, content):
+        return content
+
+
+
+class ZlibCodec(NoneCodec):
+    name = 'zlib'
+    extension = '.zz'
+    errors = (zlib.error,)
+
+    def encode(self, content):
+        return zlib.compress(content, 6)
+
+
+    def decode(self, content):
+        return zlib.decompress(content)
+
+
+
+class LzmaCodec(NoneCodec):
+    name = 'lzma'
+    extension = '.xz'
+    errors = (lzma.LZMAError,)
+
+    def encode(self, content):
+        return lzma.compress(content, preset=6)
+
+
+    def decode(self, content):
+        return lzma.decompress(content)
+
+
+
+class ZstdCodec(NoneCodec):
+    name = 'zstd'
+    extension = '.zst'
+    errors = (zstandard.ZstdError,) if zstandard else ()
+
+    def encode(self, content):
+        return zstandard.ZstdCompressor(level=3).compress(content)
+
+
+    def decode(self, content):
+        return zstandard.ZstdDecompressor().decompress(content)
+
+
+
+CODECS = {codec.name: codec() for codec in (NoneCodec, ZlibCodec, LzmaCodec, ZstdCodec)}
+if zstandard is None:
+    CODECS.pop('zstd')
+
+CODEC_ERRORS = tuple(error for codec in CODECS.values() for error in codec.errors)
+
+
+def get_codec(name):
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Cache codec '{name}' is not available, choose one of {list(CODECS)}")
+    return codec
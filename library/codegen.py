@@ -0,0 +1,182 @@
+import re
+import pprint
+from library.api_spec import SisterSpec, get_spec_checksum
+from library.plan import RequestPlan
+
+
+SCHEMA_TYPES = {
+    'string'  : 'str',
+    'integer' : 'int',
+    'number'  : 'float',
+    'boolean' : 'bool',
+    'array'   : 'list',
+    'object'  : 'dict',
+}
+
+# only what the plan needs at runtime, descriptions go to docstrings
+PARAM_KEYS = ('in', 'name', 'required', 'schema')
+
+MODULE_HEADER = '''"""
+Sister API Client - static client module
+
+Generated by generate_client.py from config/api_spec.yaml, do not edit by hand.
+Spec: {title} {version} (sha256 {checksum})
+
+Every function calls the WebService request core with a precompiled
+RequestPlan, importing this module never loads the YAML spec.
+"""
+
+from typing import Optional
+from api import LazySisterAPI
+from library.io import join_ws_url
+from library.plan import RequestPlan
+from library.template import Response
+from library.webservice import WebService
+from settings import ENV_CONFIG
+
+
+SERVERS = {servers}
+
+BASE_URL = join_ws_url(ENV_CONFIG, SERVERS['sandbox'] if ENV_CONFIG['use_sandbox'] else SERVERS['ws'])
+
+
+
+class GeneratedSisterAPI(WebService):
+    """WebService bound to the plans of this module"""
+
+    def __init__(self):
+        super().__init__()
+        self.plans.update(PLANS)
+
+
+    def get_server_url(self, server_name):
+        return SERVERS[server_name]
+
+
+
+client = LazySisterAPI(GeneratedSisterAPI)
+
+
+def call_plan(plan, kwargs) -> Response:
+    # optional arguments left as None are not sent
+    kwargs = {{key: value for key, value in kwargs.items() if value is not None}}
+    plan.check_required(kwargs)
+    return client.parse_response(client.execute_plan(plan, **kwargs))
+
+
+'''
+
+
+class ClientGenerator:
+    """Render a static client module from SisterSpec"""
+
+    def __init__(self, spec=None):
+        self.spec = spec or SisterSpec()
+
+
+    def get_plan_name(self, function_name):
+        return 'PLAN_' + function_name[len('get_'):].upper()
+
+
+    def format_text(self, text):
+        # collapse whitespace and keep the docstring delimiters intact
+        text = re.sub(r'\s+', ' ', str(text or '')).strip()
+        return text.replace('\\', '\\\\').replace('"""', '\\"\\"\\"')
+
+
+    def get_param_type(self, param):
+        schema = param.get('schema') or {}
+        return SCHEMA_TYPES.get(schema.get('type'), 'str')
+
+
+    def get_signature_params(self, plan):
+        # path params first, then everything else in spec order
+        params, seen = [], set()
+        for param in sorted(plan.params, key=lambda x: x.get('in') != 'path'):
+            name = param.get('name')
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            params.append(param)
+        return params
+
+
+    def render_plan(self, plan_name, plan):
+        params = "()"
+        if plan.params:
+            params = "".join(
+                f"        {dict((key, param[key]) for key in PARAM_KEYS if key in param)!r},\n"
+                for param in plan.params
+            )
+            params = f"(\n{params}    )"
+        required = f"frozenset({sorted(plan.required)!r})" if plan.required else "frozenset()"
+        fields = [
+            f"    method = {plan.method!r},",
+            f"    path = {plan.path!r},",
+            f"    path_params = {plan.path_params!r},",
+            f"    query_params = {plan.query_params!r},",
+            f"    required = {required},",
+            f"    params = {params},",
+            f"    base_url = BASE_URL,",
+            f"    tags = {plan.tags!r},",
+        ]
+        return f"{plan_name} = RequestPlan(\n" + "\n".join(fields) + "\n)\n"
+
+
+    def render_function(self, function_name, plan_name, plan, route):
+        signature, docs, kwargs = [], [], []
+        for param in self.get_signature_params(plan):
+            name = param['name']
+            param_type = self.get_param_type(param)
+            if name in plan.required:
+                signature.append(f"{name}: {param_type}")
+            else:
+                signature.append(f"{name}: Optional[{param_type}] = None")
+            docs.append(f"    :param {name}: {self.format_text(param.get('description'))}")
+            kwargs.append(f"{name!r}: {name}")
+        signature = f"*, {', '.join(signature)}" if signature else ''
+        summary = self.format_text(route['attr'].get('summary')) or plan.path
+        lines = [
+            f"def {function_name}({signature}) -> Response:",
+            f'    """{summary}',
+            '',
+            f"    {plan.method.upper()} {plan.path}",
+        ]
+        if docs:
+            lines += [''] + docs
+        lines += [
+            '    """',
+            f"    return call_plan({plan_name}, {{{', '.join(kwargs)}}})",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+    def render(self):
+        info = self.spec.get_info() or {}
+        servers = {name: self.spec.get_server(name)['url'] for name in ('ws', 'sandbox')}
+        source = MODULE_HEADER.format(
+            title = info.get('title', ''),
+            version = info.get('version', ''),
+            checksum = get_spec_checksum(),
+            servers = pprint.pformat(servers),
+        )
+        plans, functions = [], []
+        for function_name, path in self.spec.functions.items():
+            route = self.spec.get_route(path)
+            plan = RequestPlan.compile(route, '')
+            plan_name = self.get_plan_name(function_name)
+            plans.append((plan_name, plan))
+            functions.append(self.render_function(function_name, plan_name, plan, route))
+        source += "\n".join(self.render_plan(name, plan) for name, plan in plans)
+        source += "\n\nPLANS = {\n" + "".join(f"    {plan.path!r}: {name},\n" for name, plan in plans) + "}\n\n\n"
+        source += "\n\n".join(functions)
+        return source
+
+
+    def write(self, filename):
+        source = self.render()
+        # make sure the generated module is valid python before writing it
+        compile(source, filename, 'exec')
+        with open(filename, 'w') as writer:
+            writer.write(source)
+        return filename
@@ -1,4 +1,8 @@
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from settings import ENV_CONFIG
 
 
 class BearerAuth(requests.auth.AuthBase):
@@ -12,11 +16,63 @@ class BearerAuth(requests.auth.AuthBase):
         return r
 
 
+class SisterRetry(Retry):
+    """Retry with exponential backoff plus random jitter, so clients do not retry in lockstep"""
+
+    def __init__(self, *args, jitter=0.0, **kwargs):
+        self.jitter = jitter
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        # urllib3 creates a new Retry after every attempt
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        return retry
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.jitter)
+
+
 class SisterSession(requests.Session):
+    """
+    Session with a pooled adapter, default timeouts and retries
+
+    Only idempotent methods (GET, HEAD, OPTIONS) are retried, on connection
+    errors, read timeouts and 5xx responses. After the last attempt the 5xx
+    response itself is returned.
+    """
 
-    def __init__(self):
+    retry_methods = frozenset(['GET', 'HEAD', 'OPTIONS'])
+    retry_status = (500, 502, 503, 504)
+
+    def __init__(self, timeout=None, connect_timeout=None, max_retries=None, pool_size=None,
+                 backoff_factor=None, backoff_jitter=None):
         super().__init__()
         self.headers.update({
             "Accept": "application/json",
             "Content-Type": "application/json"
         })
+        # (connect, read) in seconds, used unless a request passes its own timeout
+        self.timeout = (
+            ENV_CONFIG['api_connect_timeout_seconds'] if connect_timeout is None else connect_timeout,
+            ENV_CONFIG['api_timeout_seconds'] if timeout is None else timeout,
+        )
+        self.retries = SisterRetry(
+            total = ENV_CONFIG['max_retries'] if max_retries is None else max_retries,
+            backoff_factor = ENV_CONFIG['retry_backoff_seconds'] if backoff_factor is None else backoff_factor,
+            jitter = ENV_CONFIG['retry_jitter_seconds'] if backoff_jitter is None else backoff_jitter,
+            allowed_methods = self.retry_methods,
+            status_forcelist = self.retry_status,
+            raise_on_status = False,
+        )
+        pool_size = pool_size or ENV_CONFIG['http_pool_size']
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=self.retries)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
@@ -0,0 +1,101 @@
+import os
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+
+
+class Flight:
+    """A call in progress, followers wait on done"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+
+class SingleFlight:
+    """
+    At most one call per key at a time, concurrent callers share its result
+
+    The first caller of a key (the leader) runs func, callers arriving while
+    it runs wait and get a copy of the same result. With lock_dir the leader
+    also takes an flock on <lock_dir>/<key hash>.lock, so processes on one
+    host line up as well. recheck is called by the leader before func, a
+    result there (typically a cache hit written by the previous leader)
+    skips func.
+    """
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self.flights = {}
+        self._lock = threading.Lock()
+
+
+    def do(self, key, func, recheck=None):
+        with self._lock:
+            flight = self.flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self.flights[key] = Flight()
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self.share(flight.result)
+
+        try:
+            with self.lock_file(key):
+                flight.result = recheck() if recheck else None
+                if not flight.result:
+                    flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self.flights.pop(key, None)
+            flight.done.set()
+        return flight.result
+
+
+    @staticmethod
+    def share(result):
+        # followers get their own response dict, the data itself is shared
+        return dict(result) if isinstance(result, dict) else result
+
+
+    def get_lock_fpath(self, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return os.path.join(self.lock_dir, f'{digest}.lock')
+
+
+    @contextmanager
+    def lock_file(self, key):
+        if not self.lock_dir:
+            yield
+            return
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock_fpath = self.get_lock_fpath(key)
+        while True:
+            writer = open(lock_fpath, 'a')
+            fcntl.flock(writer.fileno(), fcntl.LOCK_EX)
+            try:
+                if os.fstat(writer.fileno()).st_ino == os.stat(lock_fpath).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            # the previous holder removed the file while we waited, lock a new one
+            writer.close()
+        try:
+            yield
+        finally:
+            # removed while still locked, processes waiting on it see that and retry
+            try:
+                os.remove(lock_fpath)
+            except OSError:
+                pass
+            fcntl.flock(writer.fileno(), fcntl.LOCK_UN)
+            writer.close()
@@ -1,10 +1,19 @@
 import requests
 import json
 import os
+import tempfile
 import validators
 from settings import *
 
 
+def join_ws_url(config, server_url):
+    ws_root_url = config['sister_url']
+    if ws_root_url.endswith('/'):
+        ws_root_url = ws_root_url[:-1]
+    return f'{ws_root_url}{server_url}'
+
+
+
 class PathURL:
 
     def __init__(self, path_url, path):
@@ -31,8 +40,17 @@ class SisterIO:
     def update_file(self, filename, filepath, **kwargs):
         for key, value in kwargs.items():
             filepath[key] = str(value)
-        with open(filename, 'w') as writer:
-            writer.write(json.dumps(filepath, indent=4))
+        # replaced in one step, readers never see a partly written file
+        mode = os.stat(filename).st_mode & 0o777 if os.path.isfile(filename) else 0o600
+        fd, tmp_fpath = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), prefix=f'.{os.path.basename(filename)}.')
+        try:
+            with os.fdopen(fd, 'w') as writer:
+                writer.write(json.dumps(filepath, indent=4))
+            os.chmod(tmp_fpath, mode)
+            os.replace(tmp_fpath, filename)
+        except BaseException:
+            os.remove(tmp_fpath)
+            raise
         return self.read_file(filename)
 
 
@@ -56,7 +74,8 @@ class SisterIO:
 
 
     def update_api_key(self, **kwargs):
-        api_key = self.update_file(API_KEY_FILE, self.api_key, **kwargs)
+        # a new dict, other threads keep reading the old key until it is replaced
+        api_key = self.update_file(API_KEY_FILE, dict(self.api_key), **kwargs)
         self.api_key = api_key
 
 
@@ -78,17 +97,23 @@ class SisterIO:
 
     def get_ws_url(self):
         """Get Web Service URL from environment configuration"""
+        # configuration is static for the process, compute it only once
+        ws_url = getattr(self, '_ws_url', None)
+        if not ws_url:
+            ws_url = self._ws_url = self.build_ws_url()
+        return ws_url
+
+
+    def build_ws_url(self):
         config = self.read_config()
-        ws_root_url = config['sister_url']
-        
-        if ws_root_url.endswith('/'):
-            ws_root_url = config['sister_url'][:-1]
-            
-        ws_url = self.spec.get_server('sandbox')['url']
-        if not config['use_sandbox']:
-            ws_url = self.spec.get_server('ws')['url']
-            
-        return f'{ws_root_url}{ws_url}'
+        server_name = 'ws'
+        if config['use_sandbox']:
+            server_name = 'sandbox'
+        return join_ws_url(config, self.get_server_url(server_name))
+
+
+    def get_server_url(self, server_name):
+        return self.spec.get_server(server_name)['url']
 
 
     def parse_path_url(self, path, **query):
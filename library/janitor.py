@@ -0,0 +1,152 @@
+import os
+import time
+import threading
+
+
+class CacheJanitor:
+    """
+    Cache maintenance off the request path
+
+    Every interval: evict expired entries, enforce the size quota, remove
+    blob files no entry points to, drop entries whose file is gone and
+    compact the index. File operations are paced to io_per_second so the
+    janitor never competes with request threads for the disk.
+    """
+
+    def __init__(self, cache, interval=300, io_per_second=200, batch_size=100, orphan_grace=600, metrics=None):
+        self.cache = cache # SisterCache or WebService
+        self.interval = interval
+        self.io_per_second = io_per_second
+        self.batch_size = batch_size
+        # blobs are written before their entry, younger files may not be indexed yet
+        self.orphan_grace = orphan_grace
+        self.metrics = metrics # called with the result of every run
+        self.last_run = {}
+        self.thread = None
+        self._stop = threading.Event()
+
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self._stop.clear()
+            self.thread = threading.Thread(target=self.run, name='sister-cache-janitor', daemon=True)
+            self.thread.start()
+        return self.thread
+
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+
+    def run(self):
+        """Run until stop(), the first pass starts right away"""
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+
+    def throttle(self, io_count):
+        # sleep as long as io_count operations may take, wakes up on stop()
+        if self.io_per_second and io_count:
+            self._stop.wait(io_count / self.io_per_second)
+
+
+    def run_once(self):
+        """One maintenance pass, returns its metrics"""
+        started = time.perf_counter()
+        result = {
+            'started_at': self.cache.get_now_datetime(isoformat=True),
+            'expired_count': 0,
+            'quota_evicted': 0,
+            'orphan_files': 0,
+            'orphan_bytes': 0,
+            'dangling_entries': 0,
+            'compacted': False,
+            'errors': 0,
+        }
+        for step in (self.evict_expired, self.enforce_quota, self.remove_orphans, self.compact):
+            if self._stop.is_set():
+                break
+            try:
+                step(result)
+            except Exception as e:
+                result['errors'] += 1
+                print(f"Error in cache janitor {step.__name__}: {e}")
+        result['duration_seconds'] = round(time.perf_counter() - started, 3)
+        self.last_run = result
+        if self.metrics:
+            try:
+                self.metrics(result)
+            except Exception as e:
+                print(f"Error in cache janitor metrics hook: {e}")
+        return result
+
+
+    def evict_expired(self, result):
+        # every pass starts from the index as it is now, the janitor is there
+        # to clean up after other processes too
+        self.cache.cache_db_class.reload_expiry()
+        while not self._stop.is_set():
+            expired_count = self.cache.evict_expired_cache(self.batch_size)['expired_count']
+            result['expired_count'] += expired_count
+            if expired_count < self.batch_size:
+                break
+            self.throttle(expired_count)
+
+
+    def enforce_quota(self, result):
+        # hits recorded since the last flush decide what is evicted
+        self.cache.cache_db_class.flush_touches()
+        if self.cache.cache_max_bytes:
+            result['quota_evicted'] += self.cache.enforce_cache_quota()['evicted_count']
+
+
+    def remove_orphans(self, result):
+        if not os.path.isdir(self.cache.blob_dir):
+            return
+        referenced_files = self.cache.cache_db_class.get_referenced_files()
+        min_mtime = time.time() - self.orphan_grace
+        scanned = 0
+        for dirpath, _, filenames in os.walk(self.cache.blob_dir):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                scanned += 1
+                if scanned % self.batch_size == 0:
+                    self.throttle(self.batch_size)
+                    if self._stop.is_set():
+                        return
+                if filepath in referenced_files:
+                    continue
+                try:
+                    stat = os.stat(filepath)
+                    if stat.st_mtime < min_mtime and not self.cache.cache_db_class.is_referenced(filepath):
+                        os.remove(filepath)
+                        result['orphan_files'] += 1
+                        result['orphan_bytes'] += stat.st_size
+                except OSError:
+                    pass # removed meanwhile
+
+
+    def compact(self, result):
+        cache_db = self.cache.cache_db_class
+        dangling = []
+        for index, (cache_id, cache_object) in enumerate(cache_db.read_db().items(), 1):
+            filepath = cache_object.get('filepath') if isinstance(cache_object, dict) else None
+            if filepath and not os.path.isfile(filepath):
+                dangling.append(cache_id)
+            if index % self.batch_size == 0:
+                self.throttle(self.batch_size)
+                if self._stop.is_set():
+                    return
+        if dangling:
+            result['dangling_entries'] = len(cache_db.delete_many(dangling))
+            for cache_id in dangling:
+                self.cache.memory_cache.delete(cache_id)
+        result['compacted'] = cache_db.compact()
@@ -0,0 +1,166 @@
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Client side throttling of requests to SISTER
+
+    A token bucket lets rate requests per second through, with bursts of up
+    to burst, and at most max_in_flight requests run at the same time. Zero
+    turns either limit off. A 429 empties the bucket and pauses it for its
+    Retry-After.
+
+    With adaptive the in-flight limit is controlled by AIMD between
+    min_in_flight and max_in_flight: every healthy response adds 1/limit
+    (one more slot per round of requests), a 429, 5xx, failed request or a
+    latency spike halves it. Responses to requests sent before the last
+    decrease do not decrease it again, one overload halves the limit once.
+    """
+
+    throttle_status = (429, 500, 502, 503, 504)
+    decrease = 0.5
+    latency_tolerance = 2.0 # slower than this many times the usual latency is a spike
+    latency_smoothing = 0.2 # weight of a new latency in the moving average
+    default_pause = 1.0 # seconds, 429 without a usable Retry-After
+
+    def __init__(self, rate=0, burst=0, max_in_flight=0, adaptive=False, min_in_flight=1):
+        if adaptive and not max_in_flight:
+            raise ValueError("Adaptive rate limiting needs max_in_flight as upper bound")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = self.burst
+        self.filled_ts = time.monotonic()
+        self.paused_until = 0
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min(min_in_flight, max_in_flight) if max_in_flight else min_in_flight
+        self.adaptive = adaptive
+        # adaptive starts halfway and grows while the server keeps up
+        self.limit = max(self.min_in_flight, max_in_flight // 2)
+        self.in_flight = 0
+        self.latency = None # moving average of healthy responses, seconds
+        self.decreased_ts = 0
+        self.throttled = 0
+        self._cond = threading.Condition()
+
+
+    @classmethod
+    def from_config(cls, config):
+        max_in_flight = config['max_in_flight']
+        if config['rate_limit_adaptive'] and not max_in_flight:
+            max_in_flight = config['http_pool_size']
+        return cls(
+            rate = config['rate_limit_per_second'],
+            burst = config['rate_limit_burst'],
+            max_in_flight = max_in_flight,
+            adaptive = config['rate_limit_adaptive'],
+        )
+
+
+    def is_enabled(self):
+        return bool(self.rate or self.max_in_flight)
+
+
+    def get_limit(self):
+        if self.adaptive:
+            return int(self.limit)
+        return self.max_in_flight
+
+
+    def get_wait_seconds(self):
+        # 0 when a request may start, None to wait for a release
+        now = time.monotonic()
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self.max_in_flight and self.in_flight >= self.get_limit():
+            return None
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.filled_ts) * self.rate)
+            self.filled_ts = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+        return 0
+
+
+    def take(self):
+        # with the lock held: (start time, 0) or (None, seconds to wait)
+        wait = self.get_wait_seconds()
+        if wait != 0:
+            return None, wait
+        if self.rate:
+            self.tokens -= 1
+        self.in_flight += 1
+        return time.monotonic(), 0
+
+
+    def acquire(self):
+        """Wait for a token and a free slot, returns the start time to pass to release"""
+        if not self.is_enabled():
+            return time.monotonic()
+        with self._cond:
+            started, wait = self.take()
+            while started is None:
+                self._cond.wait(wait)
+                started, wait = self.take()
+        return started
+
+
+    def try_acquire(self):
+        """acquire without waiting, (start time, 0) or (None, seconds to wait, None until a release)"""
+        if not self.is_enabled():
+            return time.monotonic(), 0
+        with self._cond:
+            return self.take()
+
+
+    def release(self, started, status_code=None, retry_after=None):
+        """Free the slot of a request, status_code None is a failed request"""
+        if not self.is_enabled():
+            return
+        latency = time.monotonic() - started
+        with self._cond:
+            self.in_flight -= 1
+            if status_code == 429:
+                self.throttled += 1
+                self.pause(retry_after)
+            if self.adaptive:
+                self.adapt(started, latency, status_code)
+            self._cond.notify_all()
+
+
+    def pause(self, retry_after=None):
+        try:
+            seconds = float(retry_after)
+        except (TypeError, ValueError):
+            seconds = self.default_pause # missing or an HTTP date
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+    def adapt(self, started, latency, status_code):
+        overloaded = status_code is None or status_code in self.throttle_status
+        if status_code is not None:
+            if self.latency is not None and latency > self.latency * self.latency_tolerance:
+                overloaded = True
+            # spikes count too, a server that stays slower becomes the new usual
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.latency_smoothing * (latency - self.latency)
+        if not overloaded:
+            self.limit = min(self.max_in_flight, self.limit + 1 / self.limit)
+        elif started > self.decreased_ts:
+            self.limit = max(self.min_in_flight, self.limit * self.decrease)
+            self.decreased_ts = time.monotonic()
+
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                'rate': self.rate,
+                'tokens': round(self.tokens, 2),
+                'in_flight': self.in_flight,
+                'limit': self.get_limit(),
+                'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+                'throttled': self.throttled,
+            }
@@ -0,0 +1,69 @@
+import re
+from typing import NamedTuple
+from library.io import PathURL
+
+
+PATH_PARAM_FORMAT = r"{([^{}]+)}" # inside curly bracket
+
+
+class KeepMissing(dict):
+    # leave unknown {placeholder} untouched, like the old str.replace did
+    def __missing__(self, key):
+        return f'{{{key}}}'
+
+
+
+class RequestPlan(NamedTuple):
+    """Everything needed to call one endpoint, compiled once from the spec"""
+    method: str
+    path: str
+    path_params: tuple
+    query_params: tuple
+    required: frozenset
+    params: tuple
+    base_url: str
+    tags: tuple = ()
+
+
+    @classmethod
+    def compile(cls, route, base_url):
+        params = tuple(route['params'])
+        path_params = tuple(re.findall(PATH_PARAM_FORMAT, route['path']))
+        query_params = tuple(x['name'] for x in params if x.get('in') == 'query' and x.get('name'))
+        required = frozenset(x['name'] for x in params if x.get('required') == True and x.get('name'))
+        return cls(
+            method = route['method'].lower(),
+            path = route['path'],
+            path_params = path_params,
+            query_params = query_params,
+            required = required,
+            params = params,
+            base_url = base_url,
+            tags = tuple(route['attr'].get('tags') or ()),
+        )
+
+
+    def check_required(self, kwargs):
+        if not self.required.issubset(kwargs):
+            raise NameError(f'Require argument {sorted(self.required)}\n\nARGUMENTS HINT:\n{list(self.params)}')
+
+
+    def cache_key(self, kwargs):
+        # same key as SisterIO.parse_path_url: filled path + query in kwargs order
+        path = self.path
+        if not kwargs:
+            return path
+        if self.path_params:
+            path = path.format_map(KeepMissing((k, v) for k, v in kwargs.items() if k in self.path_params))
+        query = '&'.join([
+            f'{key}={value}' for key, value in kwargs.items()
+            if key not in self.path_params and not (key.startswith('__') or key.endswith('__'))
+        ])
+        if query:
+            path = f'{path}?{query}'
+        return path
+
+
+    def build(self, kwargs):
+        path = self.cache_key(kwargs)
+        return PathURL(f'{self.base_url}{path}', path)
@@ -0,0 +1,123 @@
+import os
+import re
+from fnmatch import fnmatchcase
+from library.api_spec import normalize_tag
+from settings import BASE_DIR
+
+
+DURATION_UNITS = {
+    's' : 'seconds',
+    'm' : 'minutes',
+    'h' : 'hours',
+    'd' : 'days',
+    'w' : 'weeks',
+}
+
+# reference tables barely change, personal and assignment data does
+DEFAULT_CACHE_POLICIES = {
+    'referensi'    : {'ttl': '14d'},
+    'data_pribadi' : {'ttl': '6h'},
+    'penugasan'    : {'ttl': '1h'},
+    'bkd'          : {'ttl': '1h'},
+}
+
+
+def parse_duration(value):
+    """'14d' -> {'days': 14}, a bare number is days"""
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, (int, float)):
+        return {'days': value}
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*', str(value).lower())
+    if not match:
+        raise ValueError(f"Invalid cache duration '{value}', use e.g. 30m, 6h, 14d or 2w")
+    number, unit = match.groups()
+    number = float(number) if '.' in number else int(number)
+    return {DURATION_UNITS[unit or 'd']: number}
+
+
+def parse_policy(value):
+    # "14d", "14d:1d" (ttl:max_stale) or {'ttl': ..., 'max_stale': ...}
+    if not isinstance(value, dict):
+        ttl, _, max_stale = str(value).partition(':')
+        value = {'ttl': ttl, 'max_stale': max_stale or None}
+    policy = {}
+    for key in ('ttl', 'max_stale'):
+        if value.get(key) not in (None, ''):
+            policy[key] = parse_duration(value[key])
+    return policy
+
+
+def parse_policies(text):
+    """'referensi=14d,/bkd/*=1h:30m' from CACHE_POLICIES"""
+    policies = {}
+    for item in (text or '').split(','):
+        selector, _, value = item.partition('=')
+        if selector.strip() and value.strip():
+            policies[selector.strip()] = value.strip()
+    return policies
+
+
+def load_policy_file(filename):
+    if not filename:
+        return {}
+    filename = os.path.join(BASE_DIR, filename) # relative to the project root
+    if not os.path.isfile(filename):
+        print(f"Cache policy file {filename} not found")
+        return {}
+    import yaml
+    with open(filename, 'r') as reader:
+        return yaml.safe_load(reader) or {}
+
+
+
+class CachePolicy:
+    """
+    Cache TTL and max stale per endpoint
+
+    A selector is a path pattern (/referensi/*, /bkd/*) or, like
+    SISTER_SPEC_TAGS, a spec tag or first path segment (referensi, data_pokok).
+    Path patterns win over tags, configured rules win over the defaults.
+    """
+
+    def __init__(self, policies=None):
+        self.rules = []
+        self.resolved = {}
+        for selector, value in (policies or {}).items():
+            self.add(selector, value)
+
+
+    @classmethod
+    def from_config(cls, config):
+        policies = dict(parse_policies(config['cache_policies']))
+        for selector, value in load_policy_file(config['cache_policy_file']).items():
+            policies.setdefault(selector, value)
+        for selector, value in DEFAULT_CACHE_POLICIES.items():
+            policies.setdefault(selector, value)
+        return cls(policies)
+
+
+    def add(self, selector, value):
+        selector = str(selector).strip()
+        if not selector.startswith('/'):
+            selector = normalize_tag(selector)
+        self.rules.append((selector, parse_policy(value)))
+        self.resolved.clear()
+
+
+    def match(self, selector, path, tags):
+        if selector.startswith('/'):
+            return fnmatchcase(path, selector)
+        return selector in tags
+
+
+    def resolve(self, path, tags=()):
+        """Policy of a spec path, empty when no rule matches"""
+        policy = self.resolved.get(path)
+        if policy is None:
+            tags = {normalize_tag(x) for x in tags}
+            tags.add(normalize_tag(path.strip('/').split('/')[0]))
+            rules = sorted(self.rules, key=lambda x: not x[0].startswith('/'))
+            policy = next((x[1] for x in rules if self.match(x[0], path, tags)), {})
+            self.resolved[path] = policy
+        return policy
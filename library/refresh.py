@@ -0,0 +1,54 @@
+import queue
+import threading
+
+
+class RefreshQueue:
+    """Bounded background queue, one pending refresh per cache key"""
+
+    def __init__(self, max_size=100, workers=1):
+        self.max_size = max_size
+        self.workers = workers
+        self.tasks = queue.Queue(maxsize=max_size)
+        self.pending = set()
+        self.threads = []
+        self._lock = threading.Lock()
+
+
+    def start(self):
+        # caller holds the lock, threads are started on first submit
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self.run, name=f'sister-refresh-{len(self.threads)}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+
+    def submit(self, key, func):
+        """Queue func unless key is already pending or the queue is full"""
+        with self._lock:
+            if key in self.pending:
+                return False
+            try:
+                self.tasks.put_nowait((key, func))
+            except queue.Full:
+                return False
+            self.pending.add(key)
+            self.start()
+        return True
+
+
+    def run(self):
+        while True:
+            key, func = self.tasks.get()
+            try:
+                func()
+            except Exception as e:
+                print(f"Error refreshing cache {key}: {e}")
+            finally:
+                with self._lock:
+                    self.pending.discard(key)
+                self.tasks.task_done()
+
+
+    def join(self):
+        """Wait until every queued refresh is done"""
+        self.tasks.join()
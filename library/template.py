@@ -61,6 +61,11 @@ class SisterTemplate:
 
 
     def iso_to_datetime(self, iso_datetime):
+        try:
+            # fast path, covers every format below
+            return datetime.fromisoformat(iso_datetime)
+        except (ValueError, TypeError):
+            pass
         try:
             # Try ISO format first
             iso_format = "%Y-%m-%dT%H:%M:%S.%f"
@@ -1,36 +1,83 @@
 import json
+import hashlib
+import threading
+from datetime import timedelta
+from functools import partial
 from library.connector import SisterSession, BearerAuth
 from library.io import SisterIO
 from library.api_spec import SisterSpec
 from library.cache import SisterCache
+from library.plan import RequestPlan
+from library.refresh import RefreshQueue
+from library.janitor import CacheJanitor
+from library.limiter import RateLimiter
+from library.flight import SingleFlight
+from library.policy import CachePolicy
 from settings import *
 
 
+# one token request at a time for every client of the process
+API_KEY_LOCK = threading.Lock()
+
+
 
 class WebService(SisterIO, SisterCache):
 
-    def __init__(self):
+    def __init__(self, tags=None, janitor=None):
         SisterCache.__init__(self)
         self.session = SisterSession()
-        self.spec = SisterSpec()
+        # requests per second and in flight to SISTER, see library/limiter.py
+        self.limiter = RateLimiter.from_config(ENV_CONFIG)
+        self.spec = SisterSpec(tags)
+        self.plans = {}
         self.config  = self.read_config()
         self.token_expired_datetime = {"minutes": 60}
         
         # Use environment variables for cache configuration
         self.cache_expired_datetime = {"days": ENV_CONFIG['cache_expiration_days']}
+        # TTL and max stale per endpoint, see library/policy.py
+        self.cache_policy = CachePolicy.from_config(ENV_CONFIG)
+
+        # stale-while-revalidate, expired entries within max stale are served while refreshed
+        self.stale_while_revalidate = ENV_CONFIG['cache_stale_while_revalidate']
+        self.cache_max_stale = {"minutes": ENV_CONFIG['cache_max_stale_minutes']}
+        self.max_stale = {}
+        self.refresh_queue = RefreshQueue(ENV_CONFIG['cache_refresh_queue_size'])
+        # concurrent calls of one uncached path share a single request, optionally across processes
+        self.single_flight = ENV_CONFIG['cache_single_flight']
+        self.flights = SingleFlight(os.path.join(CACHE_DIR, 'locks') if ENV_CONFIG['cache_single_flight_lock'] else None)
         
         self.use_cache()
-        self.read_and_validate_api()
+        # API key file is read on first use, see api_key property
+        self._api_key = None
         
-        # Enable auto cleanup if configured
+        # Enable auto cleanup if configured, at most cache_cleanup_batch entries per request
+        self.cache_cleanup_batch = ENV_CONFIG['cache_cleanup_batch']
         if ENV_CONFIG['auto_cleanup_cache']:
             self.enable_auto_cleanup(True)
 
+        # background cache maintenance, see library/janitor.py, janitor overrides CACHE_JANITOR
+        self.janitor = None
+        if ENV_CONFIG['cache_janitor'] if janitor is None else janitor:
+            self.start_janitor()
+
 
     def use_cache(self, status=True):
         self.caching_system = status
 
 
+    @property
+    def api_key(self):
+        if self._api_key is None:
+            self.read_and_validate_api()
+        return self._api_key
+
+
+    @api_key.setter
+    def api_key(self, api_key):
+        self._api_key = api_key
+
+
     def read_and_validate_api(self):
         try:
             self.api_key = self.read_api_key()
@@ -53,7 +100,7 @@ class WebService(SisterIO, SisterCache):
             response['message'] = 'Config or API is not valid'
             return self.parse_response(response)
         auth_data   = self.get_auth_data()
-        get_api_key = self.session.post(f"{self.get_ws_url()}/authorize", json=auth_data)
+        get_api_key = self.send_limited(self.session.post, f"{self.get_ws_url()}/authorize", json=auth_data)
         if self.is_json(get_api_key.text):
             json_api_key = get_api_key.json()
             if get_api_key.status_code == STATUS_SUCCESS:
@@ -72,7 +119,7 @@ class WebService(SisterIO, SisterCache):
         return self.parse_response(response)
         
 
-    def get_response(self, connector, path, attr, response, fresh_api_key, **kwargs):
+    def get_response(self, connector, plan, response, fresh_api_key, **kwargs):
         content_type = connector.headers.get('Content-Type')
         response['content-type'] = content_type
         if content_type == 'application/json':
@@ -83,8 +130,8 @@ class WebService(SisterIO, SisterCache):
                 if fresh_api_key:
                     response['message'] = "API key invalid, check your credential"
                     return self.parse_response(response)
-                self.request_api_key()
-                return self.get_data(path, True, **kwargs)
+                self.check_api_key(invalid_token=self.api_key.get('token'))
+                return self.fetch_plan(plan, True, **kwargs)
             else:
                 response['message'] = json_object['message']
                 response['detail']  = json_object['detail']
@@ -95,7 +142,7 @@ class WebService(SisterIO, SisterCache):
         return self.parse_response(response)
 
 
-    def connect(self, method, path_url):
+    def connect(self, method, path_url, **request_kwargs):
         method    = method.lower()
         connector = self.session
         if method == HTTP_METHOD_GET:
@@ -109,75 +156,334 @@ class WebService(SisterIO, SisterCache):
         api_token = self.api_key.get('token')
         if not api_token:
             # request again when unavailable
-            self.request_api_key()
+            self.check_api_key()
             api_token = self.api_key.get('token')
-        response = connector(path_url, auth=BearerAuth(api_token))
+        response = self.send_limited(connector, path_url, auth=BearerAuth(api_token), **request_kwargs)
+        return response
+
+
+    def send_limited(self, send, *args, **kwargs):
+        """send(*args, **kwargs) within a slot of the rate limiter"""
+        # retries of the session happen within one slot of the limiter
+        started = self.limiter.acquire()
+        try:
+            response = send(*args, **kwargs)
+        except Exception:
+            self.limiter.release(started)
+            raise
+        self.limiter.release(started, response.status_code, response.headers.get('Retry-After'))
         return response
             
 
 
+    def get_plan(self, path):
+        plan = self.plans.get(path)
+        if plan is None:
+            route = self.spec.get_route(path)
+            plan = self.plans[path] = RequestPlan.compile(route, self.get_ws_url())
+        return plan
+
+
     def get_data(self, path, fresh_api_key=False, **kwargs):
         # Input validation
         if not path or not isinstance(path, str):
             response = self.response_template()
             response['message'] = 'Invalid path parameter'
             return self.parse_response(response)
-            
-        response = self.response_template()
-        path_url = self.parse_path_url(path, **kwargs)
+        return self.execute_plan(self.get_plan(path), fresh_api_key, **kwargs)
 
-        # set default response
-        response['cache'] = False
-        response['accessed_at'] = self.get_now_datetime()
-        response['expired_at']  = self.get_expired_datetime(**self.cache_expired_datetime)
-        response['accessed_at_iso'] = str(response['accessed_at'])
-        response['expired_at_iso']  = str(response['expired_at'])
 
-        # check whether authorization is success or not
-        if not self.api_key:
+    def is_api_key_valid(self):
+        if not self.api_key.get('token'):
+            return False
+        token_expired_time = self.api_key.get('expired_at')
+        return not token_expired_time or self.get_now_datetime() < self.iso_to_datetime(token_expired_time)
+
+
+    def check_api_key(self, invalid_token=None):
+        """Error response when no token can be requested, None otherwise
+
+        Threads that find the token missing or expired wait for one of them
+        to request it. invalid_token is a token the server rejected, it is
+        replaced unless another thread already did.
+        """
+        if invalid_token is None and self.is_api_key_valid():
+            return None
+        with API_KEY_LOCK:
+            # renewed meanwhile by another client or process
+            self.read_and_validate_api()
+            if invalid_token is None and self.is_api_key_valid():
+                return None
+            if invalid_token is not None and self.api_key.get('token') not in (None, '', invalid_token):
+                return None
             api_key = self.request_api_key()
             if not api_key['status'] == True:
-                return api_key        
-            self.read_and_validate_api()
+                return api_key
+
+
+    def refresh_api_key(self):
+        # renew an expired token, see check_api_key
+        self.check_api_key()
 
-        # Auto-cleanup expired cache (optional, can be disabled)
-        if hasattr(self, 'auto_cleanup_cache') and self.auto_cleanup_cache:
-            self.cleanup_expired_cache()
-
-        # check from cache
-        cache_available = self.get_cache(path_url.name())
-        if cache_available.get('data'):
-            response['data'] = cache_available.get('data')
-            accessed_at = self.iso_to_datetime(cache_available.get('accessed_at'))
-            expired_at  = self.iso_to_datetime(cache_available.get('expired_at'))
-            if self.get_now_datetime() < expired_at:
-                # update response when using cache
-                response['cache'] = True
-                response['accessed_at'] = accessed_at
-                response['expired_at']  = expired_at
-                response['accessed_at_iso'] = str(accessed_at)
-                response['expired_at_iso']  = str(expired_at)
+
+    def execute_plan(self, plan, fresh_api_key=False, **kwargs):
+        response = self.response_template()
+        path_url = plan.build(kwargs)
+        now_datetime = self.get_now_datetime()
+
+        api_key = self.check_api_key()
+        if api_key:
+            return api_key
+
+        # check from cache, the payload is only read when the entry is still fresh
+        now_ts = now_datetime.timestamp()
+        cache_available = self.get_cache_meta(path_url.name())
+        if cache_available and self.is_cache_fresh(cache_available, now_ts):
+            cache_data = self.load_cache_data(cache_available)
+            if cache_data:
+                return self.get_cache_response(response, cache_available, cache_data)
+        elif cache_available and self.stale_while_revalidate and self.is_cache_fresh(
+                cache_available, now_ts - self.get_max_stale_seconds(plan)):
+            # expired but within max stale, answer now and refresh in background
+            cache_data = self.load_cache_data(cache_available)
+            if cache_data:
+                refresh = partial(self.fetch_plan, plan, False, **kwargs)
+                self.refresh_queue.submit(path_url.name(), refresh)
+                response = self.get_cache_response(response, cache_available, cache_data)
+                response['stale'] = True
                 return response
 
-        # check api-key expiration
-        token_expired_time = self.api_key.get('expired_at')
-        if token_expired_time:
-            token_expired_time = self.iso_to_datetime(token_expired_time)
-            if self.get_now_datetime() > token_expired_time:
-                self.request_api_key()
+        # Auto-cleanup expired cache (optional, can be disabled), a few entries
+        # per request to the server, the full sweep is cleanup_expired_cache.
+        # Not needed while the janitor runs
+        if hasattr(self, 'auto_cleanup_cache') and self.auto_cleanup_cache and not self.is_janitor_running():
+            self.evict_expired_cache(self.cache_cleanup_batch)
+
+        if not self.single_flight:
+            return self.fetch_plan(plan, fresh_api_key, **kwargs)
+        # the previous leader may have just saved it, check the cache again before requesting
+        return self.flights.do(
+            path_url.name(),
+            partial(self.fetch_plan, plan, fresh_api_key, **kwargs),
+            recheck = partial(self.get_fresh_cache_response, path_url.name()),
+        )
+
+
+    def get_fresh_cache_response(self, path):
+        """Response from cache when the entry of path is fresh, None otherwise"""
+        cache_object = self.get_cache_meta(path)
+        if cache_object and self.is_cache_fresh(cache_object):
+            cache_data = self.load_cache_data(cache_object)
+            if cache_data:
+                return self.get_cache_response(self.response_template(), cache_object, cache_data)
+        return None
+
+
+    def get_cache_response(self, response, cache_object, cache_data):
+        # update response when using cache
+        # str(datetime) is isoformat with space separator, reuse the stored text
+        accessed_at_iso = cache_object.get('accessed_at')
+        expired_at_iso  = cache_object.get('expired_at')
+        response['data']  = cache_data
+        response['cache'] = True
+        response['stale'] = False
+        if cache_object.get('binary'):
+            # photos and documents keep their original mime type
+            response['content-type'] = cache_object.get('content_type')
+        response['accessed_at'] = self.iso_to_datetime(accessed_at_iso)
+        response['expired_at']  = self.iso_to_datetime(expired_at_iso)
+        response['accessed_at_iso'] = accessed_at_iso.replace('T', ' ', 1)
+        response['expired_at_iso']  = expired_at_iso.replace('T', ' ', 1)
+        return response
 
-        # read and validate API Key again
-        self.read_and_validate_api()
-        method, attr = self.spec.get_path_method_and_attr(path)
-        connector = self.connect(method, path_url)
-        response  = self.get_response(connector, path, attr, response, fresh_api_key, **kwargs)
 
-        # save response to cache to make it faster
-        self.save_cache(path_url.name(), response, **self.cache_expired_datetime)
+    def get_fetch_response(self, plan):
+        """Default response of a request to the server and the cache TTL of plan"""
+        response = self.response_template()
+        now_datetime = self.get_now_datetime()
+        response['cache'] = False
+        response['stale'] = False
+        response['accessed_at'] = now_datetime
+        cache_ttl = self.get_cache_ttl(plan)
+        response['expired_at']  = self.get_expired_datetime(now_datetime, **cache_ttl)
+        response['accessed_at_iso'] = str(response['accessed_at'])
+        response['expired_at_iso']  = str(response['expired_at'])
+        return response, cache_ttl
+
+
+    def fetch_plan(self, plan, fresh_api_key=False, **kwargs):
+        """Request plan from the server and save it to cache"""
+        path_url = plan.build(kwargs)
+        response, cache_ttl = self.get_fetch_response(plan)
+
+        api_key = self.check_api_key()
+        if api_key:
+            return api_key
+        api_token = self.api_key.get('token')
+        connector = self.connect(plan.method, path_url)
+        if connector.status_code == STATUS_TOKEN_INVALID and not fresh_api_key:
+            api_key = self.check_api_key(invalid_token=api_token)
+            if api_key:
+                return api_key
+            return self.fetch_plan(plan, True, **kwargs)
+        # a 401 here already had a fresh token, get_response reports it
+        response  = self.get_response(connector, plan, response, True, **kwargs)
+
+        # save response to cache to make it faster, error pages are not cached
+        if connector.status_code in [STATUS_SUCCESS, STATUS_SUCCESS_NO_REPLY]:
+            self.save_cache(path_url.name(), response, self.get_keep_stale_seconds(plan), **cache_ttl)
 
         return response
 
 
+    def get_file_checksum(self, filepath, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        hasher = hashlib.sha256()
+        with open(filepath, 'rb') as reader:
+            for chunk in iter(lambda: reader.read(chunk_size), b''):
+                hasher.update(chunk)
+        return hasher
+
+
+    def download(self, path, destination, sha256=None, resume=True, chunk_size=DOWNLOAD_CHUNK_SIZE, **kwargs):
+        """
+        Stream a file endpoint (e.g. /dokumen/{id}/download) to destination
+
+        destination is a file path or a writable binary file object. Chunks are
+        written as they arrive and hashed on the fly, memory use does not grow
+        with the file size. For a file path, an existing file with the same
+        size (and sha256, when given) is kept, and an interrupted download
+        (<destination>.part) is resumed with a Range request.
+        """
+        response = self.response_template()
+        plan = self.get_plan(path)
+        plan.check_required(kwargs)
+        path_url = plan.build(kwargs)
+
+        api_key = self.check_api_key()
+        if api_key:
+            return api_key
+
+        is_path = not hasattr(destination, 'write')
+        result = {'path': destination if is_path else None, 'size': 0, 'sha256': None,
+                  'content_type': None, 'resumed': False, 'skipped': False}
+
+        # skip without a request when the file is already there and verified
+        if is_path and sha256 and os.path.isfile(destination):
+            if self.get_file_checksum(destination, chunk_size).hexdigest() == sha256:
+                result.update(size=os.path.getsize(destination), sha256=sha256, skipped=True)
+                response['data'] = result
+                return self.parse_response(response)
+
+        part_fpath = f'{destination}.part' if is_path else None
+        part_size = os.path.getsize(part_fpath) if is_path and resume and os.path.isfile(part_fpath) else 0
+        headers = {'Range': f'bytes={part_size}-'} if part_size else {}
+
+        api_token = self.api_key.get('token')
+        connector = self.connect(plan.method, path_url, stream=True, headers=headers)
+        if connector.status_code == STATUS_TOKEN_INVALID:
+            connector.close()
+            api_key = self.check_api_key(invalid_token=api_token)
+            if api_key:
+                return api_key
+            connector = self.connect(plan.method, path_url, stream=True, headers=headers)
+
+        try:
+            if connector.status_code == STATUS_RANGE_NOT_SATISFIABLE:
+                # nothing left to send, .part is complete when it has the expected
+                # sha256 or, without one, the total size of Content-Range (bytes */total)
+                connector.close()
+                hasher = self.get_file_checksum(part_fpath, chunk_size)
+                total_size = connector.headers.get('Content-Range', '').rpartition('/')[2]
+                if (hasher.hexdigest() == sha256) if sha256 else (total_size == str(part_size)):
+                    result.update(size=part_size, resumed=True)
+                    return self.finish_download(response, result, hasher, sha256, part_fpath)
+                headers, part_size = {}, 0
+                connector = self.connect(plan.method, path_url, stream=True)
+            if connector.status_code not in [STATUS_SUCCESS, STATUS_PARTIAL_CONTENT]:
+                response['message'] = f"Download failed with HTTP status {connector.status_code}"
+                json_object = self.is_json(connector.text)
+                if json_object:
+                    response['message'] = json_object.get('message', response['message'])
+                    response['detail']  = json_object.get('detail', '')
+                return self.parse_response(response)
+
+            result['content_type'] = connector.headers.get('Content-Type')
+            content_length = connector.headers.get('Content-Length')
+            if (is_path and not sha256 and connector.status_code == STATUS_SUCCESS and content_length
+                    and os.path.isfile(destination) and os.path.getsize(destination) == int(content_length)):
+                result.update(size=int(content_length), skipped=True)
+                response['data'] = result
+                return self.parse_response(response)
+
+            hasher = hashlib.sha256()
+            if connector.status_code == STATUS_PARTIAL_CONTENT and part_size:
+                hasher = self.get_file_checksum(part_fpath, chunk_size)
+                result.update(size=part_size, resumed=True)
+                writer = open(part_fpath, 'ab')
+            elif is_path:
+                writer = open(part_fpath, 'wb')
+            else:
+                writer = destination
+
+            try:
+                for chunk in connector.iter_content(chunk_size=chunk_size):
+                    writer.write(chunk)
+                    hasher.update(chunk)
+                    result['size'] += len(chunk)
+            finally:
+                if is_path:
+                    writer.close()
+        finally:
+            connector.close()
+        return self.finish_download(response, result, hasher, sha256, part_fpath)
+
+
+    def finish_download(self, response, result, hasher, sha256=None, part_fpath=None):
+        # verify the checksum and move .part to the destination path
+        result['sha256'] = hasher.hexdigest()
+        if sha256 and result['sha256'] != sha256:
+            if part_fpath:
+                os.remove(part_fpath)
+            response['message'] = "Downloaded file does not match the expected sha256"
+            response['detail']  = result
+            return self.parse_response(response)
+        if part_fpath:
+            os.replace(part_fpath, result['path'])
+        response['data'] = result
+        return self.parse_response(response)
+
+
+    def enable_stale_while_revalidate(self, status=True):
+        """Serve expired cache within max stale and refresh it in background"""
+        self.stale_while_revalidate = status
+
+
+    def set_max_stale(self, path, **max_stale):
+        """Max stale window of one endpoint, e.g. set_max_stale('/referensi/sdm', hours=6)"""
+        self.max_stale[path] = max_stale
+
+
+    def get_max_stale_seconds(self, plan):
+        max_stale = self.max_stale.get(plan.path)
+        if max_stale is None:
+            max_stale = self.cache_policy.resolve(plan.path, plan.tags).get('max_stale', self.cache_max_stale)
+        return timedelta(**max_stale).total_seconds()
+
+
+    def get_keep_stale_seconds(self, plan=None):
+        """Seconds an expired entry is kept to be served stale, 0 without stale-while-revalidate"""
+        if not self.stale_while_revalidate:
+            return 0
+        if plan is None:
+            return timedelta(**self.cache_max_stale).total_seconds()
+        return self.get_max_stale_seconds(plan)
+
+
+    def get_cache_ttl(self, plan):
+        """Cache TTL of an endpoint, from cache_policy or cache_expired_datetime"""
+        return self.cache_policy.resolve(plan.path, plan.tags).get('ttl', self.cache_expired_datetime)
+
+
     def enable_auto_cleanup(self, status=True):
         """Enable or disable automatic cache cleanup"""
         self.auto_cleanup_cache = status
@@ -190,6 +496,35 @@ class WebService(SisterIO, SisterCache):
         return {'expired_count': 0, 'removed_files': [], 'remaining_cache': 0}
 
 
+    def evict_expired_cache(self, limit=10):
+        """Remove up to limit expired cache entries"""
+        if hasattr(self, 'caching_system') and self.caching_system:
+            return super().evict_expired_cache(limit)
+        return {'expired_count': 0, 'removed_files': []}
+
+
+    def start_janitor(self, interval=None, io_per_second=None, metrics=None):
+        """Run cache maintenance in a daemon thread, metrics(result) is called after every pass"""
+        if self.janitor is None:
+            self.janitor = CacheJanitor(
+                self,
+                interval = interval or ENV_CONFIG['cache_janitor_interval_seconds'],
+                io_per_second = ENV_CONFIG['cache_janitor_io_per_second'] if io_per_second is None else io_per_second,
+                metrics = metrics,
+            )
+        self.janitor.start()
+        return self.janitor
+
+
+    def stop_janitor(self):
+        if self.janitor is not None:
+            self.janitor.stop()
+
+
+    def is_janitor_running(self):
+        return self.janitor is not None and self.janitor.is_running()
+
+
     def get_cache_stats(self):
         """Get cache statistics"""
         if hasattr(self, 'caching_system') and self.caching_system:
@@ -25,8 +25,38 @@ def get_env_config():
         'id_pengguna': os.getenv('SISTER_ID_PENGGUNA'),
         'cache_expiration_days': int(os.getenv('CACHE_EXPIRATION_DAYS', '1')),
         'auto_cleanup_cache': os.getenv('AUTO_CLEANUP_CACHE', 'false').lower() == 'true',
+        'cache_cleanup_batch': int(os.getenv('CACHE_CLEANUP_BATCH', '10')),
+        'cache_max_size_mb': int(os.getenv('CACHE_MAX_SIZE_MB', '0')),
+        'cache_eviction_policy': os.getenv('CACHE_EVICTION_POLICY', 'lru').lower(),
+        'cache_janitor': os.getenv('CACHE_JANITOR', 'false').lower() == 'true',
+        'cache_janitor_interval_seconds': int(os.getenv('CACHE_JANITOR_INTERVAL_SECONDS', '300')),
+        'cache_janitor_io_per_second': int(os.getenv('CACHE_JANITOR_IO_PER_SECOND', '200')),
+        'cache_backend': os.getenv('CACHE_BACKEND', 'json').lower(),
+        'cache_memory_entries': int(os.getenv('CACHE_MEMORY_ENTRIES', '256')),
+        'cache_memory_mb': int(os.getenv('CACHE_MEMORY_MB', '32')),
+        'cache_codec': os.getenv('CACHE_CODEC', 'zlib').lower(),
+        'cache_compress_min_kb': int(os.getenv('CACHE_COMPRESS_MIN_KB', '16')),
+        'cache_binary_expiration_days': int(os.getenv('CACHE_BINARY_EXPIRATION_DAYS', '7')),
+        'cache_stale_while_revalidate': os.getenv('CACHE_STALE_WHILE_REVALIDATE', 'false').lower() == 'true',
+        'cache_max_stale_minutes': int(os.getenv('CACHE_MAX_STALE_MINUTES', '60')),
+        'cache_refresh_queue_size': int(os.getenv('CACHE_REFRESH_QUEUE_SIZE', '100')),
+        'cache_single_flight': os.getenv('CACHE_SINGLE_FLIGHT', 'true').lower() == 'true',
+        'cache_single_flight_lock': os.getenv('CACHE_SINGLE_FLIGHT_LOCK', 'false').lower() == 'true',
+        'cache_policies': os.getenv('CACHE_POLICIES', ''),
+        'cache_policy_file': os.getenv('CACHE_POLICY_FILE', ''),
         'api_timeout_seconds': int(os.getenv('API_TIMEOUT_SECONDS', '30')),
-        'max_retries': int(os.getenv('MAX_RETRIES', '3'))
+        'api_connect_timeout_seconds': int(os.getenv('API_CONNECT_TIMEOUT_SECONDS', '5')),
+        'max_retries': int(os.getenv('MAX_RETRIES', '3')),
+        'retry_backoff_seconds': float(os.getenv('RETRY_BACKOFF_SECONDS', '0.5')),
+        'retry_jitter_seconds': float(os.getenv('RETRY_JITTER_SECONDS', '0.5')),
+        'http_pool_size': int(os.getenv('HTTP_POOL_SIZE', '20')),
+        'async_max_concurrency': int(os.getenv('ASYNC_MAX_CONCURRENCY', '20')),
+        'batch_max_workers': int(os.getenv('BATCH_MAX_WORKERS', '8')),
+        'rate_limit_per_second': float(os.getenv('RATE_LIMIT_PER_SECOND', '0')),
+        'rate_limit_burst': int(os.getenv('RATE_LIMIT_BURST', '0')),
+        'max_in_flight': int(os.getenv('MAX_IN_FLIGHT', '0')),
+        'rate_limit_adaptive': os.getenv('RATE_LIMIT_ADAPTIVE', 'false').lower() == 'true',
+        'spec_tags': [x.strip() for x in os.getenv('SISTER_SPEC_TAGS', '').split(',') if x.strip()],
     }
     
     # Validate required environment variables
@@ -49,12 +79,14 @@ ENV_CONFIG = get_env_config()
 STATUS_SUCCESS_WITH_REPLY   = 200
 STATUS_SUCCESS              = STATUS_SUCCESS_WITH_REPLY
 STATUS_SUCCESS_NO_REPLY     = 204
+STATUS_PARTIAL_CONTENT      = 206
 STATUS_REQ_INVALID          = 400
 STATUS_TOKEN_INVALID        = 401
 STATUS_CHANGES_DENIED       = 403
 STATUS_ENDPOINT_NOTFOUND    = 404
 STATUS_HTTP_DENIED          = 405
 STATUS_ENDPOINT_EXIST       = 409
+STATUS_RANGE_NOT_SATISFIABLE = 416
 STATUS_ERROR                = 500
 
 
@@ -63,3 +95,6 @@ HTTP_METHOD_POST    = 'post'
 HTTP_METHOD_PATCH   = 'patch'
 HTTP_METHOD_DELETE  = 'delete'
 
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
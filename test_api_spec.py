@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Test script for API spec loading and lookup
+"""
+
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(__file__))
+
+def test_compiled_spec():
+    """Test compiled spec artifact matches the YAML source"""
+    print("Testing compiled spec artifact...")
+    from library import api_spec
+
+    spec = api_spec.get_specs()
+    assert os.path.isfile(api_spec.API_SPEC_COMPILED_FILE)
+    assert spec == api_spec.load_yaml_specs()
+
+    # artifact is keyed by the YAML fingerprint and checksum
+    compiled = api_spec.read_compiled_specs()
+    assert compiled['version'] == api_spec.API_SPEC_COMPILED_VERSION
+    assert compiled['fingerprint'] == api_spec.get_spec_fingerprint()
+    assert compiled['checksum'] == api_spec.get_spec_checksum()
+
+    # stale fingerprint with identical content is refreshed without reparsing
+    compiled['fingerprint'] = {'mtime': 0, 'size': 0}
+    api_spec.write_compiled_specs(compiled)
+    assert api_spec.get_specs() == spec
+    assert api_spec.read_compiled_specs()['fingerprint'] == api_spec.get_spec_fingerprint()
+
+    # same mode as other cache files, a failed write leaves no temporary file
+    assert os.stat(api_spec.API_SPEC_COMPILED_FILE).st_mode & 0o777 == 0o644
+    api_spec.write_compiled_specs({'unpicklable': lambda: None})
+    assert not [x for x in os.listdir(api_spec.CACHE_DIR) if x.startswith('.api_spec.')]
+    assert api_spec.read_compiled_specs()['fingerprint'] == api_spec.get_spec_fingerprint()
+    print("✅ Compiled spec: PASSED")
+
+def test_route_table():
+    """Test route table and function name index"""
+    print("Testing route table...")
+    from library.api_spec import SisterSpec
+
+    spec = SisterSpec()
+    assert len(spec.routes) == len(spec.get_paths())
+
+    route = spec.get_route('/data_pribadi/profil/{id_sdm}')
+    assert route['method'] == 'get'
+    assert route['function'] == 'get_data_pribadi_profil_bypath'
+    assert spec.get_path_by_function('get_data_pribadi_profil_bypath') == '/data_pribadi/profil/{id_sdm}'
+    assert spec.get_path_by_function('get_referensi_sdm') == '/referensi/sdm'
+    assert spec.get_path_by_function('get_unknown') is None
+
+    method, attr = spec.get_path_method_and_attr('/referensi/unit_kerja')
+    assert method == 'get' and attr is spec.get_paths()['/referensi/unit_kerja']['get']
+    params = spec.get_path_params('/referensi/unit_kerja')
+    assert [x['name'] for x in params] == ['id_perguruan_tinggi']
+    print("✅ Route table: PASSED")
+
+def test_ref_resolution():
+    """Test every $ref in a parameter list is resolved, once"""
+    print("Testing $ref resolution...")
+    from library.api_spec import SisterSpec
+
+    spec = SisterSpec()
+    params = spec.get_path_params('/pengajaran')
+    assert [x['name'] for x in params] == ['id_sdm', 'id_semester']
+    assert all('$ref' not in x for x in params)
+
+    # inline parameters next to references are kept
+    params = spec.get_path_params('/bkd/ajar')
+    assert [x['name'] for x in params if x.get('required')] == ['id_sdm', 'id_smt']
+
+    # references resolve to one shared, memoized object
+    id_sdm = spec.resolver.resolve_ref('#/components/parameters/id_sdm')
+    assert spec.get_path_params('/penelitian')[0] is id_sdm
+    assert SisterSpec().resolver is spec.resolver
+
+    schema = spec.get_schema('AuthToken')
+    assert 'properties' in schema
+    try:
+        spec.resolver.resolve_ref('#/components/schemas/Unknown')
+        assert False, "Should raise ValueError for unknown reference"
+    except ValueError:
+        pass
+    print("✅ $ref resolution: PASSED")
+
+def test_spec_subset():
+    """Test loading only selected tags"""
+    print("Testing spec subset by tag...")
+    from library.api_spec import SisterSpec, collect_refs
+
+    spec = SisterSpec(tags='referensi, Data Pokok')
+    assert spec.tags == ('data_pokok', 'referensi')
+    assert '/referensi/agama' in spec.routes
+    assert '/data_pribadi/profil/{id_sdm}' in spec.routes
+    assert '/penelitian' not in spec.routes
+    assert spec.get_path_params('/data_pribadi/profil/{id_sdm}')[0]['name'] == 'id_sdm'
+
+    # first path segment works as selector too
+    assert set(SisterSpec(tags=['data_pribadi', 'referensi']).routes) == set(spec.routes)
+
+    # every reference of the subset is available, descriptions are dropped
+    components = spec.get_components()
+    for ref in collect_refs(spec.get_paths(), set()):
+        section, name = ref[len('#/components/'):].split('/', 1)
+        assert name in components[section]
+    assert len(components['schemas']) < len(SisterSpec(tags=[]).get_components()['schemas'])
+    assert 'description' not in spec.get_info()
+    assert 'description' not in spec.get_route('/referensi/unit_kerja')['params'][0]
+    print("✅ Spec subset: PASSED")
+
+def test_lazy_functions():
+    """Test get_* functions are created on first access"""
+    print("Testing lazy API functions...")
+    from api import WsSisterAPI, LazySisterAPI
+
+    api = WsSisterAPI()
+    assert 'get_referensi_sdm' not in api.__dict__
+    assert api._api_key is None  # API key file is not read yet
+    func = api.get_referensi_sdm
+    assert func.args == ('/referensi/sdm',)
+    assert api.get_referensi_sdm is func
+    assert 'get_data_pribadi_profil_bypath' in dir(api)
+    try:
+        api.get_unknown_path
+        assert False, "Should raise AttributeError for unknown function"
+    except AttributeError:
+        pass
+
+    eager = WsSisterAPI(lazy=False)
+    assert set(api.spec.functions) <= set(eager.__dict__)
+
+    lazy_api = LazySisterAPI()
+    assert lazy_api._api is None
+    assert lazy_api.get_referensi_agama.args == ('/referensi/agama',)
+    assert isinstance(lazy_api.get_api(), WsSisterAPI)
+    print("✅ Lazy API functions: PASSED")
+
+def test_request_plan():
+    """Test compiled request plans build the same URL as parse_path_url"""
+    print("Testing request plans...")
+    from library.webservice import WebService
+
+    ws = WebService()
+    plan = ws.get_plan('/data_pribadi/profil/{id_sdm}')
+    assert ws.get_plan('/data_pribadi/profil/{id_sdm}') is plan
+    assert plan.method == 'get'
+    assert plan.path_params == ('id_sdm',)
+    assert 'id_sdm' in plan.required
+    assert plan.base_url == ws.get_ws_url()
+
+    kwargs = {'id_sdm': 'abc', 'extra': 1}
+    params = ws.spec.get_path_params(plan.path)
+    legacy = ws.parse_path_url(plan.path, __params__=params, **kwargs)
+    path_url = plan.build(kwargs)
+    assert path_url.name() == legacy.name() == '/data_pribadi/profil/abc?extra=1'
+    assert str(path_url) == str(legacy)
+
+    try:
+        plan.check_required({})
+        assert False, "Should raise NameError for missing required argument"
+    except NameError:
+        pass
+    print("✅ Request plans: PASSED")
+
+def test_client_generator():
+    """Test generated static client imports without the YAML spec"""
+    print("Testing static client generator...")
+    import subprocess
+    import tempfile
+    from library.codegen import ClientGenerator
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = ClientGenerator().write(os.path.join(tmp_dir, 'generated_client.py'))
+        check = (
+            "import sys, inspect; sys.path.insert(0, %r); import generated_client as c; "
+            "from library.api_spec import BaseSpec; "
+            "assert 'yaml' not in sys.modules and not BaseSpec.specs; "
+            "assert str(inspect.signature(c.get_data_pribadi_profil_bypath)).startswith('(*, id_sdm: str)'); "
+            "assert c.client.get_api().get_ws_url() == c.BASE_URL; "
+            "assert not BaseSpec.specs"
+        ) % tmp_dir
+        result = subprocess.run([sys.executable, '-c', check], cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert result.returncode == 0
+    print("✅ Static client generator: PASSED")
+
+def main():
+    """Run all tests"""
+    print("🧪 Running Sister API Spec Tests...\n")
+    
+    try:
+        test_compiled_spec()
+        test_route_table()
+        test_ref_resolution()
+        test_spec_subset()
+        test_lazy_functions()
+        test_request_plan()
+        test_client_generator()
+        
+        print("\n🎉 All API spec tests PASSED!")
+        
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
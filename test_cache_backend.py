@@ -0,0 +1,643 @@
+#!/usr/bin/env python3
+"""
+Test script for cache index backends
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(__file__))
+
+def get_cache_object(cache_id, expired_at):
+    return {
+        'id': cache_id,
+        'path': f'/{cache_id}',
+        'filename': f'{cache_id}.json',
+        'filepath': os.path.join(tempfile.gettempdir(), f'{cache_id}-missing.json'),
+        'accessed_at': datetime.now().isoformat(),
+        'expired_at': expired_at.isoformat(),
+        'length': 1,
+    }
+
+def test_sqlite_backend():
+    """Test SQLite cache index put/get/delete/cleanup and JSON migration"""
+    print("Testing SQLite cache backend...")
+    from library.cache import CacheAsSQLite, SisterCache, get_cache_backend, CacheAsJson
+
+    assert get_cache_backend('json') is CacheAsJson
+    assert get_cache_backend('sqlite') is CacheAsSQLite
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        now = datetime.now()
+        json_db_filename = os.path.join(tmp_dir, 'cache_db.json')
+        with open(json_db_filename, 'w') as writer:
+            json.dump({
+                'referensi-sdm': get_cache_object('referensi-sdm', now + timedelta(days=1)),
+                'referensi-agama': get_cache_object('referensi-agama', now - timedelta(days=1)),
+            }, writer)
+
+        cache_db = CacheAsSQLite(os.path.join(tmp_dir, 'cache_db.sqlite3'))
+        journal_mode = cache_db.get_connection().execute('PRAGMA journal_mode').fetchone()[0]
+        assert journal_mode == 'wal'
+        assert cache_db.migrate_from_json(json_db_filename) == 2
+        assert sorted(cache_db.get_all_cache_ids()) == ['referensi-agama', 'referensi-sdm']
+        assert cache_db.get('referensi-sdm')['path'] == '/referensi-sdm'
+        assert cache_db.get('unknown') == {}
+
+        cache_db.save(get_cache_object('referensi-gelar', now + timedelta(days=1)))
+        assert cache_db.get_item('referensi-gelar')['length'] == 1
+
+        # only the expired row is removed
+        result = cache_db.cleanup_expired_cache(SisterCache(cache_db_class=CacheAsJson))
+        assert result['expired_count'] == 1
+        assert result['remaining_cache'] == 2
+        assert not cache_db.get('referensi-agama')
+
+        assert cache_db.delete('referensi-gelar')['id'] == 'referensi-gelar'
+        assert cache_db.delete('referensi-gelar') == {}
+        assert cache_db.clear()
+        assert cache_db.read_db() == {}
+    print("✅ SQLite cache backend: PASSED")
+
+def test_json_index_concurrency():
+    """Test concurrent JSON index writers lose no entries and readers never see a partial index"""
+    print("Testing JSON index under concurrent writers...")
+    import threading
+    from library.cache import CacheAsJson
+
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_db_filename = os.path.join(tmp_dir, 'cache_db.json')
+        misses = []
+
+        def write(worker):
+            # one instance per worker, like separate processes
+            cache_db = CacheAsJson()
+            cache_db.cache_db_filename = cache_db_filename
+            for index in range(30):
+                cache_db.save(get_cache_object(f'worker-{worker}-{index}', now + timedelta(days=1)))
+                if not cache_db.read_db():
+                    misses.append(worker)
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cache_db = CacheAsJson()
+        cache_db.cache_db_filename = cache_db_filename
+        assert misses == []
+        assert len(cache_db.get_all_cache_ids()) == 6 * 30
+        assert sorted(os.listdir(tmp_dir)) == ['cache_db.json', 'cache_db.json.lock']
+
+        # a broken index is a miss, not removed
+        with open(cache_db_filename, 'w') as writer:
+            writer.write('{"broken')
+        assert cache_db.read_db() == {}
+        assert os.path.isfile(cache_db_filename)
+    print("✅ JSON index concurrency: PASSED")
+
+def test_memory_cache():
+    """Test in-memory LRU limits, expiry and invalidation"""
+    print("Testing in-memory cache tier...")
+    from library.cache import MemoryCache, SisterCache, CacheAsJson
+
+    now = time.time()
+    memory_cache = MemoryCache(max_entries=2, max_bytes=100)
+    memory_cache.put('a', {'id': 'a'}, now + 86400, 10)
+    memory_cache.put('b', {'id': 'b'}, now + 86400, 10)
+    assert memory_cache.get('a', now)['id'] == 'a'
+    # entry limit drops the least recently used one
+    memory_cache.put('c', {'id': 'c'}, now + 86400, 10)
+    assert memory_cache.get('b', now) == {}
+    assert list(memory_cache.items) == ['a', 'c']
+    # byte limit
+    memory_cache.put('d', {'id': 'd'}, now + 86400, 95)
+    assert list(memory_cache.items) == ['d']
+    assert memory_cache.total_bytes == 95
+    memory_cache.put('e', {'id': 'e'}, now + 86400, 101)
+    assert memory_cache.get('e', now) == {}
+    # expired entries are dropped
+    memory_cache.put('f', {'id': 'f'}, now - 1, 1)
+    assert memory_cache.get('f', now) == {}
+
+    # repeated hits do not touch the cache files
+    cache = SisterCache(cache_db_class=CacheAsJson)
+    cache.caching_system = True
+    path = '/test/memory_cache'
+    response = {'status': True, 'data': [{'id': 1}]}
+    cache.save_cache(path, response, minutes=5)
+    cache_object = cache.get_cache(path)
+    os.remove(cache_object['filepath'])
+    assert cache.get_cache(path)['data'] == [{'id': 1}]
+    # every hit is a copy, changing one does not change the next
+    cache.get_cache(path)['data'][0]['id'] = 2
+    cache.get_cache(path)['data'].append({'id': 3})
+    response['data'].append({'id': 4})
+    assert cache.get_cache(path)['data'] == [{'id': 1}]
+    assert cache.delete_cache_by_path(path)
+    assert cache.get_cache(path) == {}
+    print("✅ In-memory cache tier: PASSED")
+
+def test_metadata_first_expiry():
+    """Test expired entries are detected without loading the payload"""
+    print("Testing metadata-first expiry check...")
+    from library.cache import SisterCache, CacheAsJson
+
+    cache = SisterCache(cache_db_class=CacheAsJson)
+    cache.caching_system = True
+    cache.memory_cache.max_entries = 0
+    path = '/test/metadata_first'
+    cache.save_cache(path, {'status': True, 'data': [{'id': 1}]}, seconds=-1)
+    cache_object = cache.get_cache_meta(path)
+    assert 'data' not in cache_object
+    assert isinstance(cache_object['expired_ts'], float)
+    assert not cache.is_cache_fresh(cache_object)
+
+    # payload is not read for stale entries
+    cache.read_cache_file = lambda cache_object: 1 / 0
+    assert not cache.is_cache_fresh(cache.get_cache_meta(path))
+
+    # entries without expired_ts still work
+    legacy_object = dict(cache_object, expired_at=cache.get_expired_datetime(isoformat=True, days=1))
+    legacy_object.pop('expired_ts')
+    assert cache.is_cache_fresh(legacy_object)
+    del cache.read_cache_file
+    assert cache.delete_cache_by_path(path)
+    print("✅ Metadata-first expiry check: PASSED")
+
+def test_blob_store():
+    """Test sharded content-addressed blobs, sharing and migration"""
+    print("Testing sharded blob store...")
+    from library.cache import SisterCache, CacheAsJson
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SisterCache(cache_db_class=CacheAsJson)
+        cache.caching_system = True
+        cache.blob_dir = os.path.join(tmp_dir, 'blobs')
+        response = {'status': True, 'data': [{'id': 1}]}
+        cache.save_cache('/test/blob_a', response, minutes=5)
+        cache.save_cache('/test/blob_b', response, minutes=5)
+
+        # identical payloads share one blob under blobs/ab/cd/
+        filepath = cache.get_cache_meta('/test/blob_a')['filepath']
+        assert filepath == cache.get_cache_meta('/test/blob_b')['filepath']
+        digest = os.path.basename(filepath).split('.')[0]
+        assert filepath == os.path.join(cache.blob_dir, digest[:2], digest[2:4], f'{digest}.json')
+
+        # the blob stays until the last entry is deleted
+        assert cache.delete_cache_by_path('/test/blob_a')
+        assert os.path.isfile(filepath)
+        cache.save_cache('/test/blob_b', {'status': True, 'data': [{'id': 2}]}, minutes=5)
+        assert not os.path.isfile(filepath)
+
+        # flat files written before the blob store are moved
+        legacy_fpath = os.path.join(tmp_dir, 'LEGACY.json')
+        with open(legacy_fpath, 'w') as writer:
+            json.dump([{'id': 3}], writer)
+        legacy_object = dict(cache.get_cache_meta('/test/blob_b'), filepath=legacy_fpath)
+        legacy_object.pop('payload', None)
+        cache.cache_db_class.save(legacy_object)
+        cache.memory_cache.clear()
+        assert cache.migrate_blobs() >= 1
+        assert not os.path.isfile(legacy_fpath)
+        cache_object = cache.get_cache('/test/blob_b')
+        assert cache_object['filepath'].startswith(cache.blob_dir)
+        assert cache_object['data'] == [{'id': 3}]
+        assert cache.delete_cache_by_path('/test/blob_b')
+    print("✅ Sharded blob store: PASSED")
+
+def test_cache_codec():
+    """Test payloads are compressed from the size threshold and decoded back"""
+    print("Testing cache compression...")
+    from library.cache import SisterCache, CacheAsJson
+    from library.codec import CODECS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SisterCache(cache_db_class=CacheAsJson)
+        cache.caching_system = True
+        cache.blob_dir = tmp_dir
+        cache.memory_cache.max_entries = 0
+        cache.cache_compress_min_bytes = 1024
+        small_data = [{'id': 1}]
+        large_data = [{'id': x, 'nama': 'Dosen'} for x in range(100)]
+        for codec in CODECS:
+            cache.cache_codec = codec
+            cache.save_cache('/test/codec_small', {'status': True, 'data': small_data}, minutes=5)
+            cache.save_cache('/test/codec_large', {'status': True, 'data': large_data}, minutes=5)
+            assert cache.get_cache_meta('/test/codec_small')['codec'] == 'none'
+            cache_object = cache.get_cache_meta('/test/codec_large')
+            assert cache_object['codec'] == codec
+            assert cache_object['size'] == len(json.dumps(large_data))
+            assert cache.get_cache('/test/codec_large')['data'] == large_data
+        assert cache.delete_cache_by_path('/test/codec_small')
+        assert cache.delete_cache_by_path('/test/codec_large')
+    print("✅ Cache compression: PASSED")
+
+class FakeConnector:
+    status_code = 200
+    headers = {'Content-Type': 'image/jpeg'}
+    content = b'\xff\xd8\xff\xe0 fake jpeg'
+
+def test_binary_cache():
+    """Test photo responses are cached as bytes with their content type"""
+    print("Testing binary cache...")
+    from library.webservice import WebService
+
+    ws = WebService()
+    ws.api_key = {'token': 'test', 'expired_at': ws.get_expired_datetime(isoformat=True, days=1)}
+    ws.read_and_validate_api = lambda: None
+    ws.connect = lambda method, path_url: FakeConnector()
+    plan = ws.get_plan('/data_pribadi/foto/{id_sdm}')
+    path = plan.cache_key({'id_sdm': 'test-binary'})
+    ws.delete_cache_by_path(path)
+
+    response = ws.parse_response(ws.execute_plan(plan, id_sdm='test-binary'))
+    assert response['cache'] == False
+    assert response['data'] == FakeConnector.content
+    cache_object = ws.get_cache_meta(path)
+    assert cache_object['binary'] and cache_object['content_type'] == 'image/jpeg'
+    assert cache_object['filepath'].endswith('.bin')
+    # own TTL, not pinned in memory
+    expired_days = (cache_object['expired_ts'] - time.time()) / 86400
+    assert round(expired_days) == ws.cache_binary_expired_datetime['days']
+    assert not ws.memory_cache.items.get(cache_object['id'])
+
+    ws.connect = lambda method, path_url: 1 / 0
+    response = ws.parse_response(ws.execute_plan(plan, id_sdm='test-binary'))
+    assert response['cache'] == True and response['status'] == True
+    assert response['data'] == FakeConnector.content
+    assert response['content-type'] == 'image/jpeg'
+    assert ws.delete_cache_by_path(path)
+    print("✅ Binary cache: PASSED")
+
+class FakeJsonConnector:
+    status_code = 200
+    headers = {'Content-Type': 'application/json'}
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+def test_stale_while_revalidate():
+    """Test expired entries within max stale are served, refreshed in background and not evicted"""
+    print("Testing stale-while-revalidate...")
+    import threading
+    from library.cache import CacheAsJson
+    from library.webservice import WebService
+    from library.refresh import RefreshQueue
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ws = WebService(janitor=False)
+        ws.cache_db_class = CacheAsJson()
+        ws.cache_db_class.cache_db_filename = os.path.join(tmp_dir, 'cache_db.json')
+        ws.blob_dir = os.path.join(tmp_dir, 'blobs')
+        ws.api_key = {'token': 'test', 'expired_at': ws.get_expired_datetime(isoformat=True, days=1)}
+        ws.read_and_validate_api = lambda: None
+        ws.enable_stale_while_revalidate(True)
+        # inline eviction keeps entries within max stale
+        ws.enable_auto_cleanup(True)
+        plan = ws.get_plan('/referensi/agama')
+        path = plan.cache_key({})
+        ws.save_cache(path, {'status': True, 'data': [{'id': 'old'}]}, seconds=-1)
+        assert ws.evict_expired_cache()['expired_count'] == 0
+
+        released = threading.Event()
+        def connect(method, path_url):
+            released.wait(5)
+            return FakeJsonConnector([{'id': 'new'}])
+        ws.connect = connect
+
+        response = ws.parse_response(ws.execute_plan(plan))
+        assert response['cache'] == True and response['stale'] == True
+        assert response['data'] == [{'id': 'old'}]
+        # the same key is refreshed once
+        assert path in ws.refresh_queue.pending
+        assert ws.parse_response(ws.execute_plan(plan))['stale'] == True
+        assert ws.refresh_queue.tasks.unfinished_tasks == 1
+        released.set()
+        ws.refresh_queue.join()
+        response = ws.parse_response(ws.execute_plan(plan))
+        assert response['stale'] == False and response['data'] == [{'id': 'new'}]
+
+        # outside max stale the caller waits for the server
+        ws.set_max_stale(plan.path, seconds=0)
+        ws.save_cache(path, {'status': True, 'data': [{'id': 'old'}]}, seconds=-1)
+        response = ws.parse_response(ws.execute_plan(plan))
+        assert response['cache'] == False and response['data'] == [{'id': 'new'}]
+
+        # past max stale the entry is evicted
+        ws.save_cache(path, {'status': True, 'data': [{'id': 'old'}]}, max_stale=0, seconds=-1)
+        assert ws.evict_expired_cache()['expired_count'] == 1
+        assert not ws.get_cache_meta(path)
+
+    # bounded queue
+    refresh_queue = RefreshQueue(max_size=1)
+    refresh_queue.start = lambda: None
+    assert refresh_queue.submit('a', lambda: None)
+    assert not refresh_queue.submit('b', lambda: None)
+    print("✅ Stale-while-revalidate: PASSED")
+
+def test_cache_policy():
+    """Test per-endpoint TTL policies from path patterns and spec tags"""
+    print("Testing cache TTL policies...")
+    from library.policy import CachePolicy, parse_duration, parse_policies, DEFAULT_CACHE_POLICIES
+
+    assert parse_duration('14d') == {'days': 14}
+    assert parse_duration('30m') == {'minutes': 30}
+    assert parse_duration(2) == {'days': 2}
+    try:
+        parse_duration('soon')
+        assert False, "Should raise ValueError for invalid duration"
+    except ValueError:
+        pass
+
+    policies = parse_policies('/referensi/wilayah*=30d, data_pokok=2h:30m')
+    policy = CachePolicy({**policies, **DEFAULT_CACHE_POLICIES})
+    # path pattern before tag, tag or first path segment
+    assert policy.resolve('/referensi/wilayah') == {'ttl': {'days': 30}}
+    assert policy.resolve('/referensi/agama') == {'ttl': {'days': 14}}
+    assert policy.resolve('/data_pribadi/profil/{id_sdm}', ['Data Pokok']) == {'ttl': {'hours': 2}, 'max_stale': {'minutes': 30}}
+    assert policy.resolve('/dokumen') == {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'cache_policy.yaml')
+        with open(filename, 'w') as writer:
+            writer.write("referensi:\n  ttl: 4w\n  max_stale: 1d\n/bkd/*: 3h\n")
+        policy = CachePolicy.from_config({'cache_policies': 'bkd=2h', 'cache_policy_file': filename})
+        assert policy.resolve('/referensi/agama') == {'ttl': {'weeks': 4}, 'max_stale': {'days': 1}}
+        assert policy.resolve('/bkd/dosen') == {'ttl': {'hours': 3}}
+        assert policy.resolve('/bkd') == {'ttl': {'hours': 2}}
+
+    # save_cache and the expiry check use the endpoint TTL
+    from library.webservice import WebService
+    ws = WebService()
+    ws.api_key = {'token': 'test', 'expired_at': ws.get_expired_datetime(isoformat=True, days=1)}
+    ws.read_and_validate_api = lambda: None
+    ws.connect = lambda method, path_url: FakeJsonConnector([{'id': 1}])
+    ws.cache_policy = CachePolicy({'referensi': '14d', '/dokumen': '1h'})
+    for path, ttl_seconds in [('/referensi/agama', 14 * 86400), ('/dokumen', 3600)]:
+        plan = ws.get_plan(path)
+        ws.delete_cache_by_path(path)
+        assert ws.execute_plan(plan)['cache'] == False
+        cache_object = ws.get_cache_meta(path)
+        assert abs(cache_object['expired_ts'] - time.time() - ttl_seconds) < 60
+        assert ws.delete_cache_by_path(path)
+    print("✅ Cache TTL policies: PASSED")
+
+def test_bounded_eviction():
+    """Test auto cleanup removes a bounded batch of expired entries, earliest first"""
+    print("Testing bounded expired cache eviction...")
+    from library.cache import CacheAsSQLite, SisterCache, CacheAsJson
+
+    cache = SisterCache(cache_db_class=CacheAsJson)
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_db = CacheAsJson()
+        json_db.cache_db_filename = os.path.join(tmp_dir, 'cache_db.json')
+        sqlite_db = CacheAsSQLite(os.path.join(tmp_dir, 'cache_db.sqlite3'))
+        for cache_db in (json_db, sqlite_db):
+            for index in range(5):
+                cache_object = get_cache_object(f'expired-{index}', now - timedelta(hours=5 - index))
+                cache_object['expired_ts'] = now.timestamp() - (5 - index) * 3600
+                cache_db.save(cache_object)
+            cache_db.save(dict(get_cache_object('fresh', now + timedelta(days=1)), expired_ts=now.timestamp() + 86400))
+
+            result = cache_db.evict_expired(cache, limit=2)
+            assert result['expired_count'] == 2
+            assert sorted(cache_db.get_all_cache_ids()) == ['expired-2', 'expired-3', 'expired-4', 'fresh']
+            assert cache_db.evict_expired(cache, limit=10)['expired_count'] == 3
+            assert cache_db.evict_expired(cache, limit=10)['expired_count'] == 0
+            assert cache_db.get_all_cache_ids() == ['fresh']
+
+        # entries another process wrote are evicted too
+        other_db = CacheAsJson()
+        other_db.cache_db_filename = json_db.cache_db_filename
+        for index in range(2):
+            other_db.save(dict(get_cache_object(f'other-{index}', now), expired_ts=now.timestamp() - 60))
+        assert json_db.evict_expired(cache, limit=10)['expired_count'] == 2
+        assert json_db.get_all_cache_ids() == ['fresh']
+
+        # refreshed entries are skipped, nothing due does not read the index
+        cache_object = dict(get_cache_object('refreshed', now), expired_ts=now.timestamp() - 1)
+        json_db.save(cache_object)
+        json_db.save(dict(cache_object, expired_ts=now.timestamp() + 86400))
+        assert json_db.evict_expired(cache, limit=10)['expired_count'] == 0
+        json_db.read_db = lambda cache_id='': 1 / 0
+        assert json_db.evict_expired(cache, limit=10)['expired_count'] == 0
+    print("✅ Bounded expired cache eviction: PASSED")
+
+def test_cache_janitor():
+    """Test janitor pass: expired, quota, orphan files, dangling entries"""
+    print("Testing cache janitor...")
+    from library.cache import SisterCache, CacheAsJson
+    from library.janitor import CacheJanitor
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SisterCache(cache_db_class=CacheAsJson)
+        cache.cache_db_class.cache_db_filename = os.path.join(tmp_dir, 'cache_db.json')
+        cache.blob_dir = os.path.join(tmp_dir, 'blobs')
+        cache.caching_system = True
+        cache.memory_cache.max_entries = 0
+        cache.save_cache('/test/expired', {'status': True, 'data': ['expired']}, seconds=-1)
+        cache.save_cache('/test/first', {'status': True, 'data': ['x' * 1000]}, hours=1)
+        cache.save_cache('/test/second', {'status': True, 'data': ['y' * 1000]}, hours=2)
+        cache.save_cache('/test/dangling', {'status': True, 'data': ['dangling']}, hours=1)
+        os.remove(cache.get_cache_meta('/test/dangling')['filepath'])
+        old_orphan = cache.write_blob(b'old orphan')
+        os.utime(old_orphan, (time.time() - 3600, time.time() - 3600))
+        young_orphan = cache.write_blob(b'young orphan')
+        cache.cache_max_bytes = 1500
+
+        results = []
+        janitor = CacheJanitor(cache, io_per_second=0, metrics=results.append)
+        result = janitor.run_once()
+        assert results == [result] and result['errors'] == 0
+        assert result['expired_count'] == 1
+        assert result['quota_evicted'] == 1
+        assert result['orphan_files'] == 1
+        assert result['dangling_entries'] == 1
+        assert not os.path.exists(old_orphan) and os.path.exists(young_orphan)
+        assert cache.cache_db_class.get_all_cache_ids() == ['test-second']
+
+        # entries expired in another process are evicted on the next pass
+        other = SisterCache(cache_db_class=CacheAsJson)
+        other.cache_db_class.cache_db_filename = cache.cache_db_class.cache_db_filename
+        other.blob_dir = cache.blob_dir
+        other.caching_system = True
+        other.save_cache('/test/other', {'status': True, 'data': ['other']}, seconds=-1)
+        assert janitor.run_once()['expired_count'] == 1
+        assert cache.cache_db_class.get_all_cache_ids() == ['test-second']
+
+        # daemon thread stops on request
+        janitor.interval = 3600
+        janitor.start()
+        assert janitor.is_running()
+        janitor.stop(timeout=5)
+        assert not janitor.is_running()
+    print("✅ Cache janitor: PASSED")
+
+def test_cache_quota():
+    """Test running byte total and LRU/LFU eviction when a write exceeds the quota"""
+    print("Testing cache size quota...")
+    import sqlite3
+    from library.cache import SisterCache, CacheAsJson, CacheAsSQLite
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in ('json', 'sqlite'):
+            for policy in ('lru', 'lfu'):
+                db_filename = os.path.join(tmp_dir, f'{backend}-{policy}.db')
+                if backend == 'json':
+                    cache = SisterCache(cache_db_class=CacheAsJson)
+                    cache.cache_db_class.cache_db_filename = db_filename
+                else:
+                    cache = SisterCache(cache_db_class=lambda: CacheAsSQLite(db_filename))
+                cache.blob_dir = os.path.join(tmp_dir, f'blobs-{backend}-{policy}')
+                cache.caching_system = True
+                cache.memory_cache.max_entries = 0
+                cache.cache_eviction_policy = policy
+                for name in ('first', 'second', 'third'):
+                    cache.save_cache(f'/test/{name}', {'status': True, 'data': [name * 300]}, hours=1)
+                # identical payload shares the blob, counted once
+                cache.save_cache('/test/copy', {'status': True, 'data': ['first' * 300]}, hours=1)
+                cache_db = cache.cache_db_class
+                disk_size = cache.get_cache_meta('/test/second')['disk_size']
+                assert cache_db.get_total_bytes() == sum(
+                    os.path.getsize(x) for x in cache_db.get_referenced_files())
+
+                # second is hit once but least recently, first and third more often
+                for name, hits in (('second', 1), ('first', 2), ('third', 2)):
+                    for _ in range(hits):
+                        assert cache.get_cache(f'/test/{name}')['data']
+                cache_db.flush_touches()
+                assert cache.get_cache_meta('/test/first')['hits'] == 2
+
+                cache.cache_max_bytes = cache_db.get_total_bytes() + disk_size // 2
+                cache.save_cache('/test/fourth', {'status': True, 'data': ['fourth' * 250]}, hours=1)
+                # lru: copy was never read; lfu: copy has 0 hits
+                assert cache.get_cache_meta('/test/copy') == {}
+                assert cache.get_cache_meta('/test/fourth')
+                assert cache_db.get_total_bytes() <= cache.cache_max_bytes
+                # copy shared its blob with first, nothing freed, second goes as well
+                assert cache.get_cache_meta('/test/second') == {}
+                assert cache.get_cache('/test/first')['data']
+
+        # databases from before the running total are counted on open
+        db_filename = os.path.join(tmp_dir, 'legacy.sqlite3')
+        filepath = os.path.join(tmp_dir, 'legacy.json')
+        with open(filepath, 'w') as writer:
+            writer.write('[1, 2, 3]')
+        connection = sqlite3.connect(db_filename)
+        connection.execute('CREATE TABLE cache (id TEXT PRIMARY KEY, path TEXT, filepath TEXT, expired_at TEXT, object TEXT NOT NULL)')
+        connection.execute('INSERT INTO cache VALUES (?, ?, ?, ?, ?)', ('legacy', '/legacy', filepath, '', '{}'))
+        connection.commit()
+        connection.close()
+        assert CacheAsSQLite(db_filename).get_total_bytes() == 9
+    print("✅ Cache size quota: PASSED")
+
+def test_single_flight():
+    """Test concurrent calls of one uncached path share a single request"""
+    print("Testing single-flight request coalescing...")
+    import threading
+    from library.flight import SingleFlight
+    from library.webservice import WebService
+
+    ws = WebService()
+    ws.api_key = {'token': 'test', 'expired_at': ws.get_expired_datetime(isoformat=True, days=1)}
+    ws.read_and_validate_api = lambda: None
+    plan = ws.get_plan('/referensi/agama')
+    ws.delete_cache_by_path(plan.cache_key({}))
+
+    requests_sent = []
+    released = threading.Event()
+    def connect(method, path_url):
+        requests_sent.append(path_url)
+        released.wait(5)
+        return FakeJsonConnector([{'id': 1}])
+    ws.connect = connect
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(ws.execute_plan(plan))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while not requests_sent or len(ws.flights.flights) != 1:
+        time.sleep(0.01)
+    time.sleep(0.05) # let the followers line up
+    released.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(requests_sent) == 1
+    assert len(responses) == 5 and all(x['data'] == [{'id': 1}] for x in responses)
+    assert len({id(x) for x in responses}) == 5
+    # a later call finds the saved entry
+    assert ws.execute_plan(plan)['cache'] == True
+    assert ws.delete_cache_by_path(plan.cache_key({}))
+
+    # errors reach every caller, lock file and recheck
+    flights = SingleFlight()
+    try:
+        flights.do('key', lambda: 1 / 0)
+        assert False, "Should raise ZeroDivisionError"
+    except ZeroDivisionError:
+        pass
+    assert flights.flights == {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        flights = SingleFlight(tmp_dir)
+        assert flights.do('key', lambda: 1 / 0, recheck=lambda: {'cache': True}) == {'cache': True}
+        assert flights.do('key', lambda: 'fetched', recheck=lambda: None) == 'fetched'
+        assert not os.path.exists(flights.get_lock_fpath('key'))
+
+        # a process waiting on a removed lock file locks a new one, never two leaders at once
+        import threading
+        leaders, overlaps = [], []
+        def lead(index):
+            with flights.lock_file('key'):
+                overlaps.append(len(leaders))
+                leaders.append(index)
+                time.sleep(0.01)
+                leaders.remove(index)
+        threads = [threading.Thread(target=lead, args=(x,)) for x in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert overlaps == [0] * 8
+        assert os.listdir(tmp_dir) == []
+    print("✅ Single-flight request coalescing: PASSED")
+
+def main():
+    """Run all tests"""
+    print("🧪 Running Cache Backend Tests...\n")
+
+    try:
+        test_sqlite_backend()
+        test_json_index_concurrency()
+        test_memory_cache()
+        test_metadata_first_expiry()
+        test_blob_store()
+        test_cache_codec()
+        test_binary_cache()
+        test_stale_while_revalidate()
+        test_cache_policy()
+        test_bounded_eviction()
+        test_cache_janitor()
+        test_cache_quota()
+        test_single_flight()
+
+        print("\n🎉 All cache backend tests PASSED!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
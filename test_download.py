@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming document downloads
+"""
+
+import sys
+import os
+import io
+import hashlib
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(__file__))
+
+CONTENT = b'%PDF-1.4 scanned document ' * 1000
+
+
+class FakeConnector:
+    # minimal streamed requests.Response
+
+    def __init__(self, headers):
+        start = int(headers.get('Range', 'bytes=0-')[6:-1] or 0)
+        if start >= len(CONTENT):
+            self.status_code, self.body = 416, b''
+        else:
+            self.status_code = 206 if start else 200
+            self.body = CONTENT[start:]
+        self.headers = {'Content-Type': 'application/pdf', 'Content-Length': str(len(self.body))}
+        if self.status_code == 416:
+            self.headers['Content-Range'] = f'bytes */{len(CONTENT)}'
+        self.text = ''
+        self.streamed = 0
+
+    def iter_content(self, chunk_size):
+        for index in range(0, len(self.body), chunk_size):
+            self.streamed += 1
+            yield self.body[index:index + chunk_size]
+
+    def close(self):
+        pass
+
+
+def get_webservice(requests_sent):
+    from library.webservice import WebService
+
+    ws = WebService()
+    ws.api_key = {'token': 'test', 'expired_at': ws.get_expired_datetime(isoformat=True, days=1)}
+    ws.read_and_validate_api = lambda: None
+
+    def connect(method, path_url, stream=False, headers=None):
+        assert stream
+        connector = FakeConnector(headers or {})
+        requests_sent.append(connector)
+        return connector
+    ws.connect = connect
+    return ws
+
+def test_download():
+    """Test download to path and file object, skip, resume and checksum"""
+    print("Testing streaming download...")
+    path = '/dokumen/{id}/download'
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    requests_sent = []
+    ws = get_webservice(requests_sent)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        destination = os.path.join(tmp_dir, 'dokumen.pdf')
+        response = ws.download(path, destination, chunk_size=1024, id='test')
+        assert response['status'] == True
+        assert response['data']['sha256'] == sha256
+        assert response['data']['content_type'] == 'application/pdf'
+        assert requests_sent[-1].streamed > 1
+        with open(destination, 'rb') as reader:
+            assert reader.read() == CONTENT
+
+        # same size on disk, nothing is written again
+        response = ws.download(path, destination, id='test')
+        assert response['data']['skipped'] == True
+        # known sha256, not even a request
+        sent = len(requests_sent)
+        assert ws.download(path, destination, sha256=sha256, id='test')['data']['skipped'] == True
+        assert len(requests_sent) == sent
+
+        # interrupted download continues from the .part file
+        os.remove(destination)
+        with open(f'{destination}.part', 'wb') as writer:
+            writer.write(CONTENT[:5000])
+        response = ws.download(path, destination, sha256=sha256, id='test')
+        assert response['data']['resumed'] == True
+        assert response['data']['sha256'] == sha256
+        assert not os.path.exists(f'{destination}.part')
+
+        # a complete .part is moved into place, not downloaded again
+        for expected in (None, sha256):
+            os.replace(destination, f'{destination}.part')
+            sent = len(requests_sent)
+            response = ws.download(path, destination, sha256=expected, id='test')
+            assert response['data']['resumed'] == True and response['data']['sha256'] == sha256
+            assert len(requests_sent) == sent + 1 and requests_sent[-1].status_code == 416
+            assert not os.path.exists(f'{destination}.part')
+
+        # wrong checksum is reported and the file is not kept
+        os.remove(destination)
+        response = ws.download(path, destination, sha256='0' * 64, id='test')
+        assert response['status'] == False
+        assert not os.path.exists(destination) and not os.path.exists(f'{destination}.part')
+
+    writer = io.BytesIO()
+    assert ws.download(path, writer, id='test')['data']['size'] == len(CONTENT)
+    assert writer.getvalue() == CONTENT
+    print("✅ Streaming download: PASSED")
+
+def main():
+    """Run all tests"""
+    print("🧪 Running Download Tests...\n")
+
+    try:
+        test_download()
+
+        print("\n🎉 All download tests PASSED!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
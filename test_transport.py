@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP transport (timeouts, retries, connection pool)
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(__file__))
+
+
+class FakeSisterHandler(BaseHTTPRequestHandler):
+    # answers every path with the next status of server.statuses, then 200
+
+    def handle_request(self):
+        self.server.requests.append((self.command, self.path))
+        if self.path.startswith('/slow'):
+            time.sleep(self.server.delay)
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = json.dumps({'path': self.path, 'message': '', 'detail': ''}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = handle_request
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(statuses=(), delay=0.0):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSisterHandler)
+    server.statuses = list(statuses)
+    server.requests = []
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+def test_session_transport():
+    """Test retries of GET on 5xx, no retries of POST, timeouts and pool size"""
+    print("Testing session transport...")
+    import requests
+    from library.connector import SisterSession, SisterRetry
+    from settings import ENV_CONFIG
+
+    session = SisterSession()
+    assert session.timeout == (ENV_CONFIG['api_connect_timeout_seconds'], ENV_CONFIG['api_timeout_seconds'])
+    adapter = session.get_adapter('https://sister.example.com')
+    assert adapter.max_retries.total == ENV_CONFIG['max_retries']
+    assert adapter._pool_maxsize == ENV_CONFIG['http_pool_size']
+
+    server, url = start_server(statuses=[503, 502])
+    session = SisterSession(max_retries=3, backoff_factor=0.01, backoff_jitter=0.01)
+    try:
+        # GET is retried until it succeeds
+        assert session.get(f'{url}/referensi/agama').status_code == 200
+        assert len(server.requests) == 3
+        # POST is never retried
+        server.statuses = [503]
+        assert session.post(f'{url}/authorize').status_code == 503
+        assert len(server.requests) == 4
+        # the last 5xx is returned once retries are exhausted
+        server.statuses = [500] * 5
+        assert session.get(f'{url}/referensi/agama').status_code == 500
+        assert len(server.requests) == 8
+
+        # a hung server does not stall the caller forever
+        server.delay = 1
+        session = SisterSession(timeout=0.2, max_retries=0)
+        started = time.perf_counter()
+        try:
+            session.get(f'{url}/slow')
+            assert False, "Should raise on read timeout"
+        except requests.RequestException:
+            pass
+        assert time.perf_counter() - started < 1
+    finally:
+        server.shutdown()
+
+    # exponential backoff plus jitter
+    retry = SisterRetry(total=5, backoff_factor=0.5, jitter=0.5)
+    for _ in range(3):
+        retry = retry.increment(method='GET', url='/')
+    assert retry.jitter == 0.5
+    assert 2 <= retry.get_backoff_time() <= 2.5
+    print("✅ Session transport: PASSED")
+
+class FakeAsyncResponse:
+    # the parts of httpx.Response the client reads
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.data = data
+        self.text = json.dumps(data)
+        self.content = self.text.encode()
+        self.headers = {'Content-Type': 'application/json'}
+
+    def json(self):
+        return self.data
+
+
+class FakeAsyncClient:
+    # in place of httpx.AsyncClient, tokens 'expired' are rejected once
+
+    def __init__(self):
+        self.requests = []
+        self.tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def post(self, url, json=None):
+        import asyncio
+        self.tokens += 1
+        await asyncio.sleep(0.01)
+        return FakeAsyncResponse(200, {'token': f'token-{self.tokens}', 'role': 'developer'})
+
+    async def request(self, method, url, headers=None):
+        import asyncio
+        self.requests.append(url)
+        if headers['Authorization'] == 'Bearer expired':
+            return FakeAsyncResponse(401, {'message': 'token expired', 'detail': ''})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return FakeAsyncResponse(200, [{'url': url}])
+
+def test_async_client():
+    """Test AsyncSisterAPI: coroutines, bounded concurrency, one token request, coalescing"""
+    print("Testing async client...")
+    import asyncio
+    import subprocess
+    from api import AsyncSisterAPI
+
+    # the sync client never loads asyncio
+    subprocess.run([sys.executable, '-c', "import sys, api; assert 'asyncio' not in sys.modules"],
+                   cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+    client = FakeAsyncClient()
+    api = AsyncSisterAPI(max_concurrency=3, client=client)
+    api.update_api_key = lambda **kwargs: setattr(api, 'api_key', kwargs)
+    api.api_key = {}
+    plan = api.get_plan('/data_pribadi/profil/{id_sdm}')
+    ids = [f'async-{index}' for index in range(10)]
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+
+    async def run():
+        async with api:
+            # different paths run concurrently, at most max_concurrency at a time
+            responses = await asyncio.gather(*[api.get_data_pribadi_profil_bypath(id_sdm=x) for x in ids])
+            assert [x['data'][0]['url'].rsplit('/', 1)[-1] for x in responses] == ids
+            assert client.tokens == 1
+            assert client.max_in_flight == 3
+            # identical calls share one request, then the cache answers
+            sent = len(client.requests)
+            api.delete_cache_by_path(plan.cache_key({'id_sdm': ids[0]}))
+            responses = await asyncio.gather(*[api.get_data_pribadi_profil_bypath(id_sdm=ids[0]) for _ in range(5)])
+            assert len(client.requests) == sent + 1
+            assert all(x['status'] for x in responses)
+            assert (await api.get_data_pribadi_profil_bypath(id_sdm=ids[0]))['cache'] == True
+            # a rejected token is replaced once and the request repeated
+            api.api_key = dict(api.api_key, token='expired')
+            api.delete_cache_by_path(plan.cache_key({'id_sdm': ids[1]}))
+            response = await api.get_data_pribadi_profil_bypath(id_sdm=ids[1])
+            assert response['status'] == True and client.tokens == 2
+
+    asyncio.run(run())
+    assert api.client is client
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+    print("✅ Async client: PASSED")
+
+class FakeSession:
+    # in place of SisterSession, every GET takes delay seconds
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, auth=None, **kwargs):
+        with self.lock:
+            self.requests.append(str(url))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return FakeAsyncResponse(200, [{'url': str(url)}])
+
+    def post(self, url, json=None):
+        with self.lock:
+            self.requests.append(str(url))
+        time.sleep(self.delay)
+        return FakeAsyncResponse(200, {'token': 'renewed', 'role': 'developer'})
+
+def test_batch():
+    """Test SisterAPI.batch: order, concurrency, inline cache hits, captured errors"""
+    print("Testing batch...")
+    from api import WsSisterAPI
+
+    api = WsSisterAPI()
+    api.session = FakeSession(delay=0.2)
+    api_key = {'token': 'batch', 'expired_at': api.get_expired_datetime(isoformat=True, hours=1)}
+    api.read_api_key = lambda: api_key
+    plan = api.get_plan('/data_pribadi/profil/{id_sdm}')
+    ids = [f'batch-{index}' for index in range(6)]
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+
+    calls = [('get_data_pribadi_profil_bypath', {'id_sdm': x}) for x in ids]
+    started = time.perf_counter()
+    results = api.batch(calls, max_workers=6)
+    # about one round trip instead of six
+    assert time.perf_counter() - started < 0.2 * 3
+    assert [x['data'][0]['url'].rsplit('/', 1)[-1] for x in results] == ids
+    assert all(x['cache'] == False for x in results)
+
+    # cache hits do not reach the server, errors stay in their place
+    results = api.batch(calls[:2] + [
+        ('get_data_pribadi_profil_bypath', {}),
+        'get_nothing_here',
+        ('/data_pribadi/profil/{id_sdm}', {'id_sdm': ids[2]}),
+    ])
+    assert len(api.session.requests) == len(ids)
+    assert results[0]['cache'] == True and results[1]['cache'] == True and results[4]['cache'] == True
+    assert results[2]['status'] == False and results[2]['detail'] == 'NameError'
+    assert results[3]['status'] == False and results[3]['detail'] == 'AttributeError'
+
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+    print("✅ Batch: PASSED")
+
+def test_token_refresh():
+    """Test an expired token is requested once by concurrent workers, api_key.json written atomically"""
+    print("Testing token refresh...")
+    import tempfile
+    from api import WsSisterAPI
+    from library.io import SisterIO
+
+    api = WsSisterAPI()
+    api.session = FakeSession(delay=0.05)
+    api.check_config = lambda: True
+    stored = {'api_key': {'token': 'expired', 'expired_at': api.get_expired_datetime(isoformat=True, hours=-1)}}
+    api.read_api_key = lambda: stored['api_key']
+    api.update_api_key = lambda **kwargs: (stored.update(api_key=kwargs), setattr(api, 'api_key', kwargs))
+    plan = api.get_plan('/data_pribadi/profil/{id_sdm}')
+    ids = [f'token-{index}' for index in range(8)]
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+
+    barrier = threading.Barrier(len(ids))
+    def fetch(id_sdm):
+        barrier.wait()
+        return api.fetch_plan(plan, id_sdm=id_sdm)
+    threads = [threading.Thread(target=fetch, args=(x,)) for x in ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len([x for x in api.session.requests if x.endswith('/authorize')]) == 1
+    assert api.api_key['token'] == 'renewed'
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+
+    # readers see the old or the new key file, never a partly written one
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'api_key.json')
+        io, errors = SisterIO(), []
+        io.update_file(filename, {}, token='first')
+        def write():
+            for index in range(200):
+                io.update_file(filename, {}, token=f'token-{index}' * 50)
+        def read():
+            for _ in range(200):
+                try:
+                    io.read_file(filename)
+                except ValueError as e:
+                    errors.append(e)
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert os.listdir(tmp_dir) == ['api_key.json']
+        assert os.stat(filename).st_mode & 0o777 == 0o600
+    print("✅ Token refresh: PASSED")
+
+def test_sdm_profiles():
+    """Test get_sdm_profiles: every section per SDM, streamed, cache shared"""
+    print("Testing SDM profiles...")
+    from api import WsSisterAPI
+
+    api = WsSisterAPI()
+    api.session = FakeSession(delay=0.1)
+    api_key = {'token': 'profiles', 'expired_at': api.get_expired_datetime(isoformat=True, hours=1)}
+    api.read_api_key = lambda: api_key
+    sections = ['profil', 'publikasi']
+    plans = [api.get_plan('/data_pribadi/profil/{id_sdm}'), api.get_plan('/publikasi')]
+    ids = [f'profile-{index}' for index in range(6)]
+    def clear_cache():
+        for id_sdm in ids:
+            for plan in plans:
+                api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+    clear_cache()
+
+    started = time.perf_counter()
+    profiles = api.get_sdm_profiles(ids, sections=sections, max_workers=4)
+    id_sdm, profile = next(profiles)
+    first = time.perf_counter() - started
+    profiles = dict([(id_sdm, profile)] + list(profiles))
+    # the first profile arrives before the rest are done
+    assert first < time.perf_counter() - started
+    assert sorted(profiles) == ids
+    for id_sdm, profile in profiles.items():
+        assert list(profile) == sections
+        assert all(x['status'] and id_sdm in x['data'][0]['url'] for x in profile.values())
+    assert len(api.session.requests) == len(ids) * len(sections)
+
+    # served from cache, unknown sections are errors in the profile
+    profiles = list(api.get_sdm_profiles(ids[:2], sections=sections + ['/nothing_here']))
+    assert [x[0] for x in profiles] == ids[:2]
+    assert len(api.session.requests) == len(ids) * len(sections)
+    assert all(x[1]['profil']['cache'] == True and x[1]['/nothing_here']['status'] == False for x in profiles)
+    clear_cache()
+
+    # never more than max_workers SDM taken from the list and not yet yielded
+    api.session.delay = 0.01
+    ids = [f'profile-{index}' for index in range(40)]
+    clear_cache()
+    taken, peak = [], 0
+    prepare_call = api.prepare_call
+    def counting_prepare_call(name, kwargs):
+        if kwargs['id_sdm'] not in taken:
+            taken.append(kwargs['id_sdm'])
+        return prepare_call(name, kwargs)
+    api.prepare_call = counting_prepare_call
+    for yielded, _ in enumerate(api.get_sdm_profiles(ids, sections=sections, max_workers=2)):
+        peak = max(peak, len(taken) - yielded)
+    assert len(taken) == len(ids) and peak <= 2
+    clear_cache()
+    print("✅ SDM profiles: PASSED")
+
+def test_rate_limiter():
+    """Test RateLimiter: token bucket, in-flight limit, Retry-After, AIMD"""
+    print("Testing rate limiter...")
+    from api import WsSisterAPI
+    from library.limiter import RateLimiter
+
+    # 20 per second without burst, 5 requests take 4 intervals
+    limiter = RateLimiter(rate=20, burst=1)
+    started = time.perf_counter()
+    for _ in range(5):
+        limiter.release(limiter.acquire(), 200)
+    assert time.perf_counter() - started >= 0.2 - 0.02
+
+    # a 429 pauses for its Retry-After
+    limiter = RateLimiter(rate=1000)
+    limiter.release(limiter.acquire(), 429, '0.2')
+    started = time.perf_counter()
+    limiter.release(limiter.acquire(), 200)
+    assert time.perf_counter() - started >= 0.2 - 0.02
+    assert limiter.get_stats()['throttled'] == 1
+
+    # AIMD grows on healthy responses, halves once per overload
+    limiter = RateLimiter(max_in_flight=10, adaptive=True)
+    assert limiter.get_limit() == 5
+    for _ in range(20):
+        limiter.release(limiter.acquire(), 200)
+    assert limiter.get_limit() == 8
+    early = [limiter.acquire() for _ in range(3)]
+    limiter.release(early[0], 503)
+    assert limiter.get_limit() == 4
+    limiter.release(early[1], None)
+    limiter.release(early[2], 200)
+    assert limiter.get_limit() == 4
+    assert limiter.in_flight == 0
+
+    # connect holds a slot per request
+    api = WsSisterAPI()
+    api.session = FakeSession(delay=0.05)
+    api_key = {'token': 'limiter', 'expired_at': api.get_expired_datetime(isoformat=True, hours=1)}
+    api.read_api_key = lambda: api_key
+    api.limiter = RateLimiter(max_in_flight=2)
+    plan = api.get_plan('/data_pribadi/profil/{id_sdm}')
+    ids = [f'limiter-{index}' for index in range(6)]
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+    results = api.batch([('get_data_pribadi_profil_bypath', {'id_sdm': x}) for x in ids], max_workers=6)
+    assert all(x['status'] for x in results)
+    assert api.session.max_in_flight == 2
+    assert api.limiter.in_flight == 0
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+
+    # so does the async client, below its own max_concurrency
+    import asyncio
+    from api import AsyncSisterAPI
+    client = FakeAsyncClient()
+    api = AsyncSisterAPI(max_concurrency=6, client=client)
+    api.update_api_key = lambda **kwargs: setattr(api, 'api_key', kwargs)
+    api.api_key = {}
+    api.limiter = RateLimiter(max_in_flight=2)
+
+    async def run():
+        async with api:
+            return await asyncio.gather(*[api.get_data_pribadi_profil_bypath(id_sdm=x) for x in ids])
+
+    assert all(x['status'] for x in asyncio.run(run()))
+    assert client.max_in_flight == 2
+    assert api.limiter.in_flight == 0
+    for id_sdm in ids:
+        api.delete_cache_by_path(plan.cache_key({'id_sdm': id_sdm}))
+    print("✅ Rate limiter: PASSED")
+
+def main():
+    """Run all tests"""
+    print("🧪 Running Transport Tests...\n")
+
+    try:
+        test_session_transport()
+        test_async_client()
+        test_batch()
+        test_token_refresh()
+        test_sdm_profiles()
+        test_rate_limiter()
+
+        print("\n🎉 All transport tests PASSED!")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()